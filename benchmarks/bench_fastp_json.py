@@ -0,0 +1,91 @@
+"""
+Benchmark the extraction of the summary of fastp JSON reports.
+
+Compares decoding the whole document with `json.load` to decoding only the summary sections, on synthetic reports with per-cycle curves, k-mer tables and histograms of a realistic size. Also times `Report.parse`, which adds building the `ReportSum`. Reports the total time and the peak memory allocated while parsing a single report.
+
+Usage::
+
+    python benchmarks/bench_fastp_json.py --files 2000 --cycles 150
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from synthetic import make_fastp_json
+
+from bioreport import _json_stream
+from bioreport.report import Report
+
+_SUMMARY_KEYS: tuple[str, ...] = ("summary", "filtering_result")
+
+
+def _load_full(file_path: Path) -> dict:
+    with open(file_path, "r") as file:
+        json_dict: dict = json.load(file)
+    return {key: json_dict[key] for key in _SUMMARY_KEYS}
+
+
+def _load_summary(file_path: Path) -> dict:
+    with open(file_path, "r") as file:
+        return _json_stream.load_sections(file, keys=_SUMMARY_KEYS)
+
+
+def _measure(load: Callable[[Path], dict], file_paths: list[Path]) -> tuple[float, int]:
+    """Return the total time of loading all the files and the peak memory of loading one."""
+    start: float = time.perf_counter()
+    for file_path in file_paths:
+        load(file_path)
+    elapsed: float = time.perf_counter() - start
+
+    tracemalloc.start()
+    load(file_paths[0])
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak_bytes
+
+
+def main() -> None:
+    """Run the benchmark and print the time and peak memory of each method."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--cycles", type=int, default=150)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_paths: list[Path] = []
+        for i in range(args.files):
+            file_path: Path = Path(tmp_dir) / f"sample_{i}.json"
+            # a few distinct documents are enough, the page cache serves them all the same
+            file_path.write_text(make_fastp_json(args.cycles, seed=i % 16))
+            file_paths.append(file_path)
+        file_kib: float = file_paths[0].stat().st_size / 1024
+
+        for file_path in file_paths[:16]:
+            if _load_full(file_path) != _load_summary(file_path):
+                raise AssertionError(f"Different summaries: {file_path}")
+
+        print(f"{args.files} files of {file_kib:.0f} KiB")
+        print(f"{'method':>10} {'seconds':>10} {'us/file':>10} {'peak KiB':>10}")
+        for method, load in (
+            ("json.load", _load_full),
+            ("summary", _load_summary),
+            (
+                "parse",
+                lambda p: Report(path=p, module=("fastp", "json")).parse(
+                    validate="never"
+                ),
+            ),
+        ):
+            elapsed, peak_bytes = _measure(load, file_paths)
+            print(
+                f"{method:>10} {elapsed:>10.3f} {elapsed / args.files * 1e6:>10.1f} {peak_bytes / 1024:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Check the import time of `bioreport` against a budget.
+
+Runs `python -X importtime -c "import bioreport"` in fresh interpreters and reads the cumulative import time of `bioreport` from the report. Also checks that none of the slow dependencies, i.e. pandas and rich, are imported: they must only be loaded on first use. Exits with status 1 if the best time exceeds the budget or a slow dependency is imported.
+
+Usage::
+
+    python benchmarks/bench_import.py --budget-ms 50 --runs 10
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+
+SLOW_MODULES: tuple[str, ...] = ("pandas", "numpy", "rich", "bs4", "pyarrow")
+# i.e. "import time:       552 |       4857 |   hashlib"
+_IMPORTTIME_REGEX: re.Pattern = re.compile(
+    r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s*)(?P<module>\S+)$"
+)
+
+
+def measure_import(statement: str = "import bioreport") -> tuple[float, list[str]]:
+    """
+    Run a statement in a fresh interpreter with `-X importtime`.
+
+    Parameters
+    ----------
+    statement : str, default "import bioreport"
+        The statement to run.
+
+    Returns
+    -------
+    import_ms : float
+        The cumulative import time of the top-level `bioreport` package in milliseconds.
+    module_names : list[str]
+        The names of all the modules imported, in order.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_ms: float = 0.0
+    module_name_list: list[str] = []
+    for line in completed.stderr.splitlines():
+        line_match: re.Match | None = _IMPORTTIME_REGEX.match(line)
+        if line_match is None:
+            continue
+        module_name_list.append(line_match["module"])
+        if line_match["module"] == "bioreport":
+            import_ms = int(line_match["cumulative"]) / 1000
+    return import_ms, module_name_list
+
+
+def main() -> None:
+    """Measure the import time and exit with status 1 if the budget is exceeded."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    import_ms_list: list[float] = []
+    module_name_list: list[str] = []
+    for _ in range(args.runs):
+        import_ms, module_name_list = measure_import()
+        import_ms_list.append(import_ms)
+    best_ms: float = min(import_ms_list)
+    slow_module_list: list[str] = sorted(
+        {m.split(".")[0] for m in module_name_list} & set(SLOW_MODULES)
+    )
+
+    print(f"import bioreport: best {best_ms:.1f} ms, worst {max(import_ms_list):.1f} ms, budget {args.budget_ms:.1f} ms")
+    print(f"modules imported: {len(module_name_list)}")
+    failed: bool = False
+    if best_ms > args.budget_ms:
+        print(f"FAIL: import time over budget by {best_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if slow_module_list:
+        print(f"FAIL: slow modules imported eagerly: {', '.join(slow_module_list)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark `bioreport.scan_dir` on flat directories of increasing size.
+
+The time per file should stay roughly constant as the number of files in a single directory grows, i.e. the scan is linear in the number of files.
+
+Usage::
+
+    python benchmarks/bench_scan_dir.py --sizes 1000 2000 4000 8000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import bioreport
+
+_FASTP_JSON_HEADER: str = '{\n\t"summary": {\n\t\t"before_filtering": {\n\t\t\t"total_reads":1000,\n'
+_BISMARK_DEDUPLICATE_HEADER: str = (
+    "\nTotal number of alignments analysed in sample.bam:\t1000\n"
+)
+
+
+def make_flat_dir(dir_path: Path, file_num: int, report_ratio: float = 0.1) -> None:
+    """
+    Fill a directory with `file_num` files, a fraction of which are reports.
+
+    Parameters
+    ----------
+    dir_path : Path
+        The directory to fill.
+    file_num : int
+        The total number of files to write.
+    report_ratio : float, default 0.1
+        The fraction of files that are reports.
+    """
+    report_every: int = max(1, round(1 / report_ratio))
+    for i in range(file_num):
+        if i % report_every == 0:
+            (dir_path / f"sample_{i}.json").write_text(_FASTP_JSON_HEADER)
+        elif i % report_every == 1:
+            (dir_path / f"sample_{i}.deduplication_report.txt").write_text(
+                _BISMARK_DEDUPLICATE_HEADER
+            )
+        else:
+            (dir_path / f"sample_{i}.log").write_text("noise\n")
+
+
+def main() -> None:
+    """Run the benchmark and print the time per file for each size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'files':>8} {'seconds':>10} {'us/file':>10}")
+    for file_num in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dir_path = Path(tmp_dir)
+            make_flat_dir(dir_path, file_num)
+            start: float = time.perf_counter()
+            bioreport.scan_dir(dir_path)
+            elapsed: float = time.perf_counter() - start
+        print(f"{file_num:>8} {elapsed:>10.3f} {elapsed / file_num * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
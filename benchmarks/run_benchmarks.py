@@ -0,0 +1,224 @@
+"""
+Benchmark each stage of the pipeline on synthetic report trees.
+
+Measures the time of `import bioreport` in a fresh interpreter, see `bench_import.py`. Then writes a tree with `synthetic.make_report_tree` for each size and times the stages in order:
+
+- generate: writing the tree.
+- scan: `scan_dir`, serial and with `--workers` threads.
+- match: `Report.match_file` on every file of the tree, without walking.
+- parse: `Report.parse` of the reports of each submodule.
+- concat: `ReportTable.concat_by_module` of all the parsed reports.
+
+Each stage runs in a fresh child process, so the peak resident memory reported is that of the stage, on top of the memory of an interpreter with `bioreport` imported, and pandas and the parsers from the parse stages on. The tree is written in a temporary directory, removed afterward, unless `--dir` is given. Runs offline with the standard library only.
+
+Usage::
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 --json results.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from bench_import import measure_import
+from synthetic import make_report_tree
+
+import bioreport
+from bioreport import _registry
+from bioreport.report import Report
+
+# the result of a stage: the number of items processed and a value passed to the next stages
+StageOutput = tuple[int, Any]
+
+
+def _run_stage(stage: Callable[..., StageOutput], *args: Any) -> tuple[float, int, int, Any]:
+    """Run a stage in the child process, return its time, item count, peak RSS in bytes and value."""
+    start: float = time.perf_counter()
+    item_num, value = stage(*args)
+    elapsed: float = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return elapsed, item_num, peak_rss, value
+
+
+def measure(stage: Callable[..., StageOutput], *args: Any) -> tuple[float, int, int, Any]:
+    """
+    Run a stage in a fresh child process.
+
+    Parameters
+    ----------
+    stage : Callable[..., StageOutput]
+        The stage, returning the number of items processed and a value.
+    *args : Any
+        The arguments of the stage, inherited by the forked child.
+
+    Returns
+    -------
+    elapsed : float
+        The wall time of the stage in seconds.
+    item_num : int
+        The number of items processed.
+    peak_rss : int
+        The peak resident memory of the child process in bytes.
+    value : Any
+        The value returned by the stage.
+    """
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        return executor.submit(_run_stage, stage, *args).result()
+
+
+def _generate(root: Path, file_num: int, cycle_num: int) -> StageOutput:
+    file_num_dict: dict[str, int] = make_report_tree(root, file_num, cycle_num=cycle_num)
+    return sum(file_num_dict.values()), file_num_dict
+
+
+def _scan(root: Path, workers: int) -> StageOutput:
+    report_list: list[Report] = bioreport.scan_dir(root, workers=workers)
+    # paths and modules pickle much faster than reports
+    return _file_num(root), [(str(r.path), r.module) for r in report_list]
+
+
+def _match(file_path_list: list[str]) -> StageOutput:
+    match_num: int = 0
+    for file_path in file_path_list:
+        if Report.match_file(file_path) is not None:
+            match_num += 1
+    return len(file_path_list), match_num
+
+
+def _parse(report_item_list: list[tuple[str, tuple[str, ...]]]) -> StageOutput:
+    for file_path, module in report_item_list:
+        Report(path=file_path, module=module).parse()
+    return len(report_item_list), None
+
+
+def _concat(report_item_list: list[tuple[str, tuple[str, ...]]]) -> StageOutput:
+    # parsing is timed by the parse stages, only the tables are timed here
+    report_table: bioreport.ReportTable = bioreport.ReportTable(
+        Report(path=file_path, module=module).parse()
+        for file_path, module in report_item_list
+    )
+    start: float = time.perf_counter()
+    report_table.concat_by_module()
+    return len(report_item_list), time.perf_counter() - start
+
+
+def _file_num(root: Path) -> int:
+    return sum(len(file_names) for _, _, file_names in os.walk(root))
+
+
+def _list_files(root: Path) -> list[str]:
+    return [
+        os.path.join(dir_path, file_name)
+        for dir_path, _, file_names in os.walk(root)
+        for file_name in file_names
+    ]
+
+
+def run(root: Path, file_num: int, cycle_num: int, workers: int) -> list[dict]:
+    """
+    Benchmark all the stages on a tree.
+
+    Parameters
+    ----------
+    root : Path
+        The root directory of the tree, written if missing.
+    file_num : int
+        The number of files of the tree.
+    cycle_num : int
+        The number of cycles of the fastp curves.
+    workers : int
+        The number of threads of the parallel scan.
+
+    Returns
+    -------
+    result_list : list[dict]
+        A result per stage, with the keys "files", "stage", "seconds", "items", "items_per_second" and "peak_rss_mib".
+    """
+    result_list: list[dict] = []
+
+    def _record(stage_name: str, elapsed: float, item_num: int, peak_rss: int) -> None:
+        result: dict = {
+            "files": file_num,
+            "stage": stage_name,
+            "seconds": round(elapsed, 4),
+            "items": item_num,
+            "items_per_second": round(item_num / elapsed, 1) if elapsed > 0 else None,
+            "peak_rss_mib": round(peak_rss / 2**20, 1),
+        }
+        result_list.append(result)
+        print(
+            f"{file_num:>8} {stage_name:>28} {elapsed:>10.3f} {item_num:>8} {result['items_per_second'] or 0:>12.0f} {result['peak_rss_mib']:>10.1f}",
+            flush=True,
+        )
+
+    if not root.exists():
+        elapsed, item_num, peak_rss, _ = measure(_generate, root, file_num, cycle_num)
+        _record("generate", elapsed, item_num, peak_rss)
+
+    report_item_list: list[tuple[str, tuple[str, ...]]] = []
+    for stage_name, scan_workers in (("scan", 1), (f"scan workers={workers}", workers)):
+        elapsed, item_num, peak_rss, report_item_list = measure(_scan, root, scan_workers)
+        _record(stage_name, elapsed, item_num, peak_rss)
+
+    elapsed, item_num, peak_rss, _ = measure(_match, _list_files(root))
+    _record("match", elapsed, item_num, peak_rss)
+
+    module_item_dict: dict[tuple[str, ...], list[tuple[str, tuple[str, ...]]]] = {}
+    for report_item in report_item_list:
+        module_item_dict.setdefault(report_item[1], []).append(report_item)
+    for module in module_item_dict:
+        # import the parsers and pandas before forking, so that the parse stages do not time the imports
+        _registry.get_module(module[0])
+    for module, module_item_list in module_item_dict.items():
+        elapsed, item_num, peak_rss, _ = measure(_parse, module_item_list)
+        _record(f"parse {'-'.join(module)}", elapsed, item_num, peak_rss)
+
+    _, item_num, peak_rss, elapsed = measure(_concat, report_item_list)
+    _record("concat", elapsed, item_num, peak_rss)
+    return result_list
+
+
+def main() -> None:
+    """Run the benchmarks and print the time, throughput and peak memory of each stage."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--cycles", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--dir", type=Path, help="keep the trees in this directory, reused by later runs"
+    )
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    print(f"{'files':>8} {'stage':>28} {'seconds':>10} {'items':>8} {'items/s':>12} {'peak MiB':>10}")
+    import_ms, _ = measure_import()
+    print(f"{0:>8} {'import':>28} {import_ms / 1000:>10.3f}")
+    result_list: list[dict] = [
+        {"files": 0, "stage": "import", "seconds": round(import_ms / 1000, 4)}
+    ]
+    for file_num in args.sizes:
+        if args.dir is not None:
+            result_list.extend(
+                run(args.dir / f"tree_{file_num}", file_num, args.cycles, args.workers)
+            )
+            continue
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result_list.extend(
+                run(Path(tmp_dir) / "tree", file_num, args.cycles, args.workers)
+            )
+    if args.json is not None:
+        args.json.write_text(json.dumps(result_list, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
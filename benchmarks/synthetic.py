@@ -0,0 +1,568 @@
+"""
+Generate synthetic report trees for benchmarks.
+
+Writes realistic fastp json/html, bismark align/deduplicate and bowtie2 paired/unpaired reports, mixed with files that are not reports, into a tree of sample directories. The values are random but consistent, i.e. the reads after filtering are fewer than before. Everything is generated locally from a seed.
+
+Usage::
+
+    python benchmarks/synthetic.py /tmp/report_tree --files 10000
+"""
+
+import argparse
+import itertools
+import json
+import random
+from pathlib import Path
+
+REPORT_TYPES: tuple[str, ...] = (
+    "fastp-json",
+    "fastp-html",
+    "bismark-align",
+    "bismark-deduplicate",
+    "bowtie2-paired",
+    "bowtie2-unpaired",
+)
+NOISE_TYPES: tuple[str, ...] = (
+    "fastq",
+    "bam",
+    "log",
+    "json",
+    "tsv",
+    "sh",
+)
+
+
+def make_fastp_json(cycle_num: int = 150, seed: int = 0) -> str:
+    """
+    Build the text of a paired-end fastp JSON report, formatted like fastp.
+
+    Parameters
+    ----------
+    cycle_num : int, default 150
+        The number of cycles of the curves of each read.
+    seed : int, default 0
+        The seed of the random values.
+
+    Returns
+    -------
+    fastp_json : str
+        The JSON text.
+    """
+    rng: random.Random = random.Random(seed)
+    total_reads: int = rng.randrange(1_000_000, 50_000_000)
+    passed_reads: int = int(total_reads * rng.uniform(0.9, 0.99))
+
+    def _stats(read_num: int) -> dict:
+        return {
+            "total_reads": read_num,
+            "total_bases": read_num * cycle_num,
+            "q20_bases": read_num * cycle_num * 95 // 100,
+            "q30_bases": read_num * cycle_num * 89 // 100,
+            "q20_rate": round(rng.uniform(0.93, 0.97), 6),
+            "q30_rate": round(rng.uniform(0.85, 0.92), 6),
+            "read1_mean_length": cycle_num,
+            "read2_mean_length": cycle_num,
+            "gc_content": round(rng.uniform(0.38, 0.52), 6),
+        }
+
+    def _read_stats() -> dict:
+        return {
+            "total_reads": total_reads // 2,
+            "total_cycles": cycle_num,
+            "total_bases": total_reads // 2 * cycle_num,
+            "q20_bases": total_reads // 2 * cycle_num * 95 // 100,
+            "q30_bases": total_reads // 2 * cycle_num * 89 // 100,
+            "quality_curves": {
+                base: [round(rng.uniform(30, 38), 2) for _ in range(cycle_num)]
+                for base in ("A", "T", "C", "G", "mean")
+            },
+            "content_curves": {
+                base: [round(rng.uniform(0.2, 0.3), 6) for _ in range(cycle_num)]
+                for base in ("A", "T", "C", "G", "N", "GC")
+            },
+            "kmer_count": {
+                "".join(kmer): rng.randrange(100_000)
+                for kmer in itertools.product("ACGT", repeat=5)
+            },
+            "overrepresented_sequences": {
+                "".join(rng.choice("ACGT") for _ in range(50)): rng.randrange(10_000)
+                for _ in range(10)
+            },
+        }
+
+    fastp_dict: dict = {
+        "summary": {
+            "before_filtering": _stats(total_reads),
+            "after_filtering": _stats(passed_reads),
+        },
+        "filtering_result": {
+            "passed_filter_reads": passed_reads,
+            "low_quality_reads": (total_reads - passed_reads) * 8 // 10,
+            "too_many_N_reads": (total_reads - passed_reads) // 10,
+            "too_short_reads": (total_reads - passed_reads)
+            - (total_reads - passed_reads) * 8 // 10
+            - (total_reads - passed_reads) // 10,
+            "too_long_reads": 0,
+        },
+        "duplication": {
+            "rate": round(rng.uniform(0.05, 0.3), 6),
+            "histogram": [rng.randrange(1_000_000) for _ in range(32)],
+            "mean_gc": [round(rng.uniform(0.3, 0.6), 6) for _ in range(32)],
+        },
+        "insert_size": {
+            "peak": rng.randrange(150, 300),
+            "unknown": rng.randrange(100_000),
+            "histogram": [rng.randrange(100_000) for _ in range(272)],
+        },
+        "read1_before_filtering": _read_stats(),
+        "read2_before_filtering": _read_stats(),
+        "read1_after_filtering": _read_stats(),
+        "read2_after_filtering": _read_stats(),
+        "command": "fastp -i R1.fq.gz -I R2.fq.gz -o out.R1.fq.gz -O out.R2.fq.gz",
+    }
+    return _fastp_json_dumps(fastp_dict, 0) + "\n"
+
+
+def _fastp_json_dumps(value: object, level: int) -> str:
+    """Serialize like fastp: objects on several lines, `"key":value` for scalars and arrays."""
+    if not isinstance(value, dict):
+        return json.dumps(value, separators=(",", ":"))
+    indent: str = "\t" * (level + 1)
+    item_list: list[str] = []
+    for key, item in value.items():
+        separator: str = ": " if isinstance(item, dict) else ":"
+        item_list.append(
+            f"{indent}{json.dumps(key)}{separator}{_fastp_json_dumps(item, level + 1)}"
+        )
+    return "{\n" + ",\n".join(item_list) + "\n" + "\t" * level + "}"
+
+
+def make_fastp_html(cycle_num: int = 150, seed: int = 0) -> str:
+    """
+    Build the text of a paired-end fastp html report, with the summary tables followed by plot sections holding their data inline.
+
+    Parameters
+    ----------
+    cycle_num : int, default 150
+        The number of cycles of the curves of each plot.
+    seed : int, default 0
+        The seed of the random values.
+
+    Returns
+    -------
+    fastp_html : str
+        The html text.
+    """
+    rng: random.Random = random.Random(seed)
+    total_reads: float = rng.uniform(1, 50)
+
+    def _table(row_list: list[tuple[str, str]]) -> str:
+        return (
+            "<table class='summary_table'>\n"
+            + "".join(
+                f"<tr><td class='col1'>{key}:</td><td class='col2'>{value}</td></tr>\n"
+                for key, value in row_list
+            )
+            + "</table>\n"
+        )
+
+    def _summary_div(div_id: str, title: str, row_list: list[tuple[str, str]]) -> str:
+        return (
+            f"<div class='subsection_title' onclick=showOrHide('{div_id}')>{title}</div>\n"
+            f"<div id='{div_id}'>\n{_table(row_list)}</div>\n"
+        )
+
+    def _plot_section(plot_id: str) -> str:
+        curve_list: list[str] = [
+            "{x:["
+            + ",".join(map(str, range(1, cycle_num + 1)))
+            + "],y:["
+            + ",".join(f"{rng.uniform(20, 40):.2f}" for _ in range(cycle_num))
+            + f"],name:'{base}',mode:'lines'}}"
+            for base in ("A", "T", "C", "G", "mean")
+        ]
+        return (
+            f"<div class='section_div'><div class='section_title'><a name='{plot_id}'>{plot_id}</a></div>\n"
+            f"<div class='figure' id='plot_{plot_id}'></div>\n"
+            f"<script type=\"text/javascript\">\nvar data=[{','.join(curve_list)}];\n"
+            f"Plotly.newPlot('plot_{plot_id}', data, {{title:'{plot_id}'}});\n</script>\n</div>\n"
+        )
+
+    read_stats: list[tuple[str, str]] = [
+        ("total reads", f"{total_reads:.6f} M"),
+        ("total bases", f"{total_reads * cycle_num:.6f} M"),
+        ("Q20 bases", f"{total_reads * cycle_num * 0.95:.6f} M (95.0%)"),
+        ("Q30 bases", f"{total_reads * cycle_num * 0.89:.6f} M (89.0%)"),
+        ("GC content", f"{rng.uniform(38, 52):.1f}%"),
+    ]
+    return (
+        '<html><head><meta http-equiv="content-type" content="text/html;charset=utf-8" />'
+        "<title>fastp report at 2024-01-01      12:00:00 </title>"
+        '<script src="http://opengene.org/plotly-1.2.0.min.js"></script>\n'
+        "<style type=\"text/css\">td {border:1px solid #dddddd;padding:5px;font-size:12px;}</style></head>\n"
+        "<body><div id='container'>\n"
+        "<div class='section_div'><div class='section_title' onclick=showOrHide('summary')><a name='summary'>Summary</a></div><div id='summary'>\n"
+        + _summary_div(
+            "general",
+            "General",
+            [
+                ("fastp version", "0.20.1 (<a href='https://github.com/OpenGene/fastp'>https://github.com/OpenGene/fastp</a>)"),
+                ("sequencing", f"paired end ({cycle_num} cycles + {cycle_num} cycles)"),
+                ("mean length before filtering", f"{cycle_num}bp, {cycle_num}bp"),
+                ("mean length after filtering", f"{cycle_num - 1}bp, {cycle_num - 1}bp"),
+                ("duplication rate", f"{rng.uniform(5, 30):.6f}%"),
+                ("Insert size peak (evaluated by paired-end reads)", str(rng.randrange(150, 300))),
+            ],
+        )
+        + _summary_div("before_filtering_summary", "Before filtering", read_stats)
+        + _summary_div("after_filtering_summary", "After filtering", read_stats)
+        + _summary_div(
+            "filtering_result",
+            "Filtering result",
+            [
+                ("reads passed filters", f"{total_reads * 0.95:.6f} M (95.0%)"),
+                ("reads with low quality", f"{total_reads * 40:.6f} K (4.0%)"),
+                ("reads with too many N", f"{rng.randrange(1000)} (0.01%)"),
+                ("reads too short", f"{total_reads * 10:.6f} K (1.0%)"),
+            ],
+        )
+        + "</div></div>\n"
+        + "".join(
+            _plot_section(f"{read}_{stage}_{plot}")
+            for read, stage, plot in itertools.product(
+                ("read1", "read2"),
+                ("before_filtering", "after_filtering"),
+                ("quality", "base_contents", "kmer"),
+            )
+        )
+        + "</div></body></html>\n"
+    )
+
+
+def make_bismark_align(seed: int = 0) -> str:
+    """
+    Build the text of a bismark paired-end alignment report.
+
+    Parameters
+    ----------
+    seed : int, default 0
+        The seed of the random values.
+
+    Returns
+    -------
+    bismark_align : str
+        The report text.
+    """
+    rng: random.Random = random.Random(seed)
+    pair_num: int = rng.randrange(1_000_000, 50_000_000)
+    unique_num: int = int(pair_num * rng.uniform(0.6, 0.8))
+    no_align_num: int = int((pair_num - unique_num) * 0.8)
+    ambiguous_num: int = pair_num - unique_num - no_align_num
+    c_num: int = unique_num * 40
+    methylated: list[int] = [c_num // 25, c_num // 500, c_num // 200, c_num // 10000]
+    unmethylated: list[int] = [c_num // 100, c_num // 4, c_num // 2, c_num // 2000]
+    return (
+        "Bismark report for: R1.fq.gz and R2.fq.gz (version: v0.22.3)\n"
+        "Bismark was run with Bowtie 2 against the bisulfite genome of /ref/ with the specified options: -q --score-min L,0,-0.2 --ignore-quals --no-mixed --no-discordant --dovetail --maxins 500\n"
+        "Option '--directional' specified (default mode): alignments to complementary strands (CTOT, CTOB) were ignored (i.e. not performed)\n\n"
+        "Final Alignment report\n======================\n"
+        f"Sequence pairs analysed in total:\t{pair_num}\n"
+        f"Number of paired-end alignments with a unique best hit:\t{unique_num}\n"
+        f"Mapping efficiency:\t{unique_num / pair_num * 100:.1f}%\n"
+        f"Sequence pairs with no alignments under any condition:\t{no_align_num}\n"
+        f"Sequence pairs did not map uniquely:\t{ambiguous_num}\n"
+        "Sequence pairs which were discarded because genomic sequence could not be extracted:\t0\n\n"
+        "Number of sequence pairs with unique best (first) alignment came from the bowtie output:\n"
+        f"CT/GA/CT:\t{unique_num // 2}\t((converted) top strand)\n"
+        "GA/CT/CT:\t0\t(complementary to (converted) top strand)\n"
+        "GA/CT/GA:\t0\t(complementary to (converted) bottom strand)\n"
+        f"CT/GA/GA:\t{unique_num - unique_num // 2}\t((converted) bottom strand)\n\n"
+        "Number of alignments to (merely theoretical) complementary strands being rejected in total:\t0\n\n"
+        "Final Cytosine Methylation Report\n=================================\n"
+        f"Total number of C's analysed:\t{c_num}\n\n"
+        f"Total methylated C's in CpG context:\t{methylated[0]}\n"
+        f"Total methylated C's in CHG context:\t{methylated[1]}\n"
+        f"Total methylated C's in CHH context:\t{methylated[2]}\n"
+        f"Total methylated C's in Unknown context:\t{methylated[3]}\n\n"
+        f"Total unmethylated C's in CpG context:\t{unmethylated[0]}\n"
+        f"Total unmethylated C's in CHG context:\t{unmethylated[1]}\n"
+        f"Total unmethylated C's in CHH context:\t{unmethylated[2]}\n"
+        f"Total unmethylated C's in Unknown context:\t{unmethylated[3]}\n\n"
+        + "".join(
+            f"C methylated in {context} context:\t{m / (m + u) * 100:.1f}%\n"
+            for context, m, u in zip(
+                ("CpG", "CHG", "CHH", "unknown"), methylated, unmethylated
+            )
+        ).replace("unknown context", "unknown context (CN or CHN)")
+        + "\n\nBismark completed in 0d 2h 5m 3s\n"
+    )
+
+
+def make_bismark_deduplicate(seed: int = 0) -> str:
+    """
+    Build the text of a bismark deduplication report.
+
+    Parameters
+    ----------
+    seed : int, default 0
+        The seed of the random values.
+
+    Returns
+    -------
+    bismark_deduplicate : str
+        The report text.
+    """
+    rng: random.Random = random.Random(seed)
+    alignment_num: int = rng.randrange(1_000_000, 50_000_000)
+    duplicate_num: int = int(alignment_num * rng.uniform(0.05, 0.3))
+    leftover_num: int = alignment_num - duplicate_num
+    return (
+        f"\nTotal number of alignments analysed in sample_{seed}_pe.bam:\t{alignment_num}\n"
+        f"Total number duplicated alignments removed:\t{duplicate_num} ({duplicate_num / alignment_num * 100:.2f}%)\n"
+        f"Duplicated alignments were found at:\t{duplicate_num * 9 // 10} different position(s)\n\n"
+        f"Total count of deduplicated leftover sequences: {leftover_num} ({leftover_num / alignment_num * 100:.2f}% of total)\n"
+    )
+
+
+def make_bowtie2_paired(seed: int = 0) -> str:
+    """
+    Build the text of a bowtie2 alignment summary of paired reads.
+
+    Parameters
+    ----------
+    seed : int, default 0
+        The seed of the random values.
+
+    Returns
+    -------
+    bowtie2_paired : str
+        The summary text.
+    """
+    rng: random.Random = random.Random(seed)
+    pair_num: int = rng.randrange(1_000_000, 50_000_000)
+    concordant_counts: list[int] = _split(rng, pair_num, 3)
+    discordant_num: int = concordant_counts[0] // 20
+    unaligned_pair_num: int = concordant_counts[0] - discordant_num
+    mate_counts: list[int] = _split(rng, unaligned_pair_num * 2, 3)
+    aligned_num: int = pair_num * 2 - mate_counts[0]
+    return (
+        f"{pair_num} reads; of these:\n"
+        f"  {pair_num} (100.00%) were paired; of these:\n"
+        f"    {concordant_counts[0]} ({_percent(concordant_counts[0], pair_num)}) aligned concordantly 0 times\n"
+        f"    {concordant_counts[1]} ({_percent(concordant_counts[1], pair_num)}) aligned concordantly exactly 1 time\n"
+        f"    {concordant_counts[2]} ({_percent(concordant_counts[2], pair_num)}) aligned concordantly >1 times\n"
+        "    ----\n"
+        f"    {concordant_counts[0]} pairs aligned concordantly 0 times; of these:\n"
+        f"      {discordant_num} ({_percent(discordant_num, concordant_counts[0])}) aligned discordantly 1 time\n"
+        "    ----\n"
+        f"    {unaligned_pair_num} pairs aligned 0 times concordantly or discordantly; of these:\n"
+        f"      {unaligned_pair_num * 2} mates make up the pairs; of these:\n"
+        f"        {mate_counts[0]} ({_percent(mate_counts[0], unaligned_pair_num * 2)}) aligned 0 times\n"
+        f"        {mate_counts[1]} ({_percent(mate_counts[1], unaligned_pair_num * 2)}) aligned exactly 1 time\n"
+        f"        {mate_counts[2]} ({_percent(mate_counts[2], unaligned_pair_num * 2)}) aligned >1 times\n"
+        f"{_percent(aligned_num, pair_num * 2)} overall alignment rate\n"
+    )
+
+
+def make_bowtie2_unpaired(seed: int = 0) -> str:
+    """
+    Build the text of a bowtie2 alignment summary of unpaired reads.
+
+    Parameters
+    ----------
+    seed : int, default 0
+        The seed of the random values.
+
+    Returns
+    -------
+    bowtie2_unpaired : str
+        The summary text.
+    """
+    rng: random.Random = random.Random(seed)
+    read_num: int = rng.randrange(1_000_000, 50_000_000)
+    counts: list[int] = _split(rng, read_num, 3)
+    return (
+        f"{read_num} reads; of these:\n"
+        f"  {read_num} (100.00%) were unpaired; of these:\n"
+        f"    {counts[0]} ({_percent(counts[0], read_num)}) aligned 0 times\n"
+        f"    {counts[1]} ({_percent(counts[1], read_num)}) aligned exactly 1 time\n"
+        f"    {counts[2]} ({_percent(counts[2], read_num)}) aligned >1 times\n"
+        f"{_percent(read_num - counts[0], read_num)} overall alignment rate\n"
+    )
+
+
+def _split(rng: random.Random, total: int, part_num: int) -> list[int]:
+    """Split a total into random parts, the first one being the smallest on average."""
+    weight_list: list[float] = [rng.uniform(0.02, 0.1)] + [
+        rng.uniform(0.3, 1) for _ in range(part_num - 1)
+    ]
+    part_list: list[int] = [int(total * w / sum(weight_list)) for w in weight_list]
+    part_list[-1] += total - sum(part_list)
+    return part_list
+
+
+def _percent(part: int, total: int) -> str:
+    return f"{part / total * 100:.2f}%"
+
+
+def _write_noise(file_path: Path, noise_type: str, rng: random.Random) -> Path:
+    """Write a file that is not a report and return its path."""
+    match noise_type:
+        case "fastq":
+            file_path = file_path.with_suffix(".fq.gz")
+            file_path.write_bytes(b"\x1f\x8b\x08\x00" + rng.randbytes(4096))
+        case "bam":
+            file_path = file_path.with_suffix(".bam")
+            file_path.write_bytes(
+                b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00"
+                + rng.randbytes(4096)
+            )
+        case "log":
+            file_path = file_path.with_suffix(".log")
+            file_path.write_text(
+                "".join(
+                    f"[2024-01-01 12:00:{i % 60:02d}] step {i} done\n" for i in range(50)
+                )
+            )
+        case "json":
+            file_path = file_path.with_suffix(".json")
+            file_path.write_text(json.dumps({"sample": file_path.stem, "lane": 1}))
+        case "tsv":
+            file_path = file_path.with_suffix(".tsv")
+            file_path.write_text(
+                "".join(f"chr1\t{i * 100}\t{rng.random():.4f}\n" for i in range(100))
+            )
+        case _:
+            file_path = file_path.with_suffix(".sh")
+            file_path.write_text("#!/bin/bash\nset -euo pipefail\necho done\n")
+    return file_path
+
+
+def make_report_tree(  # noqa: PLR0913  keyword-only shape options of the generated tree, all with defaults
+    root: str | Path,
+    file_num: int,
+    *,
+    noise_ratio: float = 0.5,
+    samples_per_dir: int = 100,
+    cycle_num: int = 150,
+    seed: int = 0,
+) -> dict[str, int]:
+    """
+    Write a tree of reports and files that are not reports.
+
+    The files of a sample are written in `batch_<i>/sample_<j>/`, the report types cycle in the order of `REPORT_TYPES`. Distinct report contents are generated for the first samples and reused, so large trees are fast to write.
+
+    Parameters
+    ----------
+    root : str | Path
+        The root directory of the tree, created if missing.
+    file_num : int
+        The total number of files to write.
+    noise_ratio : float, default 0.5
+        The fraction of the files that are not reports.
+    samples_per_dir : int, default 100
+        The number of sample directories per batch directory.
+    cycle_num : int, default 150
+        The number of cycles of the fastp curves. Lower it to write smaller trees.
+    seed : int, default 0
+        The seed of the random values.
+
+    Returns
+    -------
+    file_num_dict : dict[str, int]
+        The number of files written per report type, and "noise" for the files that are not reports.
+    """
+    root_path: Path = Path(root)
+    rng: random.Random = random.Random(seed)
+    content_cache: dict[tuple[str, int], str] = {}
+    distinct_content_num: int = 16
+
+    def _content(report_type: str, index: int) -> str:
+        content_seed: int = seed * distinct_content_num + index % distinct_content_num
+        cache_key: tuple[str, int] = (report_type, content_seed)
+        if cache_key not in content_cache:
+            match report_type:
+                case "fastp-json":
+                    content = make_fastp_json(cycle_num, content_seed)
+                case "fastp-html":
+                    content = make_fastp_html(cycle_num, content_seed)
+                case "bismark-align":
+                    content = make_bismark_align(content_seed)
+                case "bismark-deduplicate":
+                    content = make_bismark_deduplicate(content_seed)
+                case "bowtie2-paired":
+                    content = make_bowtie2_paired(content_seed)
+                case _:
+                    content = make_bowtie2_unpaired(content_seed)
+            content_cache[cache_key] = content
+        return content_cache[cache_key]
+
+    file_name_dict: dict[str, str] = {
+        "fastp-json": "{s}.fastp.json",
+        "fastp-html": "{s}.fastp.html",
+        "bismark-align": "{s}_R1_bismark_bt2_PE_report.txt",
+        "bismark-deduplicate": "{s}_R1_bismark_bt2_pe.deduplication_report.txt",
+        "bowtie2-paired": "{s}.bowtie2.log",
+        "bowtie2-unpaired": "{s}.se.bowtie2.txt",
+    }
+    file_num_dict: dict[str, int] = {t: 0 for t in (*REPORT_TYPES, "noise")}
+    files_per_sample: int = len(REPORT_TYPES) * 2
+    report_ratio: float = 1 - noise_ratio
+    file_index: int = 0
+    report_index: int = 0
+    noise_index: int = 0
+    sample_index: int = 0
+    while file_index < file_num:
+        sample_name: str = f"sample_{sample_index}"
+        sample_dir_path: Path = (
+            root_path / f"batch_{sample_index // samples_per_dir}" / sample_name
+        )
+        sample_dir_path.mkdir(parents=True, exist_ok=True)
+        for file_index in range(file_index, min(file_index + files_per_sample, file_num)):
+            # spread the reports evenly among the files, so that every sample gets both
+            if int((file_index + 1) * report_ratio) > int(file_index * report_ratio):
+                report_type: str = REPORT_TYPES[report_index % len(REPORT_TYPES)]
+                file_name: str = file_name_dict[report_type].format(
+                    s=f"{sample_name}_{report_index}"
+                )
+                (sample_dir_path / file_name).write_text(
+                    _content(report_type, report_index // len(REPORT_TYPES))
+                )
+                file_num_dict[report_type] += 1
+                report_index += 1
+            else:
+                _write_noise(
+                    sample_dir_path / f"{sample_name}_noise_{noise_index}",
+                    NOISE_TYPES[noise_index % len(NOISE_TYPES)],
+                    rng,
+                )
+                file_num_dict["noise"] += 1
+                noise_index += 1
+        file_index += 1
+        sample_index += 1
+    return file_num_dict
+
+
+def main() -> None:
+    """Write a tree and print the number of files per type."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--noise-ratio", type=float, default=0.5)
+    parser.add_argument("--cycles", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    file_num_dict: dict[str, int] = make_report_tree(
+        args.root,
+        args.files,
+        noise_ratio=args.noise_ratio,
+        cycle_num=args.cycles,
+        seed=args.seed,
+    )
+    for file_type, type_file_num in file_num_dict.items():
+        print(f"{file_type:>20} {type_file_num:>8}")
+
+
+if __name__ == "__main__":
+    main()
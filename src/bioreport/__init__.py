@@ -4,16 +4,108 @@ bioreport
 =========
 
 Bioreport is a Python package for parsing and searching reports generated by bioinformatics programmes.
+
+The public objects are imported on first access, so that `import bioreport` stays fast and does not import pandas or rich.
 """
 
 __version__ = "1.1.5"
 
-from .report import Report
-from .report_sum import ReportSum
-from .search import scan_dir
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ._base_module import BaseModule
+    from ._walk import WalkOptions
+    from .batch import (
+        BatchParseResult,
+        ParseFailure,
+        aparse_all,
+        iter_parse_all,
+        parse_all,
+        scan_and_parse,
+    )
+    from .cache import ParseCache
+    from .classifier import ReportClassifier
+    from .export import ReportWriter, export_reports
+    from .report import Report
+    from .report_sum import ArrayStack, ReportSum, ReportTable
+    from .schema import ReportSchema
+    from .search import ascan_dir, iter_match_files, iter_scan_dir, scan_dir
+    from .shard import merge_shards, parse_shard
+    from .snapshot import ScanDiff, incremental_scan_dir
+    from .stats import ScanStats, collect_stats
+
+# the submodule of each public object
+_LAZY_OBJECT_DICT: dict[str, str] = {
+    "ArrayStack": ".report_sum",
+    "BaseModule": "._base_module",
+    "BatchParseResult": ".batch",
+    "ParseCache": ".cache",
+    "ParseFailure": ".batch",
+    "Report": ".report",
+    "ReportClassifier": ".classifier",
+    "ReportSchema": ".schema",
+    "ReportSum": ".report_sum",
+    "ReportTable": ".report_sum",
+    "ReportWriter": ".export",
+    "ScanDiff": ".snapshot",
+    "ScanStats": ".stats",
+    "WalkOptions": "._walk",
+    "aparse_all": ".batch",
+    "ascan_dir": ".search",
+    "collect_stats": ".stats",
+    "export_reports": ".export",
+    "incremental_scan_dir": ".snapshot",
+    "iter_match_files": ".search",
+    "iter_parse_all": ".batch",
+    "iter_scan_dir": ".search",
+    "merge_shards": ".shard",
+    "parse_all": ".batch",
+    "parse_shard": ".shard",
+    "scan_and_parse": ".batch",
+    "scan_dir": ".search",
+}
 
 __all__: list[str] = [
+    "ArrayStack",
+    "BaseModule",
+    "BatchParseResult",
+    "ParseCache",
+    "ParseFailure",
     "Report",
+    "ReportClassifier",
+    "ReportSchema",
     "ReportSum",
+    "ReportTable",
+    "ReportWriter",
+    "ScanDiff",
+    "ScanStats",
+    "WalkOptions",
+    "aparse_all",
+    "ascan_dir",
+    "collect_stats",
+    "export_reports",
+    "incremental_scan_dir",
+    "iter_match_files",
+    "iter_parse_all",
+    "iter_scan_dir",
+    "merge_shards",
+    "parse_all",
+    "parse_shard",
+    "scan_and_parse",
     "scan_dir",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public object from its submodule on first access."""
+    submodule_name: str | None = _LAZY_OBJECT_DICT.get(name)
+    if submodule_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value: Any = getattr(import_module(submodule_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,7 @@
+"""Run the command line interface with `python -m bioreport`."""
+
+import sys
+
+from bioreport.cli import main
+
+sys.exit(main())
@@ -0,0 +1,48 @@
+"""Run blocking file I/O from asyncio coroutines."""
+
+import asyncio
+import contextvars
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+DEFAULT_CONCURRENCY: int = 64
+
+
+def check_concurrency(concurrency: int) -> None:
+    """Raise `ValueError` if the concurrency limit is not a positive integer."""
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be a positive integer: {concurrency}")
+
+
+@asynccontextmanager
+async def thread_pool(
+    executor: Executor | None, concurrency: int
+) -> AsyncIterator[Executor]:
+    """Yield the executor, or a new pool of `concurrency` threads shut down on exit."""
+    if executor is not None:
+        yield executor
+        return
+    pool: ThreadPoolExecutor = ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="bioreport"
+    )
+    try:
+        yield pool
+    finally:
+        # the tasks are done or cancelled, do not block the event loop joining the threads
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_blocking(
+    executor: Executor | None,
+    semaphore: asyncio.Semaphore | None,
+    function: Callable[..., Any],
+    *args: Any,
+) -> Any:
+    """Run a blocking function in an executor, at most as many at once as the semaphore allows. The function runs in a copy of the current context, so that it records into the statistics collector."""
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    context: contextvars.Context = contextvars.copy_context()
+    if semaphore is None:
+        return await loop.run_in_executor(executor, context.run, function, *args)
+    async with semaphore:
+        return await loop.run_in_executor(executor, context.run, function, *args)
@@ -0,0 +1,338 @@
+"""Read the members of tar and zip archives without extracting them."""
+
+import io
+import lzma
+import os
+import tarfile
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path, PurePosixPath
+from typing import IO, TYPE_CHECKING, Any, Iterator, Literal, Self
+
+if TYPE_CHECKING:
+    from bioreport.classifier import ReportClassifier
+
+ArchiveFormat = Literal["tar", "zip"]
+# "tar" archives are read at random, compressed ones as a stream
+_ARCHIVE_SUFFIX_DICT: dict[str, ArchiveFormat] = {
+    ".tar": "tar",
+    ".tar.gz": "tar",
+    ".tgz": "tar",
+    ".tar.bz2": "tar",
+    ".tbz2": "tar",
+    ".tbz": "tar",
+    ".tar.xz": "tar",
+    ".txz": "tar",
+    ".zip": "zip",
+}
+# the errors of unreadable, corrupted or truncated archives
+ARCHIVE_ERRORS: tuple[type[Exception], ...] = (
+    tarfile.TarError,
+    zipfile.BadZipFile,
+    OSError,
+    EOFError,
+    zlib.error,
+    lzma.LZMAError,
+)
+_MAX_OPEN_ARCHIVE_NUM: int = 4  # number of archives kept open by each process
+
+
+def archive_format(file_name: str) -> ArchiveFormat | None:
+    """Return the format of an archive from the suffix of its name, `None` if the file is not an archive."""
+    lower_file_name: str = file_name.lower()
+    for suffix, format in _ARCHIVE_SUFFIX_DICT.items():
+        if lower_file_name.endswith(suffix) and len(lower_file_name) > len(suffix):
+            return format
+    return None
+
+
+def iter_member_modules(
+    archive_path: Path, classifier: "ReportClassifier"
+) -> Iterator[tuple[str, tuple[str, ...]]]:
+    """
+    Classify the regular members of an archive, reading it once in archive order.
+
+    Parameters
+    ----------
+    archive_path : Path
+        The archive.
+    classifier : ReportClassifier
+        The classifier, checking the name and the header of each member.
+
+    Yields
+    ------
+    member : str
+        The name of the member in the archive, i.e. "qc/sample.json".
+    module : tuple[str, ...]
+        The module of the member. `()` if no pattern matches.
+    """
+    if archive_format(archive_path.name) == "zip":
+        with zipfile.ZipFile(archive_path) as zip_file:
+            for zip_info in zip_file.infolist():
+                if zip_info.is_dir():
+                    continue
+                yield zip_info.filename, classifier.classify_stream(
+                    PurePosixPath(zip_info.filename).name,
+                    partial(zip_file.open, zip_info),
+                    label=member_label(archive_path, zip_info.filename),
+                )
+        return
+    # stream mode reads a compressed tar once, each member can be read while it is the current one
+    with tarfile.open(archive_path, "r|*") as tar_file:
+        for tar_info in tar_file:
+            if not tar_info.isfile():
+                continue
+            yield tar_info.name, classifier.classify_stream(
+                PurePosixPath(tar_info.name).name,
+                partial(tar_file.extractfile, tar_info),
+                label=member_label(archive_path, tar_info.name),
+            )
+
+
+def classify_member(
+    archive_path: Path, member: str, classifier: "ReportClassifier"
+) -> tuple[str, ...]:
+    """Classify a single member of an archive, see `open_member`. `()` if the member is missing or the archive cannot be read."""
+    try:
+        return classifier.classify_stream(
+            PurePosixPath(member).name,
+            partial(open_member, archive_path, member),
+            label=member_label(archive_path, member),
+        )
+    except ARCHIVE_ERRORS:
+        return tuple()
+
+
+def member_label(archive_path: Path, member: str) -> str:
+    """Return the path of a member in messages, i.e. "/data/qc.tar.gz:qc/sample.json"."""
+    return f"{str(archive_path)}:{member}"
+
+
+@contextmanager
+def open_member(archive_path: Path, member: str) -> Iterator[IO[bytes]]:
+    """
+    Open a member of an archive as a binary file.
+
+    The archives are kept open by each process, and their index is read once. Members of zip and uncompressed tar archives are read at random. Compressed tar archives are read as a stream, which only goes forward: reading the members in archive order decompresses the archive once.
+
+    Parameters
+    ----------
+    archive_path : Path
+        The archive.
+    member : str
+        The name of the member in the archive.
+
+    Yields
+    ------
+    member_file : IO[bytes]
+        The member. The archive is locked by each read, or until the member is closed for a compressed tar, whose stream is read by a member at a time.
+    """
+    with _locked_handle(archive_path) as handle:
+        if handle.streamed:
+            with handle.open(member) as member_file:
+                yield member_file
+            return
+        member_file = handle.open(member)
+        handle.open_member_num += 1
+    try:
+        with member_file:
+            yield member_file
+    finally:
+        with handle.lock:
+            handle.open_member_num -= 1
+            if handle.closed and handle.open_member_num == 0:
+                handle.close()
+
+
+class _ArchiveHandle:
+    """An open archive, with the state of the file when it was opened."""
+
+    def __init__(self: Self, path: Path, file_state: tuple[int, int, int]) -> None:
+        self.path: Path = path
+        self.file_state: tuple[int, int, int] = file_state
+        self.pid: int = os.getpid()
+        # held by the reads of the members, which share the position of the archive file
+        self.lock: threading.Lock = threading.Lock()
+        self.open_member_num: int = 0
+        # no member is opened once the handle is replaced or evicted
+        self.closed: bool = False
+        self._zip_file: zipfile.ZipFile | None = None
+        self._tar_file: tarfile.TarFile | None = None
+        self._tar_info_dict: dict[str, tarfile.TarInfo] = {}
+        # the stream of a compressed tar and the names of the members already passed
+        self._tar_stream: tarfile.TarFile | None = None
+        self._passed_member_set: set[str] = set()
+
+        if archive_format(path.name) == "zip":
+            self._zip_file = zipfile.ZipFile(path)
+        elif path.name.lower().endswith(".tar"):
+            self._tar_file = tarfile.open(path, "r:")
+            self._tar_info_dict = {
+                tar_info.name: tar_info
+                for tar_info in self._tar_file.getmembers()
+                if tar_info.isfile()
+            }
+        self.streamed: bool = self._zip_file is None and self._tar_file is None
+
+    def __repr__(self: Self) -> str:
+        return f'{self.__class__.__name__}(path: "{str(self.path)}")'
+
+    def open(self: Self, member: str) -> IO[bytes]:
+        """Open a member. Raise `FileNotFoundError` if it is missing."""
+        if self._zip_file is not None:
+            try:
+                return self._zip_file.open(member)
+            except KeyError:
+                raise FileNotFoundError(
+                    f"No such member in archive: {member_label(self.path, member)}"
+                ) from None
+        if self._tar_file is not None:
+            tar_info: tarfile.TarInfo | None = self._tar_info_dict.get(member)
+            member_file: IO[bytes] | None = (
+                None if tar_info is None else self._tar_file.extractfile(tar_info)
+            )
+            if member_file is None:
+                raise FileNotFoundError(
+                    f"No such member in archive: {member_label(self.path, member)}"
+                )
+            # the zip members lock the archive file themselves, the tar members do not
+            return io.BufferedReader(_LockedMember(member_file, self.lock))
+        return self._open_streamed(member)
+
+    def _open_streamed(self: Self, member: str) -> IO[bytes]:
+        """Open a member of a compressed tar, going forward in the stream, or restarting it for a member already passed."""
+        if self._tar_stream is None or member in self._passed_member_set:
+            self._close_stream()
+            self._tar_stream = tarfile.open(self.path, "r|*")
+            self._passed_member_set = set()
+        # not iterating the archive, which yields the members already passed again
+        while (tar_info := self._tar_stream.next()) is not None:
+            self._passed_member_set.add(tar_info.name)
+            if tar_info.name == member and tar_info.isfile():
+                member_file: IO[bytes] | None = self._tar_stream.extractfile(tar_info)
+                if member_file is not None:
+                    return io.BufferedReader(_StreamedMember(member_file))
+        self._close_stream()
+        raise FileNotFoundError(
+            f"No such member in archive: {member_label(self.path, member)}"
+        )
+
+    def close_when_unused(self: Self) -> None:
+        """Stop opening members, and close the archive now or when its last open member is closed."""
+        with self.lock:
+            self.closed = True
+            if self.open_member_num == 0:
+                self.close()
+
+    def _close_stream(self: Self) -> None:
+        if self._tar_stream is not None:
+            self._tar_stream.close()
+        self._tar_stream = None
+
+    def close(self: Self) -> None:
+        for archive_file in (self._zip_file, self._tar_file, self._tar_stream):
+            if archive_file is not None:
+                archive_file.close()
+        self._zip_file = None
+        self._tar_file = None
+        self._tar_stream = None
+
+
+class _StreamedMember(io.RawIOBase):
+    """The member of a tar stream, which cannot seek. The file returned by `extractfile` asks the stream, which cannot tell."""
+
+    def __init__(self: Self, member_file: IO[bytes]) -> None:
+        super().__init__()
+        self._member_file: IO[bytes] = member_file
+
+    def readable(self: Self) -> bool:
+        return True
+
+    def readinto(self: Self, buffer: Any) -> int:
+        return self._member_file.readinto(buffer)
+
+    def tell(self: Self) -> int:
+        return self._member_file.tell()
+
+    def close(self: Self) -> None:
+        self._member_file.close()
+        super().close()
+
+
+class _LockedMember(io.RawIOBase):
+    """The member of a tar archive read at random, holding the lock of the archive during each read, which seeks the archive file before reading it."""
+
+    def __init__(self: Self, member_file: IO[bytes], lock: threading.Lock) -> None:
+        super().__init__()
+        self._member_file: IO[bytes] = member_file
+        self._lock: threading.Lock = lock
+
+    def readable(self: Self) -> bool:
+        return True
+
+    def seekable(self: Self) -> bool:
+        return True
+
+    def readinto(self: Self, buffer: Any) -> int:
+        with self._lock:
+            return self._member_file.readinto(buffer)
+
+    def seek(self: Self, offset: int, whence: int = os.SEEK_SET) -> int:
+        with self._lock:
+            return self._member_file.seek(offset, whence)
+
+    def tell(self: Self) -> int:
+        return self._member_file.tell()
+
+    def close(self: Self) -> None:
+        self._member_file.close()
+        super().close()
+
+
+# the open archives of the process, the most recently used last
+_archive_handle_dict: OrderedDict[Path, _ArchiveHandle] = OrderedDict()
+_archive_handle_lock: threading.Lock = threading.Lock()
+
+
+@contextmanager
+def _locked_handle(archive_path: Path) -> Iterator[_ArchiveHandle]:
+    """Hold the lock of the open archive, getting it again if it was closed while waiting for the lock."""
+    while True:
+        handle: _ArchiveHandle = _archive_handle(archive_path)
+        with handle.lock:
+            if not handle.closed:
+                yield handle
+                return
+
+
+def _archive_handle(archive_path: Path) -> _ArchiveHandle:
+    """Return the open archive, opening it again if the file has changed or the process has been forked."""
+    archive_stat: os.stat_result = archive_path.stat()
+    file_state: tuple[int, int, int] = (
+        archive_stat.st_size,
+        archive_stat.st_mtime_ns,
+        archive_stat.st_ino,
+    )
+    closed_handle_list: list[_ArchiveHandle] = []
+    with _archive_handle_lock:
+        handle: _ArchiveHandle | None = _archive_handle_dict.get(archive_path)
+        if handle is not None:
+            if handle.file_state == file_state and handle.pid == os.getpid():
+                _archive_handle_dict.move_to_end(archive_path)
+                return handle
+            del _archive_handle_dict[archive_path]
+            closed_handle_list.append(handle)
+        handle = _ArchiveHandle(archive_path, file_state)
+        _archive_handle_dict[archive_path] = handle
+        while len(_archive_handle_dict) > _MAX_OPEN_ARCHIVE_NUM:
+            closed_handle_list.append(_archive_handle_dict.popitem(last=False)[1])
+    # closed without the lock of the dict, a member of a compressed tar holds the lock of its archive while it is read
+    for closed_handle in closed_handle_list:
+        # the file of a forked parent must not be closed, its position is shared
+        if closed_handle.pid == os.getpid():
+            closed_handle.close_when_unused()
+    return handle
@@ -1,14 +1,19 @@
 from abc import abstractmethod
-from typing import Self
+from typing import Hashable, Self
+
+from pandas import DataFrame
 
 from bioreport.report import Report
 from bioreport.report_sum import ReportSum
+from bioreport.schema import ReportSchema
 
 
 class BaseModule:
     """
     A base class for all modules. Defines the basic structure of a module.
 
+    A single instance of each module is shared by all the reports parsed in a process, so `parse` must not keep state between calls.
+
     Attributes
     ----------
     name : str
@@ -17,13 +22,29 @@ class BaseModule:
         The submodules of the module. `()` if there are no submodules.
     configs : dict
         The configurations of the module.
+    version : str
+        The version of the parser, part of the keys of `ParseCache`. Change it when the output of `parse` changes.
+    report_pattern : dict[str, dict]
+        The report patterns of a third-party module, in the format of `report_pattern.toml`. The patterns of the built-in modules are in `report_pattern.toml`.
+    schemas : dict[str, ReportSchema]
+        The types of the values of each submodule, used by `ReportSum.concat`. The key of a module without submodules is "". A submodule without schema is not converted.
 
     Methods
     -------
     parse(report: Report, name: str | None = None)
         Parse a report file with the module. Returns the parsed report.
+    extract(report: Report, name: str | None = None) -> list[ReportSum]
+        Parse every summary embedded in a report file, i.e. a log. Returns the parsed summaries.
+    parse_arrays(report: Report) -> dict[Hashable, DataFrame]
+        Parse the array-valued metrics of a report file, i.e. the per-cycle curves.
+    schema(module: tuple[str, ...]) -> ReportSchema | None
+        Return the schema of the reports of a module.
     """
 
+    version: str = "1"
+    report_pattern: dict[str, dict] = {}
+    schemas: dict[str, ReportSchema] = {}
+
     def __init__(
         self, name="base", submodules: tuple[str, ...] = tuple(), configs={}
     ) -> None:
@@ -49,3 +70,56 @@ class BaseModule:
             A summary of the report.
         """
         raise NotImplementedError
+
+    def extract(
+        self: Self, report: Report, name: str | None = None
+    ) -> list[ReportSum]:
+        """
+        Parse every summary embedded in a report file, i.e. the summaries a tool writes into the log of a pipeline. A module finding its summaries among any other lines overrides it, by default the whole file is a single report parsed by `parse`.
+
+        Parameters
+        ----------
+        report : Report
+            A report.
+        name : Hashable | None, default None
+            The name of the summary, or the prefix of the names of the summaries. Default is `None`, which means the report file name.
+
+        Returns
+        -------
+        report_sums : list[ReportSum]
+            The summaries, in the order of the file.
+        """
+        return [self.parse(report=report, name=name)]
+
+    def parse_arrays(self: Self, report: Report) -> dict[Hashable, DataFrame]:
+        """
+        Parse the array-valued metrics of a report, i.e. the quality of each cycle of the reads. Called after `parse` for the reports parsed with `arrays=True`, the arrays are kept in `ReportSum.arrays`. A module without such metrics returns `{}`.
+
+        Parameters
+        ----------
+        report : Report
+            A report.
+
+        Returns
+        -------
+        array_dict : dict[Hashable, DataFrame]
+            The arrays by key, each with a row per position and a column per metric.
+        """
+        return {}
+
+    def schema(self: Self, module: tuple[str, ...]) -> ReportSchema | None:
+        """
+        Return the schema of the reports of a module.
+
+        Parameters
+        ----------
+        module : tuple[str, ...]
+            The module of the reports, i.e. `("fastp", "json")`.
+
+        Returns
+        -------
+        schema : ReportSchema | None
+            The schema of the submodule, `None` if there is none.
+        """
+        submodule: str = module[1] if len(module) > 1 else ""
+        return self.schemas.get(submodule)
@@ -0,0 +1,111 @@
+"""Open compressed report files, chosen by the suffix of the file name."""
+
+import bz2
+import gzip
+import importlib
+import importlib.util
+import io
+import lzma
+import zlib
+from functools import cache
+from typing import IO, Any
+
+# the codec of each suffix, zstd needs Python 3.14 or the `zstd` extra, i.e. `pip install bioreport[zstd]`
+COMPRESSION_SUFFIX_DICT: dict[str, str] = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+
+
+@cache
+def available_suffixes() -> dict[str, str]:
+    """Return the codec of each suffix whose codec can be imported. Without a zstd library, ".zst" files are left as they are."""
+    return {
+        suffix: compression
+        for suffix, compression in COMPRESSION_SUFFIX_DICT.items()
+        if compression != "zstd" or _zstd_module_name() is not None
+    }
+
+
+def split_compression_suffix(file_name: str) -> tuple[str, str | None]:
+    """
+    Split the compression suffix from a file name.
+
+    Parameters
+    ----------
+    file_name : str
+        The base name of the file, i.e. "sample.json.gz".
+
+    Returns
+    -------
+    stem : str
+        The file name without the compression suffix, i.e. "sample.json".
+    compression : str | None
+        The codec, i.e. "gzip". `None` if the file is not compressed.
+    """
+    dot_index: int = file_name.rfind(".")
+    if dot_index <= 0:
+        return file_name, None
+    compression: str | None = available_suffixes().get(file_name[dot_index:].lower())
+    if compression is None:
+        return file_name, None
+    return file_name[:dot_index], compression
+
+
+def decompress(raw_file: IO[bytes], compression: str) -> IO[bytes]:
+    """Wrap a binary file in a stream decompressing it. Closing the stream leaves `raw_file` open."""
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw_file, mode="rb")
+    elif compression == "bz2":
+        return bz2.BZ2File(raw_file, mode="rb")
+    elif compression == "xz":
+        return lzma.LZMAFile(raw_file, mode="rb")
+    elif compression == "zstd":
+        zstd_module_name: str | None = _zstd_module_name()
+        if zstd_module_name is None:
+            raise ImportError(
+                "zstandard is needed to read zstd compressed reports. Install it with `pip install bioreport[zstd]`."
+            )
+        # an optional library, imported on first use
+        zstd: Any = importlib.import_module(zstd_module_name)
+        if zstd_module_name == "compression.zstd":
+            return zstd.ZstdFile(raw_file, mode="rb")
+        return io.BufferedReader(
+            zstd.ZstdDecompressor().stream_reader(raw_file, closefd=False)
+        )
+    raise ValueError(f"Invalid compression: {compression}")
+
+
+def decompression_errors(compression: str) -> tuple[type[Exception], ...]:
+    """Return the errors raised when reading corrupted or truncated data of a codec. They include `OSError`, also raised by the reads of the file itself, see `is_read_error`."""
+    error_list: list[type[Exception]] = [OSError, EOFError]
+    if compression == "gzip":
+        error_list.append(zlib.error)
+    elif compression == "xz":
+        error_list.append(lzma.LZMAError)
+    elif compression == "zstd":
+        zstd_module_name: str | None = _zstd_module_name()
+        if zstd_module_name is not None:
+            # both libraries name their error ZstdError
+            error_list.append(importlib.import_module(zstd_module_name).ZstdError)
+    return tuple(error_list)
+
+
+def is_read_error(exc: BaseException) -> bool:
+    """Check whether an error of a decompressed read comes from reading the file, i.e. `EIO` or `EACCES`, rather than from corrupted data, for which the codecs raise `OSError` without `errno`."""
+    return isinstance(exc, OSError) and exc.errno is not None
+
+
+@cache
+def _zstd_module_name() -> str | None:
+    """Return the name of the zstd library available, the standard library one first. `None` if there is none."""
+    for module_name in ("compression.zstd", "zstandard"):
+        try:
+            if importlib.util.find_spec(module_name) is not None:
+                return module_name
+        except ModuleNotFoundError:
+            # the parent package "compression" is missing before Python 3.14
+            continue
+    return None
@@ -0,0 +1,146 @@
+"""Decode selected top-level values of a JSON object without loading the whole document."""
+
+import json
+import re
+from typing import Any, Iterable, Self, TextIO
+
+_CHUNK_SIZE: int = 1 << 16
+
+_WHITESPACE_REGEX: re.Pattern = re.compile(r"[ \t\n\r]*")
+# a complete string, or an unterminated one (lone quote), or a bracket
+_STRUCTURE_REGEX: re.Pattern = re.compile(r'"(?:[^"\\]|\\.)*"|["\[\]{}]', re.DOTALL)
+_STRING_REGEX: re.Pattern = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_REGEX: re.Pattern = re.compile(r"[^ \t\n\r,\]}]*")
+
+_decoder: json.JSONDecoder = json.JSONDecoder()
+
+
+class _JsonStream:
+    """A window on a JSON text file. The text before `pos` is dropped when more is read."""
+
+    def __init__(self: Self, file: TextIO, chunk_size: int) -> None:
+        self._file: TextIO = file
+        self._chunk_size: int = chunk_size
+        self.text: str = ""
+        self.pos: int = 0
+        self.eof: bool = False
+
+    def fill(self: Self) -> bool:
+        """Read the next chunk, `False` at the end of the file."""
+        if self.eof:
+            return False
+        chunk: str = self._file.read(self._chunk_size)
+        if chunk == "":
+            self.eof = True
+            return False
+        self.text = self.text[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self: Self) -> str:
+        """Skip the whitespace and return the next character, `""` at the end of the file."""
+        while True:
+            self.pos = _WHITESPACE_REGEX.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self: Self, char: str) -> None:
+        """Consume the next character, which must be `char`."""
+        if self.peek() != char:
+            raise ValueError(f"Invalid JSON: expected {char!r} at {self._describe()}")
+        self.pos += 1
+
+    def value_end(self: Self, consume: bool) -> int:
+        """
+        Find the end of the value starting at `pos` without decoding it.
+
+        If `consume`, the value is skipped and the text is dropped while it is scanned. Otherwise the whole value is kept in `text` from `pos`.
+        """
+        first_char: str = self.peek()
+        index: int = self.pos
+        if first_char in ("{", "["):
+            depth: int = 0
+            while True:
+                match: re.Match | None = _STRUCTURE_REGEX.search(self.text, index)
+                if match is None or match.group() == '"':
+                    index = self._fill_from(match, consume)
+                    continue
+                index = match.end()
+                token: str = match.group()
+                if token in ("{", "["):
+                    depth += 1
+                elif token in ("}", "]"):
+                    depth -= 1
+                    if depth == 0:
+                        return index
+        regex: re.Pattern = _STRING_REGEX if first_char == '"' else _SCALAR_REGEX
+        while True:
+            match = regex.match(self.text, self.pos)
+            if match is not None and (match.end() < len(self.text) or self.eof):
+                return match.end()
+            if not self.fill():
+                if match is None:
+                    raise ValueError(f"Invalid JSON: {self._describe()}")
+
+    def _fill_from(self: Self, match: re.Match | None, consume: bool) -> int:
+        """Read more text and return the index to scan from, the unterminated string if any."""
+        # nothing is left to scan before the unterminated string or the end of the text
+        index: int = len(self.text) if match is None else match.start()
+        offset: int = index - self.pos
+        if consume:
+            self.pos = index
+            offset = 0
+        if not self.fill():
+            raise ValueError(f"Invalid JSON: unexpected end of file at {self._describe()}")
+        return self.pos + offset
+
+    def _describe(self: Self) -> str:
+        return repr(self.text[self.pos : self.pos + 20])
+
+
+def load_sections(
+    file: TextIO, keys: Iterable[str], chunk_size: int = _CHUNK_SIZE
+) -> dict[str, Any]:
+    """
+    Decode some top-level values of a JSON object. The other values are skipped without building Python objects, and the file is not read further once all the keys have been found.
+
+    Parameters
+    ----------
+    file : TextIO
+        A JSON file opened in text mode, whose top-level value is an object.
+    keys : Iterable[str]
+        The keys of the values to decode.
+    chunk_size : int, default 65536
+        The number of characters read at once.
+
+    Returns
+    -------
+    section_dict : dict[str, Any]
+        The decoded values by key, in file order. Keys missing from the object are missing from the dict. For a duplicated key the first value is kept.
+    """
+    key_set: set[str] = set(keys)
+    section_dict: dict[str, Any] = {}
+    stream: _JsonStream = _JsonStream(file, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return section_dict
+    while len(section_dict) < len(key_set):
+        key_end: int = stream.value_end(consume=False)
+        key: Any = _decoder.decode(stream.text[stream.pos : key_end])
+        if not isinstance(key, str):
+            raise ValueError(f"Invalid JSON: object key expected at {stream._describe()}")
+        stream.pos = key_end
+        stream.expect(":")
+        if key in key_set and key not in section_dict:
+            value_end: int = stream.value_end(consume=False)
+            section_dict[key], _ = _decoder.raw_decode(stream.text, stream.pos)
+            stream.pos = value_end
+        else:
+            stream.pos = stream.value_end(consume=True)
+        next_char: str = stream.peek()
+        if next_char == "}":
+            break
+        stream.expect(",")
+    return section_dict
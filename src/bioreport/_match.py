@@ -0,0 +1,140 @@
+"""Match the files found by the scans with a classifier, in a pool of workers."""
+
+import logging
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Literal
+
+from bioreport import _archive, _pool
+from bioreport.classifier import ReportClassifier
+from bioreport.report import Report
+from bioreport.stats import submit_with_stats
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+_MATCH_CHUNK_SIZE: int = 256  # number of files matched by a single pool task
+_MAX_PENDING_CHUNKS_PER_WORKER: int = 4  # bound of the submitted but unfinished tasks
+
+
+def resolve_dir(dir: str | Path) -> Path:
+    """Return the absolute path of a directory to scan."""
+    dir_path: Path
+    if isinstance(dir, str):
+        dir_path = Path(dir).absolute()
+    elif isinstance(dir, Path):
+        dir_path = dir.absolute()
+    else:
+        raise TypeError(f"Invalid type of dir: {type(dir)}")
+    return dir_path
+
+
+def match_file(file_path: Path, classifier: ReportClassifier) -> Report:
+    """Match an existing file. Only the reports are stat-ed, to record their fingerprint."""
+    report: Report = Report(path=file_path, module=classifier.classify(file_path))
+    if not report.with_empty_module():
+        report.record_fingerprint()
+    return report
+
+
+def match_archive(archive_path: Path, classifier: ReportClassifier) -> list[Report]:
+    """Match the members of an archive, reading it once. Only the matched members are returned, or the archive without module if there is none or it cannot be read."""
+    report_list: list[Report] = []
+    try:
+        archive_stat: os.stat_result = archive_path.stat()
+        report_list = [
+            Report(path=archive_path, module=module, member=member)
+            for member, module in _archive.iter_member_modules(archive_path, classifier)
+            if len(module) > 0
+        ]
+    except _archive.ARCHIVE_ERRORS as e:
+        _logger.warning(f"Skipping unreadable archive: {str(archive_path)} ({e})")
+        report_list = []
+    if len(report_list) == 0:
+        return [Report(path=archive_path)]
+    for report in report_list:
+        report.record_fingerprint(archive_stat)
+    return report_list
+
+
+def match_path(
+    file_path: Path, classifier: ReportClassifier, archives: bool = False
+) -> list[Report]:
+    """Match an existing file, or the members of a tar or zip archive with `archives`."""
+    if archives:
+        if _archive.archive_format(file_path.name) is not None:
+            return match_archive(file_path, classifier)
+    return [match_file(file_path, classifier)]
+
+
+def match_files(
+    file_paths: list[Path], classifier: ReportClassifier, archives: bool = False
+) -> list[Report]:
+    """Match a chunk of existing files. Runs in the pool workers."""
+    return [
+        report
+        for file_path in file_paths
+        for report in match_path(file_path, classifier, archives)
+    ]
+
+
+def make_pool(workers: int, executor: Literal["thread", "process"]) -> Executor:
+    """Return a pool of `workers` threads or processes to match files."""
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    # the progress bar of `scan_dir` runs in a thread
+    return _pool.process_pool(workers)
+
+
+def iter_matches(
+    file_paths: Iterator[Path],
+    classifier: ReportClassifier | None,
+    workers: int,
+    executor: Literal["thread", "process"],
+    archives: bool = False,
+) -> Iterator[Report]:
+    """
+    Match files while they are yielded, including the files matching no module. With `archives`, the matched members of the tar and zip archives are yielded instead of the archives.
+
+    With more than one worker, files are submitted to a pool in chunks. The number of pending chunks is bounded, so the walk waits for the pool instead of queueing every file of the tree. Results are yielded in submission order.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be a positive integer: {workers}")
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Invalid executor: {executor}")
+    if classifier is None:
+        classifier = ReportClassifier.default()
+
+    if workers == 1:
+        for file_path in file_paths:
+            yield from match_path(file_path, classifier, archives)
+        return
+
+    pool: Executor = make_pool(workers, executor)
+    max_pending_chunk_num: int = workers * _MAX_PENDING_CHUNKS_PER_WORKER
+
+    pending_future_queue: deque[Future[list[Report]]] = deque()
+    with pool:
+        try:
+            chunk: list[Path] = []
+            for file_path in file_paths:
+                chunk.append(file_path)
+                if len(chunk) < _MATCH_CHUNK_SIZE:
+                    continue
+                if len(pending_future_queue) >= max_pending_chunk_num:
+                    yield from pending_future_queue.popleft().result()
+                pending_future_queue.append(
+                    submit_with_stats(pool, match_files, chunk, classifier, archives)
+                )
+                chunk = []
+            if len(chunk) > 0:
+                pending_future_queue.append(
+                    submit_with_stats(pool, match_files, chunk, classifier, archives)
+                )
+            while len(pending_future_queue) > 0:
+                yield from pending_future_queue.popleft().result()
+        finally:
+            # the consumer may stop early, do not match the chunks still queued
+            for future in pending_future_queue:
+                future.cancel()
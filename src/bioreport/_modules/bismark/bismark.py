@@ -2,12 +2,13 @@ import re
 from typing import Hashable, Self
 
 import pandas as pd
-from pandas import Series
+from pandas import DataFrame, Series
 
 from bioreport import _config
 from bioreport._base_module import BaseModule
 from bioreport.report import Report
 from bioreport.report_sum import ReportSum
+from bioreport.schema import ReportSchema
 
 _MODULE_NAME = "bismark"
 
@@ -15,16 +16,28 @@ _MODULE_NAME = "bismark"
 class BioReportModule(BaseModule):
     """A class for parsing report."""
 
+    # compiled once at import, instances are shared by the module registry
+    SUBMODULE_ALIGN_INFO_LINE_PATTERN: re.Pattern = re.compile(
+        r"(?P<key>^[^:^\n]+):\s*(?P<value>[\d\%\.]+)\s*(?P<bracket>\(.+\))?\s*$"
+    )
+    SUBMODULE_DEDUPLICATE_INFO_LINE_PATTERN: re.Pattern = re.compile(
+        r"(?P<key>^[^:^\n]+):\s*(?P<value>[\d\%\.]+)\s*(?P<bracket>\(.+\))?\s*$"
+    )
+    # the title of a table of an M-bias report, i.e. "CpG context (R1)"
+    SUBMODULE_MBIAS_TITLE_LINE_PATTERN: re.Pattern = re.compile(
+        r"^(?P<context>C\w+) context(?: \((?P<read>R[12])\))?\s*$"
+    )
+
+    schemas: dict[str, ReportSchema] = {
+        "align": ReportSchema(),
+        "deduplicate": ReportSchema(),
+        "mbias": ReportSchema(),
+    }
+
     def __init__(self: Self) -> None:
         super(BioReportModule, self).__init__(
             name=_MODULE_NAME, submodules=_config.MODULE_DICT[_MODULE_NAME], configs={}
         )
-        self.SUBMODULE_ALIGN_INFO_LINE_PATTERN: re.Pattern = re.compile(
-            r"(?P<key>^[^:^\n]+):\s*(?P<value>[\d\%\.]+)\s*(?P<bracket>\(.+\))?\s*$"
-        )
-        self.SUBMODULE_DEDUPLICATE_INFO_LINE_PATTERN: re.Pattern = re.compile(
-            r"(?P<key>^[^:^\n]+):\s*(?P<value>[\d\%\.]+)\s*(?P<bracket>\(.+\))?\s*$"
-        )
 
     def parse(self: Self, report: Report, name: Hashable | None = None) -> ReportSum:
         """
@@ -59,12 +72,14 @@ class BioReportModule(BaseModule):
                 report_sum_series = self._submodule_align_parse(report)
             case "deduplicate":
                 report_sum_series = self._submodule_deduplicate_parse(report)
+            case "mbias":
+                report_sum_series = self._submodule_mbias_parse(report)
             case _:
                 raise ValueError(
                     f"The submodule of the report is not supported by {_MODULE_NAME} module: {str(report)}. Expected submodule names: {self.submodules}"
                 )
         if name is None:
-            report_sum_series.name = report.path.name
+            report_sum_series.name = report.file_name
         elif isinstance(name, str):
             report_sum_series.name = name
         else:
@@ -89,7 +104,7 @@ class BioReportModule(BaseModule):
             The summary of the report.
         """
         report_sum_dict: dict[str, str] = {}
-        with open(report.path, "r") as file:
+        with report.open() as file:
             for line in file:
                 line_match: re.Match[str] | None = (
                     self.SUBMODULE_ALIGN_INFO_LINE_PATTERN.match(line)
@@ -117,7 +132,7 @@ class BioReportModule(BaseModule):
             The summary of the report.
         """
         report_sum_dict: dict = {}
-        with open(report.path, "r") as file:
+        with report.open() as file:
             for line in file:
                 line_match: re.Match[str] | None = (
                     self.SUBMODULE_ALIGN_INFO_LINE_PATTERN.match(line)
@@ -129,3 +144,105 @@ class BioReportModule(BaseModule):
                 report_sum_dict.update({key: value})
         report_sum_series: Series = Series(report_sum_dict)
         return report_sum_series
+
+    def parse_arrays(self: Self, report: Report) -> dict[Hashable, DataFrame]:
+        """
+        Parse the tables of a bismark M-bias report.
+
+        Parameters
+        ----------
+        report : Report
+            A bismark report.
+
+        Returns
+        -------
+        array_dict : dict[Hashable, DataFrame]
+            The table of each context and read, i.e. `("CpG", "R1")`, a row per position in the read and the columns "count methylated", "count unmethylated", "% methylation" and "coverage". `{}` if the report is not an M-bias report.
+        """
+        if report.module != (_MODULE_NAME, "mbias"):
+            return {}
+        return self._mbias_tables(report)
+
+    def _submodule_mbias_parse(self: Self, report: Report) -> Series:
+        """
+        Parse a bismark M-bias report. The tables are summed over the positions, see `parse_arrays` for the tables themselves.
+
+        Parameters
+        ----------
+        report : Report
+            A bismark M-bias report.
+
+        Returns
+        -------
+        report_sum_series : Series
+            The methylated and unmethylated counts and the methylation percentage of each context and read, i.e. `("CpG", "R1", "% methylation")`.
+        """
+        report_sum_dict: dict[tuple[str, str, str], int | float] = {}
+        for (context, read), mbias_df in self._mbias_tables(report).items():
+            methylated_num: int = int(mbias_df["count methylated"].sum())
+            unmethylated_num: int = int(mbias_df["count unmethylated"].sum())
+            call_num: int = methylated_num + unmethylated_num
+            report_sum_dict[(context, read, "count methylated")] = methylated_num
+            report_sum_dict[(context, read, "count unmethylated")] = unmethylated_num
+            report_sum_dict[(context, read, "% methylation")] = (
+                round(methylated_num / call_num * 100, 2) if call_num > 0 else 0.0
+            )
+        # the counts are kept as integers
+        report_sum_series: Series = Series(report_sum_dict, dtype=object)
+        return report_sum_series
+
+    def _mbias_tables(self: Self, report: Report) -> dict[Hashable, DataFrame]:
+        """Read the table of each context and read of an M-bias report. The empty fields, i.e. the methylation percentage of a position without calls, are `NaN`."""
+        table_rows_dict: dict[tuple[str, str], list[list[str]]] = {}
+        table_columns_dict: dict[tuple[str, str], list[str]] = {}
+        table_key: tuple[str, str] | None = None
+        with report.open() as file:
+            for line in file:
+                # only the line break is removed, the trailing fields may be empty
+                line_content: str = line.rstrip("\r\n")
+                if line_content.strip() == "" or line_content.startswith("="):
+                    continue
+                title_match: re.Match[str] | None = (
+                    self.SUBMODULE_MBIAS_TITLE_LINE_PATTERN.match(line_content)
+                )
+                if title_match is not None:
+                    # single-end reports may have no read in the titles
+                    table_key = (
+                        title_match.group("context"),
+                        title_match.group("read") or "R1",
+                    )
+                    table_rows_dict[table_key] = []
+                    continue
+                if table_key is None:
+                    raise ValueError(f"Invalid M-bias report: {str(report)}")
+                fields: list[str] = line_content.split("\t")
+                if fields[0] == "position":
+                    table_columns_dict[table_key] = fields[1:]
+                    continue
+                column_list: list[str] | None = table_columns_dict.get(table_key)
+                if column_list is None:
+                    raise ValueError(
+                        f"Invalid M-bias report, the table has no header: {str(report)}"
+                    )
+                if len(fields) != len(column_list) + 1:
+                    raise ValueError(
+                        f"Invalid M-bias report, the row has {len(fields)} fields instead of {len(column_list) + 1}: {str(report)}. Row: {line_content!r}"
+                    )
+                table_rows_dict[table_key].append(fields)
+
+        mbias_table_dict: dict[Hashable, DataFrame] = {}
+        for table_key, row_list in table_rows_dict.items():
+            if table_key not in table_columns_dict:
+                raise ValueError(
+                    f"Invalid M-bias report, the table has no header: {str(report)}"
+                )
+            mbias_table_dict[table_key] = (
+                DataFrame(
+                    [row[1:] for row in row_list],
+                    index=pd.Index([int(row[0]) for row in row_list], name="position"),
+                    columns=table_columns_dict[table_key],
+                )
+                .apply(pd.to_numeric, errors="coerce")
+                .astype("float64")
+            )
+        return mbias_table_dict
@@ -1,5 +1,8 @@
+import mmap
+import os
 import re
-from typing import Hashable, Self
+from contextlib import contextmanager
+from typing import Hashable, Iterable, Iterator, Self
 
 import pandas as pd
 from pandas import Series
@@ -8,13 +11,27 @@ from bioreport import _config
 from bioreport._base_module import BaseModule
 from bioreport.report import Report
 from bioreport.report_sum import ReportSum
+from bioreport.schema import ReportSchema
 
 _MODULE_NAME = "bowtie2"
+# a whole summary, from its first line to the overall alignment rate. The lines between are indented, the submodule is in the second line. An indented line starts with a non-blank character after its indentation, so a summary cut before its last line fails in linear time instead of backtracking through the ways of splitting the blanks
+_SUMMARY_REGEX: re.Pattern[bytes] = re.compile(
+    rb"^\d+ reads; of these:\r?\n"
+    rb"[ \t]+\d+ \([\d.]+%\) were (?P<submodule>paired|unpaired); of these:\r?\n"
+    rb"(?:[ \t]+[^ \t\r\n][^\r\n]*\r?\n)*"
+    rb"\d+(?:\.\d+)?% overall alignment rate",
+    re.MULTILINE,
+)
 
 
 class BioReportModule(BaseModule):
     """A class for parsing report."""
 
+    schemas: dict[str, ReportSchema] = {
+        "paired": ReportSchema(rules=[("percent *", "percent")]),
+        "unpaired": ReportSchema(rules=[("percent *", "percent")]),
+    }
+
     def __init__(self: Self) -> None:
         super(BioReportModule, self).__init__(
             name=_MODULE_NAME, submodules=_config.MODULE_DICT[_MODULE_NAME], configs={}
@@ -58,7 +75,7 @@ class BioReportModule(BaseModule):
                     f"The submodule of the report is not supported by {_MODULE_NAME} module: {str(report)}. Expected submodule names: {self.submodules}"
                 )
         if name is None:
-            report_sum_series.name = report.path.name
+            report_sum_series.name = report.file_name
         elif isinstance(name, str):
             report_sum_series.name = name
         else:
@@ -68,41 +85,105 @@ class BioReportModule(BaseModule):
 
         return report_sum
 
+    def extract(
+        self: Self, report: Report, name: Hashable | None = None
+    ) -> list[ReportSum]:
+        """
+        Find and parse every bowtie2 summary written in a file, i.e. the log of a pipeline aligning many samples. The file is searched through a memory map, a compressed file or a member of an archive is read into memory.
+
+        Parameters
+        ----------
+        report : Report
+            A file holding bowtie2 summaries, among any other lines.
+        name : Hashable | None, default None
+            The prefix of the names of the summaries, which are named "{name}#{index}", i.e. "align.log#1". Default is `None`, which means the report file name.
+
+        Returns
+        -------
+        report_sums : list[ReportSum]
+            A summary of each bowtie2 summary, in the order of the file. The submodule of each one is "paired" or "unpaired". `[]` if there is none.
+        """
+        name_prefix: str
+        if name is None:
+            name_prefix = report.file_name
+        elif isinstance(name, str):
+            name_prefix = name
+        else:
+            raise ValueError(f"The name of the report is not supported: {str(name)}")
+
+        report_sum_list: list[ReportSum] = []
+        with _open_buffer(report) as buffer:
+            for index, summary_match in enumerate(
+                _SUMMARY_REGEX.finditer(buffer), start=1
+            ):
+                summary_lines: list[str] = (
+                    summary_match.group().decode("utf-8", errors="replace").splitlines()
+                )
+                report_sum_series: Series = self._summary_lines_parse(summary_lines)
+                report_sum_series.name = f"{name_prefix}#{index}"
+                submodule: str = summary_match.group("submodule").decode()
+                report_sum_list.append(
+                    ReportSum(module=(_MODULE_NAME, submodule), data=report_sum_series)
+                )
+        return report_sum_list
+
     def _submodule_summary_parse(self: Self, report: Report) -> Series:
+        with report.open() as file:
+            return self._summary_lines_parse(file)
+
+    def _summary_lines_parse(self: Self, lines: Iterable[str]) -> Series:
         report_sum_dict: dict[str, str] = {}
-        with open(report.path, "r") as file:
-            for line in file:
-                line_strip: str = line.strip()
-                if line_strip.startswith("-"):
-                    continue
-                line_strip_list: list[str] = line_strip.split(" ")
-                if line_strip.endswith("of these:"):
-                    if (curr_line_unit := line_strip_list[1].strip(";")) in [
-                        "reads",
-                        "pairs",
-                        "mates",
-                    ]:
-                        curr_unit: str = curr_line_unit
-                    line_strip = line_strip.split(";")[0]
-                    line_strip_list = line_strip.split(" ")
-                value: str = line_strip_list[0].strip()
-                percentage: str | None
-                key: str = " ".join(line_strip_list[1:])
-                if line_strip_list[1].startswith("("):
-                    percentage = line_strip_list[1][
-                        line_strip_list[1].index("(")
-                        + 1 : line_strip_list[1].index("%") :
-                    ]
-                    key: str = " ".join(line_strip_list[2:])
-                    report_sum_dict.update({f"{curr_unit} {key}": value})
-                    report_sum_dict.update({f"percent {curr_unit} {key}": percentage})
-                elif line_strip_list[1] == curr_unit:
-                    report_sum_dict.update({f"{curr_unit}": value})
-                elif line_strip.endswith("rate"):
-                    value = value.strip("%")
-                    report_sum_dict.update({f"percent {key}": value})
-                else:
-                    report_sum_dict.update({f"{curr_unit} {key}": value})
+        for line in lines:
+            line_strip: str = line.strip()
+            if line_strip.startswith("-"):
+                continue
+            line_strip_list: list[str] = line_strip.split(" ")
+            if line_strip.endswith("of these:"):
+                if (curr_line_unit := line_strip_list[1].strip(";")) in [
+                    "reads",
+                    "pairs",
+                    "mates",
+                ]:
+                    curr_unit: str = curr_line_unit
+                line_strip = line_strip.split(";")[0]
+                line_strip_list = line_strip.split(" ")
+            value: str = line_strip_list[0].strip()
+            percentage: str | None
+            key: str = " ".join(line_strip_list[1:])
+            if line_strip_list[1].startswith("("):
+                percentage = line_strip_list[1][
+                    line_strip_list[1].index("(")
+                    + 1 : line_strip_list[1].index("%") :
+                ]
+                key: str = " ".join(line_strip_list[2:])
+                report_sum_dict.update({f"{curr_unit} {key}": value})
+                report_sum_dict.update({f"percent {curr_unit} {key}": percentage})
+            elif line_strip_list[1] == curr_unit:
+                report_sum_dict.update({f"{curr_unit}": value})
+            elif line_strip.endswith("rate"):
+                value = value.strip("%")
+                report_sum_dict.update({f"percent {key}": value})
+            else:
+                report_sum_dict.update({f"{curr_unit} {key}": value})
         report_sum_series: Series = Series(report_sum_dict)
 
         return report_sum_series
+
+
+@contextmanager
+def _open_buffer(report: Report) -> Iterator[bytes | mmap.mmap]:
+    """Yield the content of the report file, mapped into memory if the file is neither compressed nor in an archive."""
+    with report.open("rb") as file:
+        if report.member is not None or report.compression is not None:
+            yield file.read()
+            return
+        if os.fstat(file.fileno()).st_size == 0:
+            # an empty file cannot be mapped
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                buffer.madvise(mmap.MADV_SEQUENTIAL)
+            yield buffer
+        # the map has read the whole file, counted by the statistics collector
+        file.seek(0, os.SEEK_END)
@@ -1,21 +1,42 @@
-from json import load
+from html.parser import HTMLParser
 from typing import Hashable, Self
 
 import pandas as pd
-from bs4 import BeautifulSoup, Tag
-from pandas import Series
+from pandas import DataFrame, Series
 
-from bioreport import _config
+from bioreport import _config, _json_stream
 from bioreport._base_module import BaseModule
 from bioreport.report import Report
 from bioreport.report_sum import ReportSum
+from bioreport.schema import ReportSchema
 
 _MODULE_NAME = "fastp"
+_HTML_CHUNK_SIZE: int = 1 << 13
+# the sections of the json report with per-cycle curves, a section is missing for single-end reads
+_CURVE_SECTION_KEYS: tuple[str, ...] = (
+    "read1_before_filtering",
+    "read2_before_filtering",
+    "read1_after_filtering",
+    "read2_after_filtering",
+)
 
 
 class BioReportModule(BaseModule):
     """A class for parsing report."""
 
+    schemas: dict[str, ReportSchema] = {
+        "html": ReportSchema(
+            rules=[
+                ("fastp version", "str"),
+                ("sequencing", "str"),
+                ("mean length *", "str"),
+            ]
+        ),
+        "json": ReportSchema(
+            rules=[("*_rate", "float"), ("gc_content", "float")], default="int"
+        ),
+    }
+
     def __init__(self: Self) -> None:
         super(BioReportModule, self).__init__(
             name=_MODULE_NAME, submodules=_config.MODULE_DICT[_MODULE_NAME], configs={}
@@ -59,7 +80,7 @@ class BioReportModule(BaseModule):
                     f"The submodule of the report is not supported by {_MODULE_NAME} module: {str(report)}. Expected submodule names: {self.submodules}"
                 )
         if name is None:
-            report_sum_series.name = report.path.name
+            report_sum_series.name = report.file_name
         elif isinstance(name, str):
             report_sum_series.name = name
         else:
@@ -69,10 +90,67 @@ class BioReportModule(BaseModule):
 
         return report_sum
 
+    def parse_arrays(self: Self, report: Report) -> dict[Hashable, DataFrame]:
+        """
+        Parse the per-cycle curves and the histograms of a fastp JSON report. The curves of an html report are plotted by scripts and not parsed.
+
+        Parameters
+        ----------
+        report : Report
+            A fastp report.
+
+        Returns
+        -------
+        array_dict : dict[Hashable, DataFrame]
+            The arrays by key:
+
+            - `(section, "quality_curves")` and `(section, "content_curves")`, a row per cycle from 1, for the sections "read1_before_filtering", "read2_before_filtering", "read1_after_filtering" and "read2_after_filtering" in the report.
+            - `("duplication", "histogram")`, a row per duplication level from 1, with the columns "histogram" and "mean_gc".
+            - `("insert_size", "histogram")`, a row per insert size from 0.
+        """
+        if report.module != (_MODULE_NAME, "json"):
+            return {}
+        with report.open() as file:
+            json_dict: dict = _json_stream.load_sections(
+                file, keys=(*_CURVE_SECTION_KEYS, "duplication", "insert_size")
+            )
+
+        array_dict: dict[Hashable, DataFrame] = {}
+        for section_key in _CURVE_SECTION_KEYS:
+            section_dict: dict | None = json_dict.get(section_key)
+            if section_dict is None:
+                continue
+            for curves_key in ("quality_curves", "content_curves"):
+                curve_dict: dict | None = section_dict.get(curves_key)
+                if curve_dict:
+                    array_dict[(section_key, curves_key)] = _curve_frame(
+                        curve_dict, start=1, position_name="cycle"
+                    )
+        duplication_dict: dict = json_dict.get("duplication") or {}
+        duplication_curve_dict: dict = {
+            key: duplication_dict[key]
+            for key in ("histogram", "mean_gc")
+            if key in duplication_dict
+        }
+        if duplication_curve_dict:
+            array_dict[("duplication", "histogram")] = _curve_frame(
+                duplication_curve_dict, start=1, position_name="duplication level"
+            )
+        insert_size_dict: dict = json_dict.get("insert_size") or {}
+        if "histogram" in insert_size_dict:
+            array_dict[("insert_size", "histogram")] = _curve_frame(
+                {"histogram": insert_size_dict["histogram"]},
+                start=0,
+                position_name="insert size",
+            )
+        return array_dict
+
     def _submodule_html_parse(self: Self, report: Report) -> Series:
         """
         Parse a fastp report in html format.
 
+        Only the summary tables are extracted, the file is read in chunks and not further than the last summary div. The plots after them are never read.
+
         Parameters
         ----------
         report : Report
@@ -83,11 +161,6 @@ class BioReportModule(BaseModule):
         report_sum_series : Series
             The summary of the report.
         """
-        with open(report.path, "r") as file:
-            html_content: str = file.read()
-
-        soup: BeautifulSoup = BeautifulSoup(html_content, "html.parser")
-
         div_id_list: list[str] = [
             "general",
             "before_filtering_summary",
@@ -95,39 +168,18 @@ class BioReportModule(BaseModule):
             "filtering_result",
         ]
 
-        div_list: list[Tag] = [soup.find("div", id=div_id) for div_id in div_id_list]
-
-        def _summary_table_parse(table) -> dict[str, str]:
-            info_dict: dict[str, str] = {}
-            row_list: list[Tag] = table.find_all("tr")
-            for row in row_list:
-                col_list: list[Tag] = row.find_all("td")
-                row_text_list: list[str] = [col.text.strip() for col in col_list]
-                if len(row_text_list) != 2:
-                    raise ValueError(f"Unexpected table row: \n{row}")
-                row_text_list[0] = row_text_list[0].removesuffix(":")
-                info_dict.update({row_text_list[0]: row_text_list[1]})
-            return info_dict
-
-        table_info_dict_list: list[dict[str, str]] = [
-            {} for _ in range(len(div_id_list))
-        ]
-        for div_index, div in enumerate(div_list):
-            if not div:
-                continue
-
-            summary_table_list: list[Tag] = div.find_all(
-                "table", class_="summary_table"
-            )
-
-            for table in summary_table_list:
-                table_info_dict: dict[str, str] = _summary_table_parse(table)
-                table_info_dict_list[div_index] = table_info_dict
+        summary_parser: _SummaryTableParser = _SummaryTableParser(div_ids=div_id_list)
+        with report.open() as file:
+            while not summary_parser.done:
+                html_chunk: str = file.read(_HTML_CHUNK_SIZE)
+                if html_chunk == "":
+                    summary_parser.close()
+                    break
+                summary_parser.feed(html_chunk)
 
         report_sum_dict: dict[tuple[str, str], str] = {}
-        for table_index in range(len(div_id_list)):
-            table_info_type: str = div_id_list[table_index]
-            table_info_dict = table_info_dict_list[table_index]
+        for table_info_type in div_id_list:
+            table_info_dict: dict[str, str] = summary_parser.tables[table_info_type]
             report_sum_dict.update(
                 {
                     (table_info_type, key): value
@@ -151,8 +203,11 @@ class BioReportModule(BaseModule):
         report_sum_series : Series
             The summary of the report.
         """
-        with open(report.path, "r") as file:
-            json_dict: dict = load(file)
+        # only decode the summary sections, the per-cycle curves and histograms after them are not read
+        with report.open() as file:
+            json_dict: dict = _json_stream.load_sections(
+                file, keys=("summary", "filtering_result")
+            )
         summary_dict: dict | None = json_dict.get("summary")
         if summary_dict is None:
             raise ValueError("Invalid JSON report.")
@@ -184,3 +239,118 @@ class BioReportModule(BaseModule):
         }
         result_sum_series: Series = Series(result_sum_dict)
         return result_sum_series
+
+
+def _curve_frame(curve_dict: dict, start: int, position_name: str) -> DataFrame:
+    """Return a table of curves, a column per curve and a row per position from `start`. A shorter curve is padded with `NaN`."""
+    curve_df: DataFrame = DataFrame(
+        {key: Series(values, dtype="float64") for key, values in curve_dict.items()}
+    )
+    curve_df.index = pd.RangeIndex(
+        start, start + len(curve_df), name=position_name
+    )
+    return curve_df
+
+
+class _SummaryTableParser(HTMLParser):
+    """
+    Extract the `summary_table` tables of some divs of a fastp html report.
+
+    Like `BeautifulSoup.find`, the first div with each id is used, and the last summary table of a div wins. `done` is set once all the divs have been closed, so the rest of the file does not need to be fed.
+
+    Attributes
+    ----------
+    tables : dict[str, dict[str, str]]
+        The rows of the summary table of each div, `{}` if the div or the table is missing.
+    done : bool
+        Whether all the divs have been closed.
+    """
+
+    def __init__(self: Self, div_ids: list[str]) -> None:
+        super().__init__(convert_charrefs=True)
+        self.tables: dict[str, dict[str, str]] = {div_id: {} for div_id in div_ids}
+        self.done: bool = False
+        self._pending_div_ids: set[str] = set(div_ids)
+        self._unclosed_div_num: int = len(div_ids)
+        # the ids of the open divs, `None` for the divs not extracted
+        self._div_stack: list[str | None] = []
+        self._table_depth: int = 0
+        self._table_div_ids: list[str] = []
+        self._table_rows: dict[str, str] = {}
+        self._row_cells: list[str] | None = None
+        self._cell_text_list: list[str] | None = None
+
+    def handle_starttag(
+        self: Self, tag: str, attrs: list[tuple[str, str | None]]
+    ) -> None:
+        """Open a div, a summary table, a row or a cell."""
+        if tag == "div":
+            div_id: str | None = dict(attrs).get("id")
+            if div_id in self._pending_div_ids:
+                self._pending_div_ids.remove(div_id)
+                self._div_stack.append(div_id)
+            else:
+                self._div_stack.append(None)
+        elif tag == "table":
+            if self._table_depth > 0:
+                self._table_depth += 1
+                return
+            open_div_ids: list[str] = [i for i in self._div_stack if i is not None]
+            class_list: list[str] = (dict(attrs).get("class") or "").split()
+            if len(open_div_ids) > 0 and "summary_table" in class_list:
+                self._table_depth = 1
+                self._table_div_ids = open_div_ids
+                self._table_rows = {}
+        elif self._table_depth == 0:
+            return
+        elif tag == "tr":
+            self._end_row()
+            self._row_cells = []
+        elif tag == "td" and self._row_cells is not None:
+            self._end_cell()
+            self._cell_text_list = []
+
+    def handle_endtag(self: Self, tag: str) -> None:
+        """Close a div, a summary table, a row or a cell."""
+        if tag == "div":
+            if len(self._div_stack) == 0:
+                return
+            div_id: str | None = self._div_stack.pop()
+            if div_id is not None:
+                self._unclosed_div_num -= 1
+                self.done = self._unclosed_div_num == 0
+        elif self._table_depth == 0:
+            return
+        elif tag == "table":
+            self._table_depth -= 1
+            if self._table_depth > 0:
+                return
+            self._end_row()
+            for div_id in self._table_div_ids:
+                self.tables[div_id] = self._table_rows
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "td":
+            self._end_cell()
+
+    def handle_data(self: Self, data: str) -> None:
+        """Collect the text of the current cell."""
+        if self._cell_text_list is not None:
+            self._cell_text_list.append(data)
+
+    def _end_cell(self: Self) -> None:
+        """Close the current cell, if any. Closing tags are optional in html."""
+        if self._cell_text_list is None or self._row_cells is None:
+            return
+        self._row_cells.append("".join(self._cell_text_list).strip())
+        self._cell_text_list = None
+
+    def _end_row(self: Self) -> None:
+        """Close the current row, if any, and record it."""
+        self._end_cell()
+        if self._row_cells is None:
+            return
+        if len(self._row_cells) != 2:
+            raise ValueError(f"Unexpected table row: \n{self._row_cells}")
+        self._table_rows[self._row_cells[0].removesuffix(":")] = self._row_cells[1]
+        self._row_cells = None
@@ -0,0 +1,19 @@
+"""Create the process pools of the scans and parses."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# a forked worker inherits the locks held by the other threads of the parent, i.e. of a scan
+# running in threads or of the progress bar, and may deadlock on them
+_START_METHOD: str = (
+    "forkserver"
+    if "forkserver" in multiprocessing.get_all_start_methods()
+    else "spawn"
+)
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return a pool of `workers` processes started by the forkserver, or spawned where there is none, so that they are never forked from a process running threads."""
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(_START_METHOD)
+    )
@@ -0,0 +1,181 @@
+"""
+Registry of the modules parsing reports.
+
+The built-in modules live in `_modules`. Third-party modules are discovered through the `bioreport.modules` entry point group. The name of an entry point is the module name, its object is a `BaseModule` subclass or instance, or a module exposing a `BioReportModule` class. The report patterns of a third-party module are read from its `report_pattern` attribute, a `dict` in the format of `report_pattern.toml`, i.e.::
+
+    [project.entry-points."bioreport.modules"]
+    mytool = "mytool_bioreport:BioReportModule"
+
+Each module is resolved and instantiated once per process, the instances are shared and must be stateless.
+"""
+
+import threading
+from importlib import import_module
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+from bioreport import __version__, _config
+
+if TYPE_CHECKING:
+    from importlib.metadata import EntryPoint
+
+    from bioreport._base_module import (  # noqa: PLC0415  imports pandas
+        BaseModule,
+    )
+
+ENTRY_POINT_GROUP: str = "bioreport.modules"
+
+_lock: threading.RLock = threading.RLock()
+_module_instance_dict: dict[str, "BaseModule"] = {}
+_plugin_object_dict: dict[str, Any] = {}
+
+
+class _Discovered:
+    """Hold the third-party entry points and the merged report patterns, discovered once per process."""
+
+    def __init__(self) -> None:
+        """Create a holder with nothing discovered yet."""
+        self.plugin_entry_point_dict: dict[str, EntryPoint] | None = None
+        self.report_pattern: dict[str, dict] | None = None
+
+
+_discovered: _Discovered = _Discovered()
+
+
+def plugin_entry_points() -> "dict[str, EntryPoint]":
+    """
+    Discover the third-party modules. Built-in module names cannot be overridden.
+
+    Returns
+    -------
+    plugin_entry_point_dict : dict[str, EntryPoint]
+        The entry points by module name.
+    """
+    if _discovered.plugin_entry_point_dict is None:
+        from importlib.metadata import (  # noqa: PLC0415  about 35 ms to import, only classifying needs the plugins
+            entry_points,
+        )
+
+        discovered_dict: dict[str, EntryPoint] = {}
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            if entry_point.name in _config.MODULE_DICT:
+                raise ValueError(
+                    f"Conflict of module names: {entry_point.name} is a built-in module. Entry point: {entry_point.value}"
+                )
+            discovered_dict[entry_point.name] = entry_point
+        _discovered.plugin_entry_point_dict = discovered_dict
+    return _discovered.plugin_entry_point_dict
+
+
+def report_pattern() -> dict[str, dict]:
+    """
+    Return the report patterns of the built-in modules followed by those of the third-party modules.
+
+    Returns
+    -------
+    report_pattern : dict[str, dict]
+        The report patterns in the format of `report_pattern.toml`.
+    """
+    if _discovered.report_pattern is not None:
+        return _discovered.report_pattern
+    with _lock:
+        if _discovered.report_pattern is not None:
+            return _discovered.report_pattern
+        merged_report_pattern: dict[str, dict] = dict(_config.REPORT_PATTERN)
+        for module_name in plugin_entry_points():
+            plugin_object: Any = _load_plugin_object(module_name)
+            if isinstance(plugin_object, ModuleType) and not hasattr(
+                plugin_object, "report_pattern"
+            ):
+                plugin_object = plugin_object.BioReportModule
+            plugin_report_pattern: dict[str, dict] = getattr(
+                plugin_object, "report_pattern", {}
+            )
+            for pattern_key, patterns in plugin_report_pattern.items():
+                if (
+                    pattern_key.split(_config.REPORT_PATTERN_NAME_SEP)[0]
+                    != module_name
+                ):
+                    raise ValueError(
+                        f"Invalid report pattern key of module {module_name}: {pattern_key}"
+                    )
+                merged_report_pattern[pattern_key] = patterns
+        _discovered.report_pattern = merged_report_pattern
+    return _discovered.report_pattern
+
+
+def get_module(module_name: str) -> "BaseModule":
+    """
+    Get the shared instance of a module, creating it on first use.
+
+    Parameters
+    ----------
+    module_name : str
+        The name of the module, i.e. "fastp".
+
+    Returns
+    -------
+    module : BaseModule
+        The module instance.
+    """
+    module: BaseModule | None = _module_instance_dict.get(module_name)
+    if module is not None:
+        return module
+    with _lock:
+        module = _module_instance_dict.get(module_name)
+        if module is None:
+            module = _create_module(module_name)
+            _module_instance_dict[module_name] = module
+    return module
+
+
+def parser_version(module_name: str) -> str:
+    """
+    Return the version of the parser of a module, changing whenever its output may change.
+
+    Parameters
+    ----------
+    module_name : str
+        The name of the module, i.e. "fastp".
+
+    Returns
+    -------
+    parser_version : str
+        The package version followed by the `version` of the module.
+    """
+    return f"{__version__}+{module_name}.{get_module(module_name).version}"
+
+
+def _create_module(module_name: str) -> "BaseModule":
+    """Import and instantiate a module."""
+    from bioreport._base_module import (  # noqa: PLC0415  imports pandas
+        BaseModule,
+    )
+
+    module_object: Any
+    if module_name in _config.MODULE_DICT:
+        module_object = import_module(
+            name=f".{_config.MODULES_DIR_BASENAME}.{module_name}",
+            package=_config.PACKAGE_NAME,
+        )
+    elif module_name in plugin_entry_points():
+        module_object = _load_plugin_object(module_name)
+    else:
+        raise ValueError(f"Unknown module: {module_name}")
+
+    if isinstance(module_object, ModuleType):
+        module_object = module_object.BioReportModule
+    if isinstance(module_object, type) and issubclass(module_object, BaseModule):
+        module_object = module_object()
+    if not isinstance(module_object, BaseModule):
+        raise TypeError(
+            f"Module {module_name} does not provide a BaseModule: {module_object}"
+        )
+    return module_object
+
+
+def _load_plugin_object(module_name: str) -> Any:
+    """Load the object of a third-party module entry point once."""
+    if module_name not in _plugin_object_dict:
+        _plugin_object_dict[module_name] = plugin_entry_points()[module_name].load()
+    return _plugin_object_dict[module_name]
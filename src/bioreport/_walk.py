@@ -0,0 +1,406 @@
+"""Walk directory trees with pruning rules."""
+
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from fnmatch import translate
+from pathlib import Path
+from typing import Iterable, Iterator, Literal, Self
+
+from bioreport.stats import ScanStats, current_stats
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+IGNORE_FILE_NAME: str = ".bioreportignore"
+SymlinkPolicy = Literal["skip", "files", "follow"]
+SYMLINK_POLICIES: tuple[str, ...] = ("skip", "files", "follow")
+# directories may be listed concurrently, i.e. by `ascan_dir`
+_visited_dir_lock: threading.Lock = threading.Lock()
+
+
+class PathRule:
+    """
+    A shell-style path pattern in the syntax of `.bioreportignore` files.
+
+    A pattern without "/" is matched against the entry name at any depth. A pattern containing "/" is matched against the path relative to the base directory, a leading "/" is ignored. A trailing "/" restricts the pattern to directories. A leading "!" negates the pattern.
+
+    Attributes
+    ----------
+    pattern : str
+        The original pattern.
+    negate : bool
+        Whether the pattern re-includes the entries it matches.
+    dir_only : bool
+        Whether the pattern only matches directories.
+    """
+
+    def __init__(self: Self, pattern: str, base: str = "") -> None:
+        self.pattern: str = pattern
+        rule_pattern: str = pattern
+        self.negate: bool = rule_pattern.startswith("!")
+        if self.negate:
+            rule_pattern = rule_pattern[1:]
+        self.dir_only: bool = rule_pattern.endswith("/")
+        rule_pattern = rule_pattern.rstrip("/")
+        self._anchored: bool = "/" in rule_pattern
+        if self._anchored:
+            rule_pattern = rule_pattern.lstrip("/")
+            if base != "":
+                rule_pattern = f"{base}/{rule_pattern}"
+        self._regex: re.Pattern = re.compile(translate(rule_pattern))
+
+    def __repr__(self: Self) -> str:
+        return f'{self.__class__.__name__}(pattern: "{self.pattern}")'
+
+    def match(self: Self, rel_path: str, name: str, is_dir: bool) -> bool:
+        """
+        Check whether the pattern matches an entry, ignoring `negate`.
+
+        Parameters
+        ----------
+        rel_path : str
+            The posix path of the entry relative to the scanned directory.
+        name : str
+            The name of the entry.
+        is_dir : bool
+            Whether the entry is a directory.
+
+        Returns
+        -------
+        is_matched : bool
+            Whether the pattern matches the entry.
+        """
+        if self.dir_only and not is_dir:
+            return False
+        return (
+            self._regex.match(rel_path if self._anchored else name) is not None
+        )
+
+
+def parse_rules(patterns: Iterable[str], base: str = "") -> list[PathRule]:
+    """
+    Parse the lines of a `.bioreportignore` file, or a list of patterns.
+
+    Parameters
+    ----------
+    patterns : Iterable[str]
+        The patterns. Blank lines and lines starting with "#" are skipped.
+    base : str, default ""
+        The posix path of the directory holding the patterns, relative to the scanned directory.
+
+    Returns
+    -------
+    rules : list[PathRule]
+        The parsed rules in order.
+    """
+    rules: list[PathRule] = []
+    for line in patterns:
+        pattern: str = line.strip()
+        if pattern == "" or pattern.startswith("#"):
+            continue
+        rules.append(PathRule(pattern, base=base))
+    return rules
+
+
+def match_rules(rules: list[PathRule], rel_path: str, name: str, is_dir: bool) -> bool:
+    """Return whether an entry is matched by rules. The last matching rule wins, a negated rule unmatches."""
+    for rule in reversed(rules):
+        if rule.match(rel_path, name, is_dir):
+            return not rule.negate
+    return False
+
+
+class WalkOptions:
+    """
+    The options of a directory scan: the pruning rules of the walk, the shard of the files to keep and whether to match the members of archives.
+
+    Attributes
+    ----------
+    include_rules : list[PathRule]
+        The rules of the files to yield.
+    exclude_rules : list[PathRule]
+        The rules of the files and directories to skip, before the rules of the ignore files.
+    max_depth : int | None
+        The maximum depth of the directories to walk.
+    symlinks : Literal["skip", "files", "follow"]
+        How to handle symbolic links.
+    max_file_size : int | None
+        Skip files larger than this number of bytes.
+    ignore_file : str | None
+        The name of the files holding exclude patterns.
+    archives : bool
+        Whether to match the members of the tar and zip archives instead of the archives.
+    shard : int
+        The shard of the files to yield.
+    num_shards : int
+        The number of shards.
+    """
+
+    def __init__(  # noqa: PLR0913  one keyword per option, so that the scan functions take a single `options`
+        self: Self,
+        *,
+        include: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        max_depth: int | None = None,
+        symlinks: SymlinkPolicy = "files",
+        max_file_size: int | None = None,
+        ignore_file: str | None = IGNORE_FILE_NAME,
+        archives: bool = False,
+        shard: int = 0,
+        num_shards: int = 1,
+    ) -> None:
+        """
+        Create the options of a scan.
+
+        Parameters
+        ----------
+        include : Iterable[str] | None, default None
+            Shell-style patterns of the files to match. A pattern without "/" is matched against the file name, otherwise against the path relative to the scanned directory. Default is `None`, which means all files.
+        exclude : Iterable[str] | None, default None
+            Patterns of the files and directories to skip, in the syntax of `.bioreportignore` files. Excluded directories are not walked.
+        max_depth : int | None, default None
+            The maximum depth of the directories to walk. `0` means only the files directly in the scanned directory. Default is `None`, which means no limit.
+        symlinks : Literal["skip", "files", "follow"], default "files"
+            How to handle symbolic links. "skip" ignores all symbolic links, "files" matches links to files but does not walk links to directories, "follow" also walks links to directories, each directory once.
+        max_file_size : int | None, default None
+            Skip files larger than this number of bytes. Default is `None`, which means no limit.
+        ignore_file : str | None, default ".bioreportignore"
+            The name of the files holding exclude patterns for their directory and its subdirectories, one pattern per line. `None` means ignore files are not read.
+        archives : bool, default False
+            Whether to match the members of the tar and zip archives, i.e. ".tar.gz" or ".zip" files, instead of the archives. Each archive is read once, the members are matched by name and header, and `Report.member` holds the name of each matched member. Not supported by incremental scans.
+        shard : int, default 0
+            The shard to scan, between 0 and `num_shards - 1`. Each file belongs to one shard, chosen by a stable hash of its path relative to the scanned directory, so that processes or cluster nodes scanning the same directory with the same options split its files between them. See `bioreport.parse_shard`.
+        num_shards : int, default 1
+            The number of shards. Default is `1`, which means all the files are matched. Not supported by incremental scans.
+        """
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f"Invalid symlinks policy: {symlinks}")
+        check_shard(shard, num_shards)
+        self.include_rules: list[PathRule] = (
+            [] if include is None else parse_rules(include)
+        )
+        self.exclude_rules: list[PathRule] = (
+            [] if exclude is None else parse_rules(exclude)
+        )
+        self.max_depth: int | None = max_depth
+        self.symlinks: SymlinkPolicy = symlinks
+        self.max_file_size: int | None = max_file_size
+        self.ignore_file: str | None = ignore_file
+        self.archives: bool = archives
+        self.shard: int = shard
+        self.num_shards: int = num_shards
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the options, also used to key the snapshots of incremental scans."""
+        return (
+            f"{self.__class__.__name__}("
+            f"include: {[r.pattern for r in self.include_rules]}, "
+            f"exclude: {[r.pattern for r in self.exclude_rules]}, "
+            f"max_depth: {self.max_depth}, symlinks: {self.symlinks}, "
+            f"max_file_size: {self.max_file_size}, ignore_file: {self.ignore_file}, "
+            f"archives: {self.archives}, shard: {self.shard}, num_shards: {self.num_shards})"
+        )
+
+
+def check_shard(shard: int, num_shards: int) -> None:
+    """Raise `ValueError` if `shard` is not one of the `num_shards` shards."""
+    if num_shards < 1:
+        raise ValueError(f"num_shards must be a positive integer: {num_shards}")
+    if not 0 <= shard < num_shards:
+        raise ValueError(
+            f"shard must be between 0 and num_shards - 1: {shard}. num_shards: {num_shards}"
+        )
+
+
+def shard_of(rel_path: str, num_shards: int) -> int:
+    """
+    Return the shard of a file.
+
+    The hash is the CRC-32 of the path, which unlike `hash` is the same in every process, on every machine and with every Python version.
+
+    Parameters
+    ----------
+    rel_path : str
+        The path of the file relative to the scanned directory, i.e. "sample_1/sample_1.fastp.json".
+    num_shards : int
+        The number of shards.
+
+    Returns
+    -------
+    shard : int
+        The shard of the file, between 0 and `num_shards - 1`.
+    """
+    if os.sep != "/":
+        rel_path = rel_path.replace(os.sep, "/")
+    return zlib.crc32(rel_path.encode("utf-8", "surrogateescape")) % num_shards
+
+
+def walk_order_key(rel_path: str) -> tuple[tuple[int, str], ...]:
+    """Return the position of a file in a walk, from its posix path relative to the walked directory: the entries of a directory are sorted by name, and its files come before its subdirectories."""
+    part_list: list[str] = rel_path.split("/")
+    return (*((1, part) for part in part_list[:-1]), (0, part_list[-1]))
+
+
+# a directory to walk: (directory path, relative posix path, depth, exclude rules)
+DirTask = tuple[str, str, int, list[PathRule]]
+
+
+def read_ignore_rules(
+    dir_path: str, rel_dir: str, ignore_file: str | None
+) -> list[PathRule]:
+    """Read the rules of the ignore file of a directory, `[]` if there is none."""
+    if ignore_file is None:
+        return []
+    try:
+        with open(os.path.join(dir_path, ignore_file), "r") as f:
+            return parse_rules(f, base=rel_dir)
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        return []
+    except OSError as e:
+        _logger.warning(f"Skipping unreadable ignore file: {dir_path} ({e})")
+        return []
+
+
+def list_dir(
+    dir_task: DirTask,
+    options: WalkOptions,
+    visited_dir_set: set[tuple[int, int]] | None = None,
+) -> tuple[list[os.DirEntry], list[DirTask]] | None:
+    """
+    List a directory with the pruning rules.
+
+    Parameters
+    ----------
+    dir_task : DirTask
+        The directory path, its posix path relative to the walked directory, its depth and the exclude rules inherited from its parents.
+    options : WalkOptions
+        The pruning rules.
+    visited_dir_set : set[tuple[int, int]] | None, default None
+        The `(st_dev, st_ino)` of the directories already walked, updated in place. Only used with `symlinks="follow"`.
+
+    Returns
+    -------
+    dir_listing : tuple[list[os.DirEntry], list[DirTask]] | None
+        The entries of the files and the subdirectories to walk, sorted by name. `None` if the directory cannot be read.
+    """
+    curr_dir, curr_rel_dir, curr_depth, curr_rules = dir_task
+    stats: ScanStats | None = current_stats()
+    start_time: float = time.perf_counter() if stats is not None else 0.0
+    try:
+        with os.scandir(curr_dir) as dir_iter:
+            entry_list: list[os.DirEntry] = sorted(dir_iter, key=lambda e: e.name)
+    except OSError as e:
+        _logger.warning(f"Skipping unreadable directory: {curr_dir} ({e})")
+        return None
+
+    ignore_file: str | None = options.ignore_file
+    if ignore_file is not None and any(e.name == ignore_file for e in entry_list):
+        curr_rules = curr_rules + read_ignore_rules(
+            curr_dir, curr_rel_dir, ignore_file
+        )
+
+    follow_symlinks: bool = options.symlinks == "follow"
+    file_entry_list: list[os.DirEntry] = []
+    sub_dir_list: list[DirTask] = []
+    for entry in entry_list:
+        try:
+            is_symlink: bool = entry.is_symlink()
+            if is_symlink and options.symlinks == "skip":
+                continue
+            is_dir: bool = entry.is_dir(follow_symlinks=follow_symlinks)
+            rel_path: str = (
+                entry.name if curr_rel_dir == "" else f"{curr_rel_dir}/{entry.name}"
+            )
+            if match_rules(curr_rules, rel_path, entry.name, is_dir):
+                continue
+
+            if is_dir:
+                if options.max_depth is not None and curr_depth >= options.max_depth:
+                    continue
+                if follow_symlinks and visited_dir_set is not None:
+                    entry_stat: os.stat_result = entry.stat()
+                    dir_id: tuple[int, int] = (entry_stat.st_dev, entry_stat.st_ino)
+                    with _visited_dir_lock:
+                        if dir_id in visited_dir_set:
+                            continue
+                        visited_dir_set.add(dir_id)
+                sub_dir_list.append((entry.path, rel_path, curr_depth + 1, curr_rules))
+                continue
+
+            if not _keep_file(entry, rel_path, options):
+                continue
+        except OSError as e:
+            _logger.warning(f"Skipping unreadable entry: {entry.path} ({e})")
+            continue
+        file_entry_list.append(entry)
+    if stats is not None:
+        stats.record_dir(len(file_entry_list), time.perf_counter() - start_time)
+    return file_entry_list, sub_dir_list
+
+
+def _keep_file(entry: os.DirEntry, rel_path: str, options: WalkOptions) -> bool:
+    """Return whether a file entry not excluded passes the other pruning rules and belongs to the shard. May raise `OSError`."""
+    if not entry.is_file() or entry.name == options.ignore_file:
+        return False
+    if len(options.include_rules) > 0 and not match_rules(
+        options.include_rules, rel_path, entry.name, False
+    ):
+        return False
+    if (
+        options.num_shards > 1
+        and shard_of(rel_path, options.num_shards) != options.shard
+    ):
+        return False
+    return (
+        options.max_file_size is None or entry.stat().st_size <= options.max_file_size
+    )
+
+
+def start_walk(
+    dir_path: Path, options: WalkOptions
+) -> tuple[DirTask, set[tuple[int, int]]]:
+    """Return the task of the walked directory and the set of the visited directories, holding it with `symlinks="follow"`."""
+    visited_dir_set: set[tuple[int, int]] = set()
+    if options.symlinks == "follow":
+        dir_stat: os.stat_result = dir_path.stat()
+        visited_dir_set.add((dir_stat.st_dev, dir_stat.st_ino))
+    return (str(dir_path), "", 0, options.exclude_rules), visited_dir_set
+
+
+def walk_files(
+    dir_path: Path, options: WalkOptions | None = None
+) -> Iterator[os.DirEntry]:
+    """
+    Walk a directory top-down and yield the entries of the files.
+
+    The entries of each directory are sorted by name. The files of a directory are yielded before its subdirectories are walked. Entries are only stat-ed when needed by `symlinks="follow"` or `max_file_size`.
+
+    Parameters
+    ----------
+    dir_path : Path
+        The directory to walk.
+    options : WalkOptions | None, default None
+        The pruning rules and the shard of the files to yield. Default is `None`, which means the default options.
+
+    Yields
+    ------
+    entry : os.DirEntry
+        The entry of a file.
+    """
+    if options is None:
+        options = WalkOptions()
+    root_dir_task, visited_dir_set = start_walk(dir_path, options)
+    dir_stack: list[DirTask] = [root_dir_task]
+    while len(dir_stack) > 0:
+        dir_listing: tuple[list[os.DirEntry], list[DirTask]] | None = list_dir(
+            dir_stack.pop(), options, visited_dir_set
+        )
+        if dir_listing is None:
+            continue
+        file_entry_list, sub_dir_list = dir_listing
+        yield from file_entry_list
+        # push in reverse so that the subdirectories are walked in name order
+        dir_stack.extend(reversed(sub_dir_list))
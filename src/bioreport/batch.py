@@ -0,0 +1,529 @@
+"""Parse many reports at once."""
+
+import asyncio
+import signal
+import threading
+import time
+import traceback
+from collections import deque
+from collections.abc import Sized
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Self
+
+from bioreport import _aio, _pool
+from bioreport.cache import ParseCache
+from bioreport.report import Report
+from bioreport.report_sum import ReportSum
+from bioreport.search import scan_dir
+from bioreport.stats import ScanStats, current_stats, submit_with_stats
+
+_MAX_CHUNK_SIZE: int = 64  # maximum number of reports parsed by a single pool task
+_CHUNKS_PER_WORKER: int = 4
+_STREAM_CHUNK_SIZE: int = 8  # number of reports parsed by a single pool task when the number of reports is unknown
+
+
+class ParseFailure:
+    """
+    A report that could not be parsed.
+
+    Attributes
+    ----------
+    index : int
+        The position of the report in the input of `parse_all`.
+    report : Report
+        The report.
+    exc_type : str
+        The name of the exception type, i.e. "ValueError" or "TimeoutError".
+    message : str
+        The message of the exception.
+    traceback : str
+        The formatted traceback of the exception.
+    """
+
+    def __init__(
+        self: Self,
+        index: int,
+        report: Report,
+        exc_type: str,
+        message: str,
+        traceback: str = "",
+    ) -> None:
+        self.index: int = index
+        self.report: Report = report
+        self.exc_type: str = exc_type
+        self.message: str = message
+        self.traceback: str = traceback
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the failure by the report path and the error."""
+        if self.report.member is not None:
+            return f'{self.__class__.__name__}(path: "{str(self.report.path)}", member: "{self.report.member}", error: "{self.exc_type}: {self.message}")'
+        return f'{self.__class__.__name__}(path: "{str(self.report.path)}", error: "{self.exc_type}: {self.message}")'
+
+    @classmethod
+    def from_exception(cls, index: int, report: Report, exc: BaseException) -> Self:
+        """
+        Record an exception raised while parsing a report.
+
+        Parameters
+        ----------
+        index : int
+            The position of the report in the input.
+        report : Report
+            The report.
+        exc : BaseException
+            The exception raised.
+
+        Returns
+        -------
+        parse_failure : ParseFailure
+            The failure record.
+        """
+        return cls(
+            index=index,
+            report=report,
+            exc_type=type(exc).__name__,
+            message=str(exc),
+            traceback="".join(traceback.format_exception(exc)),
+        )
+
+    def to_record(self: Self) -> dict[str, Any]:
+        """
+        Convert the failure to plain data, i.e. to be serialized to JSON.
+
+        Returns
+        -------
+        record : dict[str, Any]
+            The index, the report by its path, module and member, and the error.
+        """
+        return {
+            "index": self.index,
+            "path": str(self.report.path),
+            "module": list(self.report.module),
+            "member": self.report.member,
+            "exc_type": self.exc_type,
+            "message": self.message,
+            "traceback": self.traceback,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> Self:
+        """
+        Build a failure from plain data.
+
+        Parameters
+        ----------
+        record : dict[str, Any]
+            The output of `to_record`.
+
+        Returns
+        -------
+        parse_failure : ParseFailure
+            The failure, equal to the one converted.
+        """
+        return cls(
+            index=record["index"],
+            report=Report(
+                path=record["path"],
+                module=tuple(record["module"]),
+                member=record["member"],
+            ),
+            exc_type=record["exc_type"],
+            message=record["message"],
+            traceback=record["traceback"],
+        )
+
+
+class BatchParseResult:
+    """
+    The result of parsing many reports.
+
+    Attributes
+    ----------
+    report_sums : list[ReportSum]
+        The parsed reports, in input order.
+    failures : list[ParseFailure]
+        The reports that could not be parsed, in input order.
+    """
+
+    def __init__(
+        self: Self, report_sums: list[ReportSum], failures: list[ParseFailure]
+    ) -> None:
+        self.report_sums: list[ReportSum] = report_sums
+        self.failures: list[ParseFailure] = failures
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the result by the numbers of parsed and failed reports."""
+        return f"{self.__class__.__name__}(parsed: {len(self.report_sums)}, failed: {len(self.failures)})"
+
+    @property
+    def ok(self: Self) -> bool:
+        """
+        Whether all the reports have been parsed.
+
+        Returns
+        -------
+        ok : bool
+            `True` if there is no failure.
+        """
+        return len(self.failures) == 0
+
+
+def parse_all(
+    reports: Iterable[Report],
+    workers: int = 1,
+    *,
+    timeout: float | None = None,
+    cache: ParseCache | None = None,
+    arrays: bool = False,
+) -> BatchParseResult:
+    """
+    Parse many reports. A report that fails to parse is recorded instead of stopping the batch.
+
+    Parameters
+    ----------
+    reports : Iterable[Report]
+        The reports to parse.
+    workers : int, default 1
+        The number of processes parsing reports. Default is `1`, which means reports are parsed serially in the current process.
+    timeout : float | None, default None
+        The maximum number of seconds spent on a single report. A report exceeding it is recorded as a `TimeoutError` failure. Default is `None`, which means no limit. Needs `SIGALRM`, so it is not available on Windows, and with `workers=1` it must be called from the main thread.
+    cache : ParseCache | None, default None
+        A cache of parsed reports. Only the reports missing from the cache are sent to the workers, and their summaries are added to the cache by the current process. Default is `None`, which means no cache.
+    arrays : bool, default False
+        Also parse the array-valued metrics of the reports into `ReportSum.arrays`. See `Report.parse`.
+
+    Returns
+    -------
+    batch_parse_result : BatchParseResult
+        The parsed reports and the failures, both in input order.
+    """
+    stats: ScanStats | None = current_stats()
+    start_time: float = time.perf_counter()
+    report_list: list[Report] = list(reports)
+    result_iter: Iterator[ReportSum | ParseFailure] = iter_parse_all(
+        report_list, workers=workers, timeout=timeout, cache=cache, arrays=arrays
+    )
+
+    from rich.progress import (  # noqa: PLC0415  about 45 ms to import, only parses show progress
+        track,
+    )
+
+    report_sum_list: list[ReportSum] = []
+    failure_list: list[ParseFailure] = []
+    for result in track(
+        result_iter, total=len(report_list), description="Parsing reports..."
+    ):
+        if isinstance(result, ParseFailure):
+            failure_list.append(result)
+        else:
+            report_sum_list.append(result)
+
+    batch_parse_result: BatchParseResult = BatchParseResult(
+        report_sums=report_sum_list, failures=failure_list
+    )
+    if stats is not None:
+        stats.record_stage("parse_all", time.perf_counter() - start_time)
+    return batch_parse_result
+
+
+def iter_parse_all(
+    reports: Iterable[Report],
+    workers: int = 1,
+    *,
+    timeout: float | None = None,
+    cache: ParseCache | None = None,
+    arrays: bool = False,
+) -> Iterator[ReportSum | ParseFailure]:
+    """
+    Parse many reports and yield the results as they are ready, in input order.
+
+    The reports are consumed while results are yielded, so a generator of reports, i.e. `iter_scan_dir`, is parsed while it is scanned. With more than one worker, the number of reports submitted but not yet yielded is bounded. The parameters are the same as `parse_all`.
+
+    Parameters
+    ----------
+    reports : Iterable[Report]
+        The reports to parse.
+    workers : int, default 1
+        The number of processes parsing reports.
+    timeout : float | None, default None
+        The maximum number of seconds spent on a single report. See `parse_all`.
+    cache : ParseCache | None, default None
+        A cache of parsed reports. See `parse_all`. The cache is flushed when the iteration ends or stops early.
+    arrays : bool, default False
+        Also parse the array-valued metrics of the reports. See `parse_all`.
+
+    Yields
+    ------
+    result : ReportSum | ParseFailure
+        The parsed report, or the failure if it could not be parsed.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be a positive integer: {workers}")
+    if timeout is not None:
+        if timeout <= 0:
+            raise ValueError(f"timeout must be positive: {timeout}")
+        if not hasattr(signal, "SIGALRM"):
+            raise ValueError("timeout is not supported on this platform.")
+        if workers == 1 and threading.current_thread() is not threading.main_thread():
+            raise ValueError(
+                "timeout with workers=1 is only supported in the main thread."
+            )
+    return _iter_parse_results(reports, workers, timeout, cache, arrays)
+
+
+def scan_and_parse(
+    dir: str | Path,
+    workers: int = 1,
+    *,
+    timeout: float | None = None,
+    cache: ParseCache | None = None,
+    arrays: bool = False,
+    **scan_kwargs: Any,
+) -> BatchParseResult:
+    """
+    Scan a directory and parse all the reports found.
+
+    Parameters
+    ----------
+    dir : str | Path
+        The directory to scan.
+    workers : int, default 1
+        The number of workers, used both to match files and to parse reports.
+    timeout : float | None, default None
+        The maximum number of seconds spent on parsing a single report. See `parse_all`.
+    cache : ParseCache | None, default None
+        A cache of parsed reports. See `parse_all`.
+    arrays : bool, default False
+        Also parse the array-valued metrics of the reports. See `parse_all`.
+    **scan_kwargs : Any
+        Other keyword arguments passed to `scan_dir`, i.e. `options` or `snapshot`.
+
+    Returns
+    -------
+    batch_parse_result : BatchParseResult
+        The parsed reports and the failures, both in scan order.
+    """
+    report_list: list[Report] = scan_dir(dir, workers=workers, **scan_kwargs)
+    batch_parse_result: BatchParseResult = parse_all(
+        report_list, workers=workers, timeout=timeout, cache=cache, arrays=arrays
+    )
+    return batch_parse_result
+
+
+async def aparse_all(
+    reports: Iterable[Report],
+    concurrency: int = 64,
+    *,
+    cache: ParseCache | None = None,
+    arrays: bool = False,
+    executor: Executor | None = None,
+) -> BatchParseResult:
+    """
+    Parse many reports from an asyncio event loop. A report that fails to parse is recorded instead of stopping the batch.
+
+    Reports are parsed in threads by `concurrency` worker tasks, so that the event loop keeps up to `concurrency` of them in flight. Suits storage with a high latency per file, parsing itself is still bound by a single CPU.
+
+    Parameters
+    ----------
+    reports : Iterable[Report]
+        The reports to parse.
+    concurrency : int, default 64
+        The maximum number of reports parsed at once.
+    cache : ParseCache | None, default None
+        A cache of parsed reports, flushed at the end. Default is `None`, which means no cache.
+    arrays : bool, default False
+        Also parse the array-valued metrics of the reports. See `parse_all`.
+    executor : Executor | None, default None
+        The thread pool running the parses, left open. Default is `None`, which means a pool of `concurrency` threads created for the batch.
+
+    Returns
+    -------
+    batch_parse_result : BatchParseResult
+        The parsed reports and the failures, both in input order.
+    """
+    _aio.check_concurrency(concurrency)
+    stats: ScanStats | None = current_stats()
+    start_time: float = time.perf_counter()
+    report_list: list[Report] = list(reports)
+    result_list: list[ReportSum | ParseFailure | None] = [None] * len(report_list)
+    # shared by the workers, each takes the next report when it is done with one
+    index_iter: Iterator[int] = iter(range(len(report_list)))
+
+    async def parse_reports(pool: Executor) -> None:
+        """Parse the next reports of the batch until there is none left."""
+        for index in index_iter:
+            result_list[index] = await _aio.run_blocking(
+                pool, None, _parse_cached_report, index, report_list[index], cache, arrays
+            )
+
+    async with _aio.thread_pool(executor, concurrency) as pool:
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for _ in range(min(concurrency, len(report_list))):
+                    task_group.create_task(parse_reports(pool))
+        finally:
+            if cache is not None:
+                await _aio.run_blocking(pool, None, cache.flush)
+
+    batch_parse_result: BatchParseResult = BatchParseResult(
+        report_sums=[r for r in result_list if isinstance(r, ReportSum)],
+        failures=[r for r in result_list if isinstance(r, ParseFailure)],
+    )
+    if stats is not None:
+        stats.record_stage("aparse_all", time.perf_counter() - start_time)
+    return batch_parse_result
+
+
+def _iter_parse_results(
+    reports: Iterable[Report],
+    workers: int,
+    timeout: float | None,
+    cache: ParseCache | None,
+    arrays: bool,
+) -> Iterator[ReportSum | ParseFailure]:
+    """Parse chunks of reports, in a pool if `workers` is greater than 1, and yield the results in input order."""
+    chunk_size: int = _chunk_size(reports, workers)
+    pool: ProcessPoolExecutor | None = None
+    # without pool, a chunk is parsed as soon as it is full
+    max_pending_chunk_num: int = 0
+    if workers > 1:
+        # the reports may be yielded by a scan running in threads, i.e. `iter_scan_dir`
+        pool = _pool.process_pool(workers)
+        max_pending_chunk_num = workers * _CHUNKS_PER_WORKER
+    pending_chunk_queue: deque[_ParseChunk] = deque()
+    try:
+        chunk: _ParseChunk = _ParseChunk(cache, arrays)
+        for i, report in enumerate(reports):
+            chunk.add(i, report, timeout)
+            if len(chunk) < chunk_size:
+                continue
+            pending_chunk_queue.append(chunk.submit(pool))
+            chunk = _ParseChunk(cache, arrays)
+            while len(pending_chunk_queue) > max_pending_chunk_num:
+                yield from pending_chunk_queue.popleft().results()
+        if len(chunk) > 0:
+            pending_chunk_queue.append(chunk.submit(pool))
+        while len(pending_chunk_queue) > 0:
+            yield from pending_chunk_queue.popleft().results()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if cache is not None:
+            cache.flush()
+
+
+def _chunk_size(reports: Iterable[Report], workers: int) -> int:
+    """Return the number of reports parsed by a single pool task, so that each worker gets several tasks."""
+    if workers == 1:
+        return 1
+    if not isinstance(reports, Sized):
+        return _STREAM_CHUNK_SIZE
+    return max(1, min(_MAX_CHUNK_SIZE, len(reports) // (workers * _CHUNKS_PER_WORKER)))
+
+
+class _ParseChunk:
+    """Reports parsed by a single pool task, the cached ones being resolved beforehand."""
+
+    def __init__(self: Self, cache: ParseCache | None, arrays: bool) -> None:
+        self.cache: ParseCache | None = cache
+        self.arrays: bool = arrays
+        self.result_list: list[ReportSum | ParseFailure | None] = []
+        self.cache_key_list: list[str | None] = []
+        self.task_list: list[tuple[int, Report, float | None]] = []
+        self.task_slot_list: list[int] = []
+        self.future: Future[list[ReportSum | ParseFailure]] | None = None
+
+    def __len__(self: Self) -> int:
+        return len(self.result_list)
+
+    def add(self: Self, index: int, report: Report, timeout: float | None) -> None:
+        cache_key: str | None = None
+        cached_report_sum: ReportSum | None = None
+        if self.cache is not None:
+            # keys are computed before parsing, a file changed meanwhile is not cached
+            cache_key = self.cache.key(report, arrays=self.arrays)
+            cached_report_sum = self.cache.get(report, key=cache_key)
+        if cached_report_sum is None:
+            self.task_slot_list.append(len(self.result_list))
+            self.task_list.append((index, report, timeout))
+        self.result_list.append(cached_report_sum)
+        self.cache_key_list.append(cache_key)
+
+    def submit(self: Self, pool: ProcessPoolExecutor | None) -> Self:
+        """Submit the reports to parse to the pool. Without pool, they are parsed when the results are needed."""
+        if pool is not None and len(self.task_list) > 0:
+            self.future = submit_with_stats(
+                pool, _parse_tasks, self.task_list, self.arrays
+            )
+        return self
+
+    def results(self: Self) -> list[ReportSum | ParseFailure]:
+        """Wait for the parsed reports and add them to the cache."""
+        parsed_list: list[ReportSum | ParseFailure] = (
+            _parse_tasks(self.task_list, self.arrays)
+            if self.future is None
+            else self.future.result()
+        )
+        for slot, (_, report, _), result in zip(
+            self.task_slot_list, self.task_list, parsed_list
+        ):
+            self.result_list[slot] = result
+            cache_key: str | None = self.cache_key_list[slot]
+            if (
+                self.cache is not None
+                and cache_key is not None
+                and isinstance(result, ReportSum)
+            ):
+                self.cache.put(report, result, key=cache_key)
+        return [result for result in self.result_list if result is not None]
+
+
+def _parse_tasks(
+    task_list: list[tuple[int, Report, float | None]], arrays: bool
+) -> list[ReportSum | ParseFailure]:
+    """Parse a chunk of reports. Runs in the pool workers."""
+    return [_parse_task(task, arrays) for task in task_list]
+
+
+def _parse_task(
+    task: tuple[int, Report, float | None], arrays: bool
+) -> ReportSum | ParseFailure:
+    """Parse a single report. Runs in the pool workers."""
+    index, report, timeout = task
+    try:
+        with _time_limit(timeout):
+            return report.parse(arrays=arrays)
+    except Exception as e:
+        return ParseFailure.from_exception(index=index, report=report, exc=e)
+
+
+def _parse_cached_report(
+    index: int, report: Report, cache: ParseCache | None, arrays: bool
+) -> ReportSum | ParseFailure:
+    """Parse a single report with a cache. Runs in the threads of `aparse_all`."""
+    try:
+        return report.parse(cache=cache, arrays=arrays)
+    except Exception as e:
+        return ParseFailure.from_exception(index=index, report=report, exc=e)
+
+
+@contextmanager
+def _time_limit(timeout: float | None) -> Iterator[None]:
+    """Raise `TimeoutError` in the block after `timeout` seconds."""
+    if timeout is None:
+        yield
+        return
+
+    def _raise_timeout(signum, frame) -> None:
+        raise TimeoutError(f"Parsing took longer than {timeout} seconds.")
+
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
@@ -0,0 +1,406 @@
+"""Cache of parsed reports."""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Self
+
+from bioreport import _registry
+from bioreport.report import Report
+from bioreport.report_sum import ReportSum
+
+_SQLITE_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS report_sum (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS report_sum_accessed ON report_sum (accessed);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_meta (name, value)
+    SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM report_sum;
+"""
+_ACCESS_TOUCH_INTERVAL: float = 3600.0  # seconds before the access time of a hit is written again
+
+# the caches of the process, closed at exit by a single hook that does not keep them alive
+_cache_set: "weakref.WeakSet[ParseCache]" = weakref.WeakSet()
+
+
+class ParseCache:
+    """
+    A cache of parsed reports, an in-memory LRU in front of an optional SQLite file.
+
+    Entries are keyed by the file path, size and modification time, the module of the report and the version of its parser, so a changed file or parser is parsed again. The SQLite file can be shared by several processes, each opens its own connection and waits for the locks of the others. Summaries are stored as JSON, see `ReportSum.to_record`, so reading a file written by someone else runs no code of theirs; an entry that cannot be decoded is a miss.
+
+    Attributes
+    ----------
+    path : Path | None
+        The path to the SQLite file. `None` for an in-memory cache only.
+    memory_items : int
+        The maximum number of entries kept in memory.
+    max_bytes : int | None
+        The maximum total size of the entries in the SQLite file. The least recently used entries are evicted beyond it. `None` means no limit.
+
+    Methods
+    -------
+    key(report: Report) -> str | None
+        Return the cache key of a report.
+    get(report: Report, name: Hashable | None = None, *, key: str | None = None) -> ReportSum | None
+        Get the cached summary of a report, `None` if it is missing or outdated.
+    put(report: Report, report_sum: ReportSum, *, key: str | None = None) -> None
+        Cache the summary of a report.
+    flush() -> None
+        Write the pending entries to the SQLite file and evict the entries beyond `max_bytes`.
+    clear() -> None
+        Remove all the entries.
+    close() -> None
+        Flush and close the SQLite connection.
+    """
+
+    def __init__(  # noqa: PLR0913  keyword-only tuning options with defaults, like the options of sqlite3.connect
+        self: Self,
+        path: str | Path | None = None,
+        *,
+        memory_items: int = 4096,
+        max_bytes: int | None = 1 << 30,
+        timeout: float = 60.0,
+        wal: bool = False,
+        write_batch_size: int = 256,
+    ) -> None:
+        """
+        Create a cache.
+
+        Parameters
+        ----------
+        path : str | Path | None, default None
+            The path to the SQLite file, created if missing. Default is `None`, which means an in-memory cache only.
+        memory_items : int, default 4096
+            The maximum number of entries kept in memory.
+        max_bytes : int | None, default 1 GiB
+            The maximum total size of the entries in the SQLite file. `None` means no limit.
+        timeout : float, default 60.0
+            The number of seconds to wait for a lock held by another process.
+        wal : bool, default False
+            Use the write-ahead log journal mode. Faster with concurrent readers, but only safe when all the processes run on the same host, do not enable it on network file systems.
+        write_batch_size : int, default 256
+            The number of entries written to the SQLite file in a single transaction.
+        """
+        self.path: Path | None = None if path is None else Path(path).absolute()
+        self.memory_items: int = memory_items
+        self.max_bytes: int | None = max_bytes
+        self._timeout: float = timeout
+        self._wal: bool = wal
+        self._write_batch_size: int = write_batch_size
+        self._init_state()
+
+    def _init_state(self: Self) -> None:
+        self._lock: threading.RLock = threading.RLock()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._pending: dict[str, bytes] = {}
+        self._connection: sqlite3.Connection | None = None
+        self._connection_pid: int | None = None
+        _cache_set.add(self)
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the cache by its file path."""
+        return f'{self.__class__.__name__}(path: "{self.path}")'
+
+    def __getstate__(self: Self) -> dict[str, Any]:
+        """Flush the pending entries and return the settings, without the connection and the memory entries, which are not shared with other processes."""
+        self.flush()
+        return {
+            "path": self.path,
+            "memory_items": self.memory_items,
+            "max_bytes": self.max_bytes,
+            "_timeout": self._timeout,
+            "_wal": self._wal,
+            "_write_batch_size": self._write_batch_size,
+        }
+
+    def __setstate__(self: Self, state: dict[str, Any]) -> None:
+        """Restore the settings and start with no connection and no memory entries."""
+        self.__dict__.update(state)
+        self._init_state()
+
+    def __del__(self: Self) -> None:
+        """Flush the pending entries of a cache dropped without `close`. Nothing to do if `__init__` failed before the state was set."""
+        if "_lock" in self.__dict__:
+            self.close()
+
+    def _connect(self: Self) -> sqlite3.Connection | None:
+        """Open the SQLite connection of the current process on first use."""
+        if self.path is None:
+            return None
+        if self._connection is not None and self._connection_pid == os.getpid():
+            return self._connection
+        # a connection inherited through fork must not be used
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection: sqlite3.Connection = sqlite3.connect(
+            self.path,
+            timeout=self._timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute(f"PRAGMA journal_mode={'WAL' if self._wal else 'DELETE'}")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SQLITE_SCHEMA)
+        self._connection = connection
+        self._connection_pid = os.getpid()
+        return connection
+
+    @classmethod
+    def key(cls, report: Report, arrays: bool = False) -> str | None:
+        """
+        Return the cache key of a report.
+
+        Parameters
+        ----------
+        report : Report
+            The report.
+        arrays : bool, default False
+            Whether the summary holds the array-valued metrics of the report, see `Report.parse`.
+
+        Returns
+        -------
+        key : str | None
+            The key built from the file path, the archive member if any, the size and modification time of the file, the module, the parser version and whether the summary holds arrays. `None` if the file cannot be stat-ed or the report has no module.
+        """
+        if report.with_empty_module():
+            return None
+        try:
+            file_stat: os.stat_result = report.path.stat()
+        except OSError:
+            return None
+        parser_version: str = _registry.parser_version(report.module[0])
+        key_list: list[Any] = [
+            str(report.path)
+            if report.member is None
+            else [str(report.path), report.member],
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            list(report.module),
+            parser_version,
+        ]
+        # the keys of the summaries without arrays are unchanged
+        if arrays:
+            key_list.append("arrays")
+        return json.dumps(key_list)
+
+    def get(
+        self: Self,
+        report: Report,
+        name: Hashable | None = None,
+        *,
+        key: str | None = None,
+    ) -> ReportSum | None:
+        """
+        Get the cached summary of a report.
+
+        Parameters
+        ----------
+        report : Report
+            The report.
+        name : Hashable | None, default None
+            The name of the returned summary. If `None`, the name will be the same as the file name.
+        key : str | None, default None
+            The key of the report from `key`. Default is `None`, which means the key is computed now.
+
+        Returns
+        -------
+        report_sum : ReportSum | None
+            A copy of the cached summary. `None` if it is missing or outdated.
+        """
+        if key is None:
+            key = self.key(report)
+        if key is None:
+            return None
+        value: bytes | None = self._get_value(key)
+        if value is None:
+            return None
+        try:
+            report_sum: ReportSum = ReportSum.from_record(json.loads(value))
+        except (ValueError, TypeError, KeyError):
+            # i.e. an entry written in another format
+            return None
+        report_sum.rename(report.file_name if name is None else name)
+        return report_sum
+
+    def _get_value(self: Self, key: str) -> bytes | None:
+        with self._lock:
+            value: bytes | None = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value
+            value = self._pending.get(key)
+            if value is not None:
+                return value
+            connection: sqlite3.Connection | None = self._connect()
+            if connection is None:
+                return None
+            row: tuple | None = connection.execute(
+                "SELECT value, accessed FROM report_sum WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value = row[0]
+            now: float = time.time()
+            if now - row[1] > _ACCESS_TOUCH_INTERVAL:
+                connection.execute(
+                    "UPDATE report_sum SET accessed = ? WHERE key = ?", (now, key)
+                )
+            self._remember(key, value)
+            return value
+
+    def _remember(self: Self, key: str, value: bytes) -> None:
+        """Keep an entry in memory, dropping the least recently used beyond `memory_items`."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def put(
+        self: Self, report: Report, report_sum: ReportSum, *, key: str | None = None
+    ) -> None:
+        """
+        Cache the summary of a report. Entries are written to the SQLite file in batches, see `flush`.
+
+        Parameters
+        ----------
+        report : Report
+            The report.
+        report_sum : ReportSum
+            The summary parsed from the report.
+        key : str | None, default None
+            The key of the report from `key`, computed before parsing so that a file changed while it was parsed is not cached under its new state. Default is `None`, which means the key is computed now.
+        """
+        if key is None:
+            key = self.key(report)
+        if key is None:
+            return
+        value: bytes = json.dumps(
+            report_sum.to_record(), ensure_ascii=False
+        ).encode("utf-8")
+        with self._lock:
+            self._remember(key, value)
+            if self.path is None:
+                return
+            self._pending[key] = value
+            if len(self._pending) >= self._write_batch_size:
+                self.flush()
+
+    def flush(self: Self) -> None:
+        """Write the pending entries to the SQLite file and evict the entries beyond `max_bytes`."""
+        with self._lock:
+            connection: sqlite3.Connection | None = self._connect()
+            if connection is None or len(self._pending) == 0:
+                return
+            now: float = time.time()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # the total size is kept up to date in the same transaction, instead of summing the table
+                replaced_bytes: int = 0
+                for key in self._pending:
+                    row: tuple | None = connection.execute(
+                        "SELECT size FROM report_sum WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        replaced_bytes += row[0]
+                connection.executemany(
+                    "INSERT OR REPLACE INTO report_sum (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    [(k, v, len(v), now) for k, v in self._pending.items()],
+                )
+                self._add_total_bytes(
+                    connection,
+                    sum(len(v) for v in self._pending.values()) - replaced_bytes,
+                )
+                if self.max_bytes is not None:
+                    self._evict(connection, self.max_bytes)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            self._pending.clear()
+
+    @classmethod
+    def _evict(cls, connection: sqlite3.Connection, max_bytes: int) -> None:
+        """Delete the least recently used entries until the total size is at most `max_bytes`. Runs in the transaction of the insertions."""
+        total_bytes: int = cls._total_bytes(connection)
+        if total_bytes <= max_bytes:
+            return
+        bytes_to_free: int = total_bytes - max_bytes
+        freed_bytes: int = 0
+        key_list: list[str] = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM report_sum ORDER BY accessed"
+        ):
+            key_list.append(key)
+            freed_bytes += size
+            if freed_bytes >= bytes_to_free:
+                break
+        connection.executemany(
+            "DELETE FROM report_sum WHERE key = ?", [(k,) for k in key_list]
+        )
+        cls._add_total_bytes(connection, -freed_bytes)
+
+    @staticmethod
+    def _total_bytes(connection: sqlite3.Connection) -> int:
+        """Return the total size of the entries in the SQLite file."""
+        return connection.execute(
+            "SELECT value FROM cache_meta WHERE name = 'total_bytes'"
+        ).fetchone()[0]
+
+    @staticmethod
+    def _add_total_bytes(connection: sqlite3.Connection, size: int) -> None:
+        """Add to the total size of the entries in the SQLite file."""
+        connection.execute(
+            "UPDATE cache_meta SET value = value + ? WHERE name = 'total_bytes'",
+            (size,),
+        )
+
+    def clear(self: Self) -> None:
+        """Remove all the entries."""
+        with self._lock:
+            self._memory.clear()
+            self._pending.clear()
+            connection: sqlite3.Connection | None = self._connect()
+            if connection is None:
+                return
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM report_sum")
+                connection.execute(
+                    "UPDATE cache_meta SET value = 0 WHERE name = 'total_bytes'"
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def close(self: Self) -> None:
+        """Flush and close the SQLite connection."""
+        with self._lock:
+            self.flush()
+            if self._connection is None or self._connection_pid != os.getpid():
+                return
+            self._connection.close()
+            self._connection = None
+            self._connection_pid = None
+
+
+def _close_caches() -> None:
+    """Close the caches still alive at exit."""
+    for cache in list(_cache_set):
+        cache.close()
+
+
+atexit.register(_close_caches)
@@ -0,0 +1,411 @@
+"""Classify files into report types."""
+
+import hashlib
+import json
+import os
+import re
+import time
+from contextlib import ExitStack
+from fnmatch import translate
+from functools import partial
+from pathlib import Path
+from typing import IO, Callable, Self
+
+from bioreport import _compression, _config, _registry
+from bioreport.stats import ScanStats, current_stats, record_file_read
+
+_GLOB_MAGIC_CHARS: str = "*?["
+
+HEADER_BYTE_LIMIT: int = 64 * 1024  # the default maximum number of bytes read to check the content of a file
+_HEADER_CHUNK_SIZE: int = 4096
+# the leading bytes of bulk data files, which are never reports
+_BINARY_MAGIC_NUMBERS: tuple[bytes, ...] = (
+    b"\x1f\x8b",  # gzip, including BGZF, i.e. BAM, "fastq.gz" and "vcf.gz"
+    b"BAM\x01",  # uncompressed BAM
+    b"CRAM",
+)
+_NEWLINE_REGEX: re.Pattern = re.compile(r"\r\n|\r|\n")
+
+
+class ReportPattern:
+    """
+    A compiled report pattern from `report_pattern.toml`.
+
+    Attributes
+    ----------
+    key : str
+        The key of the pattern, i.e. "fastp-json".
+    module : tuple[str, ...]
+        The module and submodule of the pattern, i.e. `("fastp", "json")`.
+    order : int
+        The position of the pattern in the configuration.
+    name_suffix : str
+        The literal suffix every matched file name ends with, `""` if there is none. Used for indexing.
+    content_line_num : int
+        The number of header lines needed to check the content of a file. `0` if there is no content check.
+
+    Methods
+    -------
+    match_name(file_name: str) -> bool
+        Check the file name against `pattern_glob`, `exclude_glob` and `pattern_regex`.
+    match_content(lines: list[str]) -> bool
+        Check the header lines of a file against `content_regex`.
+    """
+
+    def __init__(self: Self, key: str, patterns: dict, order: int = 0) -> None:
+        self.key: str = key
+        self.module: tuple[str, ...] = tuple(key.split(_config.REPORT_PATTERN_NAME_SEP))
+        self.order: int = order
+
+        pattern_glob: str | None = patterns.get("pattern_glob")
+        self._glob_regex: re.Pattern | None = None
+        self.name_suffix: str = ""
+        if pattern_glob is not None:
+            self._glob_regex = re.compile(translate(os.path.normcase(pattern_glob)))
+            self.name_suffix = os.path.normcase(_glob_literal_suffix(pattern_glob))
+
+        exclude_glob: str | list[str] = patterns.get("exclude_glob", [])
+        if isinstance(exclude_glob, str):
+            exclude_glob = [exclude_glob]
+        self._exclude_regex: re.Pattern | None = None
+        if len(exclude_glob) > 0:
+            self._exclude_regex = re.compile(
+                "|".join(translate(os.path.normcase(g)) for g in exclude_glob)
+            )
+
+        pattern_regex: str | None = patterns.get("pattern_regex")
+        self._name_regex: re.Pattern | None = (
+            None if pattern_regex is None else re.compile(pattern_regex)
+        )
+
+        content_regex: str | None = patterns.get("content_regex")
+        self._content_regex_list: list[re.Pattern] = (
+            []
+            if content_regex is None
+            else [re.compile(line) for line in content_regex.splitlines()]
+        )
+        self.content_line_num: int = len(self._content_regex_list)
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the pattern by its key."""
+        return f'{self.__class__.__name__}(key: "{self.key}")'
+
+    def match_name(self: Self, file_name: str) -> bool:
+        """
+        Check the file name against `pattern_glob`, `exclude_glob` and `pattern_regex`.
+
+        Parameters
+        ----------
+        file_name : str
+            The base name of the file.
+
+        Returns
+        -------
+        is_matched : bool
+            Whether the file name passes all the name checks.
+        """
+        norm_file_name: str = os.path.normcase(file_name)
+        if self._glob_regex is not None and not self._glob_regex.match(norm_file_name):
+            return False
+        if self._exclude_regex is not None and self._exclude_regex.match(
+            norm_file_name
+        ):
+            return False
+        if self._name_regex is not None and not self._name_regex.match(file_name):
+            return False
+        return True
+
+    def match_content(self: Self, lines: list[str]) -> bool:
+        r"""
+        Check the header lines of a file against `content_regex`.
+
+        Parameters
+        ----------
+        lines : list[str]
+            The first lines of the file without "\n". May contain more lines than needed.
+
+        Returns
+        -------
+        is_matched : bool
+            Whether every line of `content_regex` matches the corresponding line of the file.
+        """
+        if len(lines) < self.content_line_num:
+            return False
+        return all(
+            regex.match(line) is not None
+            for regex, line in zip(self._content_regex_list, lines)
+        )
+
+
+class ReportClassifier:
+    """
+    Determine the report type of files. Built once from the report patterns and reused for every file.
+
+    File names are checked first. Only files with at least one candidate pattern that checks the content are opened, and their header is read once with the largest number of lines any candidate needs. The header is read in binary mode, up to `header_byte_limit` bytes, so that the time spent on a file does not depend on its size. Files compressed with gzip, bz2, xz or zstd, i.e. "sample.json.gz", are classified by their name without the compression suffix and the decompressed header. Files starting with the magic number of a bulk data format, i.e. gzip, BGZF, BAM or CRAM, containing a null byte, or not valid UTF-8 are not reports.
+
+    Attributes
+    ----------
+    patterns : tuple[ReportPattern, ...]
+        The compiled report patterns in configuration order.
+    header_byte_limit : int
+        The maximum number of bytes read to check the content of a file. Lines not complete within it are not checked.
+    digest : str
+        A hash of the report patterns and the header byte limit. Classifiers with the same digest classify files the same way.
+
+    Methods
+    -------
+    default() -> ReportClassifier
+        Return the classifier built from the package `report_pattern.toml` and the patterns of third-party modules. Built on first use and shared.
+    candidates(file_name: str) -> list[ReportPattern]
+        Return the patterns whose name checks pass for the file name.
+    classify(file: str | Path) -> tuple[str, ...]
+        Determine the module of a file.
+    classify_stream(file_name: str, open_file: Callable[[], IO[bytes]], *, label: str | None = None) -> tuple[str, ...]
+        Determine the module of a file read from a binary stream, i.e. the member of an archive.
+    """
+
+    _default: "ReportClassifier | None" = None
+
+    def __init__(
+        self: Self,
+        report_pattern: dict[str, dict] | None = None,
+        header_byte_limit: int = HEADER_BYTE_LIMIT,
+    ) -> None:
+        if header_byte_limit < 1:
+            raise ValueError(
+                f"header_byte_limit must be a positive integer: {header_byte_limit}"
+            )
+        self.header_byte_limit: int = header_byte_limit
+        if report_pattern is None:
+            report_pattern = _registry.report_pattern()
+        self.patterns: tuple[ReportPattern, ...] = tuple(
+            ReportPattern(key=key, patterns=patterns, order=order)
+            for order, (key, patterns) in enumerate(report_pattern.items())
+        )
+        self.digest: str = hashlib.sha1(
+            json.dumps(
+                [report_pattern, header_byte_limit, _compression.available_suffixes()],
+                sort_keys=True,
+            ).encode()
+        ).hexdigest()
+
+        # index the patterns by the extension of their literal name suffix
+        self._suffix_index: dict[str, list[ReportPattern]] = {}
+        self._unindexed_patterns: list[ReportPattern] = []
+        for pattern in self.patterns:
+            suffix_ext: str = _file_name_ext(pattern.name_suffix)
+            if suffix_ext == "":
+                self._unindexed_patterns.append(pattern)
+            else:
+                self._suffix_index.setdefault(suffix_ext, []).append(pattern)
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the classifier by the keys of its patterns."""
+        pattern_keys_str: str = ", ".join(p.key for p in self.patterns)
+        return f"{self.__class__.__name__}(patterns: [{pattern_keys_str}])"
+
+    @classmethod
+    def default(cls) -> "ReportClassifier":
+        """
+        Return the classifier built from the package `report_pattern.toml` and the patterns of third-party modules. Built on first use and shared.
+
+        Returns
+        -------
+        classifier : ReportClassifier
+            The default classifier.
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def candidates(self: Self, file_name: str) -> list[ReportPattern]:
+        """
+        Return the patterns whose name checks pass for the file name.
+
+        Parameters
+        ----------
+        file_name : str
+            The base name of the file.
+
+        Returns
+        -------
+        candidate_list : list[ReportPattern]
+            The candidate patterns in configuration order.
+        """
+        indexed_patterns: list[ReportPattern] = self._suffix_index.get(
+            _file_name_ext(os.path.normcase(file_name)), []
+        )
+        candidate_list: list[ReportPattern] = [
+            p
+            for p in sorted(
+                indexed_patterns + self._unindexed_patterns, key=lambda x: x.order
+            )
+            if p.match_name(file_name)
+        ]
+        return candidate_list
+
+    def classify(self: Self, file: str | Path) -> tuple[str, ...]:
+        """
+        Determine the module of a file.
+
+        Parameters
+        ----------
+        file : str | Path
+            The file to classify. Must be an existing regular file.
+
+        Returns
+        -------
+        module : tuple[str, ...]
+            The module of the file. `()` if no pattern matches.
+        """
+        file_path: Path = Path(file)
+        return self.classify_stream(
+            file_path.name, partial(open, file_path, "rb", buffering=0), label=str(file_path)
+        )
+
+    def classify_stream(
+        self: Self,
+        file_name: str,
+        open_file: Callable[[], IO[bytes]],
+        *,
+        label: str | None = None,
+    ) -> tuple[str, ...]:
+        """
+        Determine the module of a file read from a binary stream, i.e. the member of an archive.
+
+        Parameters
+        ----------
+        file_name : str
+            The base name of the file.
+        open_file : Callable[[], IO[bytes]]
+            A function opening the file. Only called if a candidate pattern checks the content, the file is closed after reading its header.
+        label : str | None, default None
+            The path of the file in the error messages and the statistics. Default is `None`, which means `file_name`.
+
+        Returns
+        -------
+        module : tuple[str, ...]
+            The module of the file. `()` if no pattern matches.
+        """
+        if label is None:
+            label = file_name
+        stats: ScanStats | None = current_stats()
+        start_time: float = time.perf_counter() if stats is not None else 0.0
+        stem_name, compression = _compression.split_compression_suffix(file_name)
+        candidate_list: list[ReportPattern] = self.candidates(stem_name)
+        module: tuple[str, ...] = tuple()
+        sniff_seconds: float = 0.0
+        if len(candidate_list) > 0:
+            header_line_num: int = max(p.content_line_num for p in candidate_list)
+            header_line_list: list[str] | None = []
+            if header_line_num > 0:
+                sniff_start_time: float = time.perf_counter() if stats is not None else 0.0
+                with open_file() as raw_file:
+                    header_line_list = _read_header_lines(
+                        raw_file, header_line_num, self.header_byte_limit, compression
+                    )
+                if stats is not None:
+                    sniff_seconds = time.perf_counter() - sniff_start_time
+
+            matched_key_list: list[str] = (
+                []
+                if header_line_list is None
+                else [p.key for p in candidate_list if p.match_content(header_line_list)]
+            )
+            if len(matched_key_list) > 1:
+                raise ValueError(
+                    f"Too many types of report has been matched: {label} -> {set(matched_key_list)}. This error could be due to incorrect configuration of report patterns."
+                )
+            elif len(matched_key_list) == 1:
+                module = tuple(matched_key_list[0].split(_config.REPORT_PATTERN_NAME_SEP))
+
+        if stats is not None:
+            name_check_num: int = len(
+                self._suffix_index.get(_file_name_ext(os.path.normcase(stem_name)), [])
+            ) + len(self._unindexed_patterns)
+            stats.record_match(
+                label,
+                module,
+                time.perf_counter() - start_time,
+                sniff_seconds,
+                checks=(
+                    name_check_num,
+                    sum(1 for p in candidate_list if p.content_line_num > 0),
+                ),
+            )
+        return module
+
+
+def _glob_literal_suffix(pattern_glob: str) -> str:
+    """Return the part of a glob pattern after its last wildcard."""
+    magic_index: int = max(pattern_glob.rfind(c) for c in _GLOB_MAGIC_CHARS)
+    if magic_index < 0:
+        return pattern_glob
+    literal_suffix: str = pattern_glob[magic_index + 1 :]
+    if pattern_glob[magic_index] == "[":
+        # skip the rest of the character set, give up on the ambiguous forms "[]...]" and "[!]...]"
+        if literal_suffix.startswith(("]", "!]")) or "]" not in literal_suffix:
+            return ""
+        literal_suffix = literal_suffix.split("]", 1)[1]
+    return literal_suffix
+
+
+def _file_name_ext(file_name: str) -> str:
+    """Return the last extension of a file name including the dot, `""` if there is none."""
+    dot_index: int = file_name.rfind(".")
+    if dot_index < 0:
+        return ""
+    return file_name[dot_index:]
+
+
+def _read_header_lines(
+    raw_file: IO[bytes], line_num: int, byte_limit: int, compression: str | None = None
+) -> list[str] | None:
+    r"""
+    Read up to the first `line_num` lines of a binary file within `byte_limit` bytes, without "\n".
+
+    Lines end with "\n", "\r\n" or "\r", like in text mode. A compressed file is decompressed up to `byte_limit` bytes. Returns `None` if the file is binary: it starts with a known magic number, contains a null byte, is not valid UTF-8, or cannot be decompressed. The errors of the reads of the file itself are raised.
+    """
+    data: bytes = b""
+    at_eof: bool = False
+    error_types: tuple[type[Exception], ...] = (
+        () if compression is None else _compression.decompression_errors(compression)
+    )
+    try:
+        with ExitStack() as stack:
+            f: IO[bytes] = raw_file
+            if compression is not None:
+                f = stack.enter_context(_compression.decompress(raw_file, compression))
+            while len(data) < byte_limit and _line_end_num(data) < line_num:
+                chunk: bytes = f.read(min(_HEADER_CHUNK_SIZE, byte_limit - len(data)))
+                if not chunk:
+                    at_eof = True
+                    break
+                data += chunk
+                if data.startswith(_BINARY_MAGIC_NUMBERS):
+                    break
+    except error_types as e:
+        if _compression.is_read_error(e):
+            raise
+        return None
+    finally:
+        record_file_read(raw_file)
+
+    if data.startswith(_BINARY_MAGIC_NUMBERS) or b"\x00" in data:
+        return None
+    if not at_eof:
+        # drop the last line, it may be incomplete or cut in the middle of a character
+        data = data[: max(data.rfind(b"\n"), data.rfind(b"\r")) + 1]
+    try:
+        text: str = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    lines: list[str] = _NEWLINE_REGEX.split(text)
+    if lines[-1] == "":
+        lines.pop()
+    return lines[:line_num]
+
+
+def _line_end_num(data: bytes) -> int:
+    r"""Return the number of line ends of "\n", "\r\n" and "\r" in bytes."""
+    return data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
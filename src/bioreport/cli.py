@@ -0,0 +1,478 @@
+"""
+Command line interface, installed as the `bioreport` command.
+
+Usage::
+
+    bioreport scan /path/to/report/dir > reports.ndjson
+    find /path/to/report/dir -name "*.json" | bioreport parse - --jobs 8 > summaries.ndjson
+    bioreport summarize /path/to/report/dir --jobs 8 --output tables --format parquet
+
+The inputs are directories, which are scanned, report files, or "-" to read paths from the standard input, one per line. `scan` and `parse` write a JSON object per line as soon as it is ready, so the output can be consumed while the command runs. `summarize` writes a table per module, i.e. "tables/fastp-json.tsv", and prints the paths of the tables.
+
+Exit status:
+
+- 0: success.
+- 1: some inputs are missing or some reports could not be parsed. The other reports are still written.
+- 2: invalid arguments.
+- 3: no report found.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Self, Sequence, TextIO
+
+from bioreport import __version__, _archive, _config, _walk
+from bioreport.report import Report
+from bioreport.search import iter_match_files, iter_scan_dir
+
+if TYPE_CHECKING:
+    from bioreport.batch import ParseFailure
+    from bioreport.report_sum import ReportSum
+
+EXIT_OK: int = 0
+EXIT_FAILURE: int = 1
+EXIT_USAGE: int = 2
+EXIT_NO_REPORT: int = 3
+STDIN_INPUT: str = "-"
+TABLE_FORMATS: tuple[str, ...] = ("tsv", "parquet")
+
+
+class _RunStatus:
+    """The number of reports written and of errors of a command."""
+
+    def __init__(self: Self) -> None:
+        self.report_num: int = 0
+        self.error_num: int = 0
+
+    def __repr__(self: Self) -> str:
+        return f"{self.__class__.__name__}(reports: {self.report_num}, errors: {self.error_num})"
+
+    def error(self: Self, message: str) -> None:
+        self.error_num += 1
+        print(f"bioreport: error: {message}", file=sys.stderr)
+
+    def exit_code(self: Self) -> int:
+        if self.error_num > 0:
+            return EXIT_FAILURE
+        if self.report_num == 0:
+            return EXIT_NO_REPORT
+        return EXIT_OK
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run the command line interface.
+
+    Parameters
+    ----------
+    argv : Sequence[str] | None, default None
+        The arguments. Default is `None`, which means `sys.argv[1:]`.
+
+    Returns
+    -------
+    exit_code : int
+        The exit status, see the module documentation.
+    """
+    parser: argparse.ArgumentParser = _build_parser()
+    args: argparse.Namespace = parser.parse_args(argv)
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if not 0 <= args.shard < args.num_shards:
+        parser.error(
+            f"--shard must be between 0 and --num-shards - 1: {args.shard}"
+        )
+
+    try:
+        return args.run(args)
+    except BrokenPipeError:
+        # the reader stopped early, i.e. `bioreport scan . | head`
+        devnull_fd: int = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull_fd, sys.stdout.fileno())
+        return EXIT_FAILURE
+    except KeyboardInterrupt:
+        return 130
+
+
+def _run_scan(args: argparse.Namespace) -> int:
+    status: _RunStatus = _RunStatus()
+    with _open_output(args.output) as output:
+        for report in _iter_input_reports(args, status):
+            _write_record(
+                output,
+                {**_source_record(report), "module": _module_name(report.module)},
+            )
+            status.report_num += 1
+    return status.exit_code()
+
+
+def _run_parse(args: argparse.Namespace) -> int:
+    status: _RunStatus = _RunStatus()
+    with _open_output(args.output) as output:
+        for report, result in _iter_parse_results(args, status):
+            _write_record(output, _result_record(report, result))
+            status.report_num += 1
+    return status.exit_code()
+
+
+def _run_summarize(args: argparse.Namespace) -> int:
+    if args.format == "parquet":
+        from bioreport.export import import_pyarrow  # noqa: PLC0415  imports pandas, not needed by `scan`
+
+        try:
+            import_pyarrow()
+        except ImportError as e:
+            print(f"bioreport: error: {e}", file=sys.stderr)
+            return EXIT_USAGE
+
+    from bioreport.report_sum import ReportSum, ReportTable  # noqa: PLC0415  imports pandas, not needed by `scan`
+
+    status: _RunStatus = _RunStatus()
+    report_table: ReportTable = ReportTable()
+    for _, result in _iter_parse_results(args, status):
+        if isinstance(result, ReportSum):
+            report_table.add(result)
+            status.report_num += 1
+
+    output_dir_path: Path = Path(args.output)
+    output_dir_path.mkdir(parents=True, exist_ok=True)
+    for module in report_table.modules:
+        table_path: Path = output_dir_path / f"{_module_name(module)}.{args.format}"
+        _write_table(
+            report_table.to_frame(module, join=args.join, raw=args.raw),
+            table_path,
+            args.format,
+        )
+        # the table is written, its columns are no longer needed
+        report_table.clear(module)
+        print(str(table_path), flush=True)
+    return status.exit_code()
+
+
+def _iter_input_paths(inputs: Iterable[str]) -> Iterator[str]:
+    """Return the input paths, "-" being replaced by the paths read from the standard input."""
+    for input_path in inputs:
+        if input_path != STDIN_INPUT:
+            yield input_path
+            continue
+        for line in sys.stdin:
+            line_path: str = line.rstrip("\r\n")
+            if line_path != "":
+                yield line_path
+
+
+def _path_kind(path: str) -> str:
+    if os.path.isdir(path):
+        return "dir"
+    if os.path.isfile(path):
+        return "file"
+    return "missing"
+
+
+def _iter_input_reports(
+    args: argparse.Namespace, status: _RunStatus
+) -> Iterator[Report]:
+    """Return the reports of the inputs, directories being scanned. The consecutive files are matched together by `jobs` threads."""
+    options: _walk.WalkOptions = _walk.WalkOptions(
+        include=args.include,
+        exclude=args.exclude,
+        max_depth=args.max_depth,
+        symlinks=args.symlinks,
+        max_file_size=args.max_file_size,
+        ignore_file=None if args.no_ignore_file else _walk.IGNORE_FILE_NAME,
+        archives=args.archives,
+        shard=args.shard,
+        num_shards=args.num_shards,
+    )
+    for path_kind, path_group in itertools.groupby(
+        _iter_input_paths(args.inputs), key=_path_kind
+    ):
+        if path_kind == "dir":
+            for dir_path in path_group:
+                yield from iter_scan_dir(dir_path, options=options, workers=args.jobs)
+        elif path_kind == "file":
+            yield from iter_match_files(
+                path_group, workers=args.jobs, archives=args.archives
+            )
+        else:
+            for missing_path in path_group:
+                status.error(f"No such file or directory: {missing_path}")
+
+
+def _iter_parse_results(
+    args: argparse.Namespace, status: _RunStatus
+) -> Iterator[tuple[Report, "ReportSum | ParseFailure"]]:
+    """Parse the reports of the inputs while they are found, and yield each with its result. The failures are reported to the standard error."""
+    # the parses import pandas, which `scan` does not need
+    from bioreport.batch import ParseFailure, iter_parse_all  # noqa: PLC0415
+    from bioreport.cache import ParseCache  # noqa: PLC0415
+
+    # the results are in input order, so the reports waiting for a result form a queue
+    pending_report_queue: deque[Report] = deque()
+
+    def _iter_queued_reports() -> Iterator[Report]:
+        for report in _iter_input_reports(args, status):
+            pending_report_queue.append(report)
+            yield report
+
+    cache: ParseCache | None = None if args.cache is None else ParseCache(args.cache)
+    try:
+        for result in iter_parse_all(
+            _iter_queued_reports(), workers=args.jobs, timeout=args.timeout, cache=cache
+        ):
+            report: Report = pending_report_queue.popleft()
+            if isinstance(result, ParseFailure):
+                status.error(
+                    f"Failed to parse {_source_label(report)}: {result.exc_type}: {result.message}"
+                )
+            yield report, result
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def _result_record(
+    report: Report, result: "ReportSum | ParseFailure"
+) -> dict[str, Any]:
+    """Return the JSON object of a parsed report or a failure."""
+    # the parses import pandas, which `scan` does not need
+    from bioreport.batch import ParseFailure  # noqa: PLC0415
+    from bioreport.export import column_name  # noqa: PLC0415
+
+    if isinstance(result, ParseFailure):
+        return {
+            **_source_record(report),
+            "module": _module_name(report.module),
+            "error": {"type": result.exc_type, "message": result.message},
+        }
+    data_dict: dict[str, Any] = {}
+    for key, value in zip(result.data.index.tolist(), result.data.tolist()):
+        is_finite: bool = not isinstance(value, float) or math.isfinite(value)
+        data_dict[column_name(key)] = value if is_finite else None
+    return {
+        **_source_record(report),
+        "module": _module_name(result.module),
+        "name": result.name,
+        "data": data_dict,
+    }
+
+
+def _source_record(report: Report) -> dict[str, str]:
+    """Return the path of a report, with the member of the archive if any."""
+    if report.member is None:
+        return {"path": str(report.path)}
+    return {"path": str(report.path), "member": report.member}
+
+
+def _source_label(report: Report) -> str:
+    if report.member is None:
+        return str(report.path)
+    return _archive.member_label(report.path, report.member)
+
+
+def _write_record(output: TextIO, record: dict[str, Any]) -> None:
+    """Write a JSON object on a line and flush it, so the reader gets it at once."""
+    output.write(json.dumps(record, ensure_ascii=False, default=_json_default) + "\n")
+    output.flush()
+
+
+def _json_default(value: Any) -> Any:
+    """Convert the numpy scalars and other values unknown to `json`."""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _write_table(frame: Any, table_path: Path, format: str) -> None:
+    """Write the table of a module, with the levels of the keys joined by "/"."""
+    from bioreport.export import (  # noqa: PLC0415  imports pandas, not needed by `scan`
+        REPORT_NAME_COLUMN,
+        column_name,
+        frame_to_arrow,
+    )
+
+    if format == "parquet":
+        import pyarrow.parquet as pq  # noqa: PLC0415  optional dependency
+
+        pq.write_table(frame_to_arrow(frame), table_path)
+        return
+    flat_frame = frame.set_axis([column_name(k) for k in frame.columns], axis=1)
+    flat_frame.index.name = REPORT_NAME_COLUMN
+    flat_frame.to_csv(table_path, sep="\t")
+
+
+def _module_name(module: tuple[str, ...]) -> str:
+    return _config.REPORT_PATTERN_NAME_SEP.join(module)
+
+
+@contextmanager
+def _open_output(path: str) -> Iterator[TextIO]:
+    """Open an output file, "-" being the standard output, which is not closed."""
+    if path == STDIN_INPUT:
+        yield sys.stdout
+        return
+    with open(path, "w", encoding="utf-8") as file:
+        yield file
+
+
+def _jobs(value: str) -> int:
+    jobs: int = int(value)
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(
+            f"must be a positive integer, or 0 for all CPUs: {value}"
+        )
+    return jobs
+
+
+def _num_shards(value: str) -> int:
+    num_shards: int = int(value)
+    if num_shards < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value}")
+    return num_shards
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    # the inputs and the options of the directory scan, shared by all the commands
+    input_parser: argparse.ArgumentParser = argparse.ArgumentParser(add_help=False)
+    input_parser.add_argument(
+        "inputs",
+        nargs="+",
+        metavar="INPUT",
+        help='directories to scan, report files, or "-" to read paths from the standard input, one per line',
+    )
+    input_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_jobs,
+        default=1,
+        help="number of workers matching and parsing files, 0 for all CPUs (default: 1)",
+    )
+    scan_group = input_parser.add_argument_group("directory scan")
+    scan_group.add_argument(
+        "--include",
+        action="append",
+        metavar="PATTERN",
+        help="patterns of the files to match, repeatable",
+    )
+    scan_group.add_argument(
+        "--exclude",
+        action="append",
+        metavar="PATTERN",
+        help="patterns of the files and directories to skip, repeatable",
+    )
+    scan_group.add_argument(
+        "--max-depth", type=int, help="maximum depth of the directories to walk"
+    )
+    scan_group.add_argument(
+        "--symlinks",
+        choices=_walk.SYMLINK_POLICIES,
+        default="files",
+        help="how to handle symbolic links (default: files)",
+    )
+    scan_group.add_argument(
+        "--max-file-size", type=int, metavar="BYTES", help="skip larger files"
+    )
+    scan_group.add_argument(
+        "--no-ignore-file",
+        action="store_true",
+        help=f"do not read the {_walk.IGNORE_FILE_NAME} files",
+    )
+    scan_group.add_argument(
+        "--archives",
+        action="store_true",
+        help="match the members of the tar and zip archives instead of the archives",
+    )
+    scan_group.add_argument(
+        "--shard",
+        type=int,
+        default=0,
+        help="only match the files of this shard of the directories, see --num-shards (default: 0)",
+    )
+    scan_group.add_argument(
+        "--num-shards",
+        type=_num_shards,
+        default=1,
+        metavar="N",
+        help="split the files of the directories into N shards by a hash of their relative path, for N commands run in parallel (default: 1)",
+    )
+
+    # the options of parsing, shared by parse and summarize
+    parse_option_parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        add_help=False
+    )
+    parse_option_parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="maximum time spent on a single report",
+    )
+    parse_option_parser.add_argument(
+        "--cache", metavar="PATH", help="SQLite file caching the parsed reports"
+    )
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="bioreport",
+        description="Find and parse the reports of bioinformatics programmes.",
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {__version__}"
+    )
+    subparsers = parser.add_subparsers(title="commands", required=True)
+
+    scan_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "scan",
+        parents=[input_parser],
+        help="find the reports, a JSON object per line",
+    )
+    scan_parser.add_argument(
+        "-o", "--output", default="-", help="output file (default: standard output)"
+    )
+    scan_parser.set_defaults(run=_run_scan)
+
+    parse_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "parse",
+        parents=[input_parser, parse_option_parser],
+        help="parse the reports, a JSON object per line",
+    )
+    parse_parser.add_argument(
+        "-o", "--output", default="-", help="output file (default: standard output)"
+    )
+    parse_parser.set_defaults(run=_run_parse)
+
+    summarize_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "summarize",
+        parents=[input_parser, parse_option_parser],
+        help="parse the reports into a table per module",
+    )
+    summarize_parser.add_argument(
+        "-o", "--output", required=True, metavar="DIR", help="directory of the tables"
+    )
+    summarize_parser.add_argument(
+        "--format",
+        choices=TABLE_FORMATS,
+        default="tsv",
+        help="table format, parquet needs pyarrow (default: tsv)",
+    )
+    summarize_parser.add_argument(
+        "--join",
+        choices=("inner", "outer"),
+        default="outer",
+        help="keep all the keys of a module, or only those of every report (default: outer)",
+    )
+    summarize_parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="keep the values as parsed, without converting them to numbers",
+    )
+    summarize_parser.set_defaults(run=_run_summarize)
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Export parsed reports to Parquet, Feather or Arrow IPC files.
+
+Needs `pyarrow`, installed with the `arrow` extra, i.e. `pip install bioreport[arrow]`.
+
+The files of a module are written in a hive-style directory, i.e. `module=fastp/submodule=json/part-00000.parquet`. The modules have different columns, so load them one directory at a time::
+
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset("/path/to/export/module=fastp/submodule=json", format="parquet")
+    fastp_json_table = dataset.to_table()
+
+Feather and Arrow IPC files are not compressed by default, so they can be memory-mapped and read without copy, i.e. `pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()`.
+"""
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Hashable, Iterable, Literal, Self
+
+import pandas as pd
+from pandas import DataFrame, Series
+
+from bioreport.report_sum import ReportSum, ReportTable
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+ExportFormat = Literal["parquet", "feather", "arrow"]
+REPORT_NAME_COLUMN: str = "report"
+COLUMN_LEVEL_SEP: str = "/"  # separator of the levels of the keys, i.e. "before_filtering/total_reads"
+_FILE_SUFFIX_DICT: dict[str, str] = {
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "arrow": ".arrow",
+}
+
+
+class ReportWriter:
+    """
+    Stream parsed reports to files, a directory per module and submodule.
+
+    The reports of each module are buffered until `chunk_rows` of them have been written, then converted to a table with the schema of the module and appended to the current file of the module as a row group, or record batches. Memory use is bounded by `chunk_rows` whatever the number of reports. A chunk with new columns or types that cannot be cast to those of the current file starts a new file.
+
+    Attributes
+    ----------
+    dir : Path
+        The root directory of the export.
+    format : Literal["parquet", "feather", "arrow"]
+        The file format.
+    chunk_rows : int
+        The number of reports of a module converted and written at once.
+    raw : bool
+        Whether the values are kept as parsed, without converting them with the schema of the module.
+    paths : list[Path]
+        The files written so far.
+
+    Methods
+    -------
+    write(report_sum: ReportSum) -> None
+        Write a report.
+    write_all(report_sums: Iterable[ReportSum]) -> None
+        Write many reports.
+    close() -> None
+        Write the buffered reports and close the files.
+    """
+
+    def __init__(
+        self: Self,
+        dir: str | Path,
+        format: ExportFormat = "parquet",
+        *,
+        chunk_rows: int = 65536,
+        raw: bool = False,
+        compression: str | None = None,
+    ) -> None:
+        """
+        Create a writer.
+
+        Parameters
+        ----------
+        dir : str | Path
+            The root directory of the export, created if missing. Existing files are kept, new files get the next free part numbers.
+        format : Literal["parquet", "feather", "arrow"], default "parquet"
+            The file format. "feather" and "arrow" both write the Arrow IPC file format, with the ".feather" and ".arrow" suffixes.
+        chunk_rows : int, default 65536
+            The number of reports of a module converted and written at once.
+        raw : bool, default False
+            Keep the values as parsed, without converting them with the schema of the module.
+        compression : str | None, default None
+            The compression codec, i.e. "zstd". Default is `None`, which means "snappy" for Parquet and no compression for Feather and Arrow IPC.
+        """
+        import_pyarrow()
+        if format not in _FILE_SUFFIX_DICT:
+            raise ValueError(f"Invalid export format: {format}")
+        if chunk_rows < 1:
+            raise ValueError(f"chunk_rows must be a positive integer: {chunk_rows}")
+        self.dir: Path = Path(dir).absolute()
+        self.format: ExportFormat = format
+        self.chunk_rows: int = chunk_rows
+        self.raw: bool = raw
+        self.paths: list[Path] = []
+        self._compression: str | None = compression
+        self._report_table: ReportTable = ReportTable()
+        self._pending_row_num_dict: dict[tuple[str, ...], int] = {}
+        self._part_dict: dict[tuple[str, ...], _PartFile] = {}
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the writer by its directory and format."""
+        return f'{self.__class__.__name__}(dir: "{str(self.dir)}", format: "{self.format}")'
+
+    def __enter__(self: Self) -> Self:
+        """Return the writer."""
+        return self
+
+    def __exit__(self: Self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        """Write the buffered reports and close the files."""
+        self.close()
+
+    def write(self: Self, report_sum: ReportSum) -> None:
+        """
+        Write a report.
+
+        Parameters
+        ----------
+        report_sum : ReportSum
+            A parsed report.
+        """
+        self._report_table.add(report_sum)
+        pending_row_num: int = self._pending_row_num_dict.get(report_sum.module, 0) + 1
+        self._pending_row_num_dict[report_sum.module] = pending_row_num
+        if pending_row_num >= self.chunk_rows:
+            self._flush_module(report_sum.module)
+
+    def write_all(self: Self, report_sums: Iterable[ReportSum]) -> None:
+        """
+        Write many reports.
+
+        Parameters
+        ----------
+        report_sums : Iterable[ReportSum]
+            Parsed reports.
+        """
+        for report_sum in report_sums:
+            self.write(report_sum)
+
+    def close(self: Self) -> None:
+        """Write the buffered reports and close the files."""
+        for module in list(self._pending_row_num_dict):
+            self._flush_module(module)
+        for part_file in self._part_dict.values():
+            part_file.close()
+        self._part_dict.clear()
+
+    def _flush_module(self: Self, module: tuple[str, ...]) -> None:
+        """Convert the buffered reports of a module and append them to its file."""
+        if self._pending_row_num_dict.pop(module, 0) == 0:
+            return
+        frame: DataFrame = self._report_table.to_frame(module, raw=self.raw)
+        self._report_table.clear(module)
+        arrow_table: pa.Table = frame_to_arrow(frame)
+
+        part_file: _PartFile | None = self._part_dict.get(module)
+        if part_file is not None:
+            cast_table: pa.Table | None = part_file.cast(arrow_table)
+            if cast_table is None:
+                part_file.close()
+                part_file = None
+            else:
+                arrow_table = cast_table
+        if part_file is None:
+            part_file = _PartFile(
+                path=self._next_part_path(module),
+                schema=arrow_table.schema,
+                format=self.format,
+                compression=self._compression,
+            )
+            self._part_dict[module] = part_file
+            self.paths.append(part_file.path)
+        part_file.write(arrow_table, self.chunk_rows)
+
+    def _next_part_path(self: Self, module: tuple[str, ...]) -> Path:
+        """Return the first unused file path of the directory of a module."""
+        submodule: str = module[1] if len(module) > 1 else ""
+        module_dir_path: Path = self.dir / f"module={module[0]}" / f"submodule={submodule}"
+        module_dir_path.mkdir(parents=True, exist_ok=True)
+        part_index: int = 0
+        while True:
+            part_path: Path = (
+                module_dir_path
+                / f"part-{part_index:05d}{_FILE_SUFFIX_DICT[self.format]}"
+            )
+            if not part_path.exists():
+                return part_path
+            part_index += 1
+
+
+def export_reports(
+    report_sums: Iterable[ReportSum],
+    dir: str | Path,
+    format: ExportFormat = "parquet",
+    **writer_kwargs: Any,
+) -> list[Path]:
+    """
+    Write parsed reports to files, a directory per module and submodule. See `ReportWriter`.
+
+    Parameters
+    ----------
+    report_sums : Iterable[ReportSum]
+        Parsed reports, i.e. `BatchParseResult.report_sums`. Consumed once, so a generator keeps memory use flat.
+    dir : str | Path
+        The root directory of the export, created if missing.
+    format : Literal["parquet", "feather", "arrow"], default "parquet"
+        The file format.
+    **writer_kwargs : Any
+        Other keyword arguments passed to `ReportWriter`, i.e. `chunk_rows`, `raw` or `compression`.
+
+    Returns
+    -------
+    paths : list[Path]
+        The files written.
+    """
+    with ReportWriter(dir, format, **writer_kwargs) as report_writer:
+        report_writer.write_all(report_sums)
+    return report_writer.paths
+
+
+def frame_to_arrow(frame: DataFrame) -> "pa.Table":
+    """
+    Convert a table of reports to an Arrow table.
+
+    The report names become the first column, "report". The keys of several levels are joined with "/", i.e. "before_filtering/total_reads". A column mixing types is converted to strings.
+
+    Parameters
+    ----------
+    frame : DataFrame
+        A table of reports, i.e. the output of `ReportTable.to_frame`.
+
+    Returns
+    -------
+    arrow_table : pyarrow.Table
+        The Arrow table.
+    """
+    pa = import_pyarrow()
+    column_name_list: list[str] = [REPORT_NAME_COLUMN]
+    array_list: list[pa.Array] = [
+        pa.array([str(name) for name in frame.index], type=pa.string())
+    ]
+    for column_index, key in enumerate(frame.columns):
+        column_name_list.append(column_name(key))
+        column: Series = frame.iloc[:, column_index]
+        try:
+            array_list.append(pa.array(column, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            array_list.append(
+                pa.array(
+                    [None if pd.isna(v) else str(v) for v in column.tolist()],
+                    type=pa.string(),
+                )
+            )
+    return pa.Table.from_arrays(array_list, names=column_name_list)
+
+
+class _PartFile:
+    """An open Parquet or Arrow IPC file."""
+
+    def __init__(
+        self: Self,
+        path: Path,
+        schema: "pa.Schema",
+        format: ExportFormat,
+        compression: str | None,
+    ) -> None:
+        pa = import_pyarrow()
+        self.path: Path = path
+        self.schema: pa.Schema = schema
+        # write to a hidden file, renamed once complete
+        self._tmp_path: Path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        self._writer: Any
+        if format == "parquet":
+            import pyarrow.parquet as pq  # noqa: PLC0415  optional dependency
+
+            self._writer = pq.ParquetWriter(
+                self._tmp_path,
+                schema,
+                compression="snappy" if compression is None else compression,
+            )
+        else:
+            self._writer = pa.ipc.new_file(
+                self._tmp_path,
+                schema,
+                options=pa.ipc.IpcWriteOptions(compression=compression),
+            )
+        self._is_parquet: bool = format == "parquet"
+
+    def cast(self: Self, arrow_table: "pa.Table") -> "pa.Table | None":
+        """Cast a table to the schema of the file, `None` if it cannot be."""
+        pa = import_pyarrow()
+        if arrow_table.schema.equals(self.schema):
+            return arrow_table
+        if arrow_table.schema.names != self.schema.names:
+            return None
+        try:
+            return arrow_table.cast(self.schema)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            return None
+
+    def write(self: Self, arrow_table: "pa.Table", chunk_rows: int) -> None:
+        if self._is_parquet:
+            self._writer.write_table(arrow_table, row_group_size=chunk_rows)
+        else:
+            self._writer.write_table(arrow_table, max_chunksize=chunk_rows)
+
+    def close(self: Self) -> None:
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+
+def column_name(key: Hashable) -> str:
+    """Return the column name of a key, the levels of a tuple key joined with "/"."""
+    if isinstance(key, tuple):
+        return COLUMN_LEVEL_SEP.join(map(str, key))
+    return str(key)
+
+
+def import_pyarrow() -> Any:
+    """Import pyarrow, with a hint to install it when missing."""
+    try:
+        import pyarrow as pa  # noqa: PLC0415  optional dependency, imported on first use
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is needed to export reports. Install it with `pip install bioreport[arrow]`."
+        ) from e
+    return pa
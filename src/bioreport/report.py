@@ -1,12 +1,24 @@
 """Process bioinformatics report."""
 
-import re
-from importlib import import_module
-from pathlib import Path
-from typing import Any, Hashable, Self, TextIO
+import io
+import os
+import stat
+import time
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from pathlib import Path, PurePosixPath
+from typing import IO, TYPE_CHECKING, Any, Hashable, Iterator, Literal, Self, TextIO
 
-from bioreport import _config
-from bioreport.report_sum import ReportSum
+from bioreport import _archive, _compression, _registry
+from bioreport.classifier import ReportClassifier
+from bioreport.stats import ScanStats, current_stats, record_file_read
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from bioreport._base_module import BaseModule
+    from bioreport.cache import ParseCache
+    from bioreport.report_sum import ReportSum
 
 
 class Report:
@@ -16,26 +28,47 @@ class Report:
     Attributes
     ----------
     path : Path
-        The path to the report file.
+        The path to the report file, or to the archive holding it.
     module : tuple[str, ...]
         The type of the file. The length of the tuple could be 0, 1 or 2.
+    member : str | None
+        The name of the report file in the tar or zip archive `path`, i.e. "qc/sample.json". `None` if the report is not in an archive.
+    fingerprint : tuple[tuple[str, ...], int, int, int] | None
+        The module and the `(size, mtime_ns, inode)` of the file, or of the archive, when it was classified. `None` if the file has not been classified.
 
     Methods
     -------
     with_empty_module() -> None
         Check if the module is empty.
-    match_file(file_name: str) -> Report
-        Match a single file. Determine which type of report it is and return a `Report` object.
+    match_file(file: str | Path, classifier: ReportClassifier | None = None, member: str | None = None) -> Report
+        Match a single file, or a member of an archive. Determine which type of report it is and return a `Report` object.
     with_matched_module() -> bool
         Check if the `module` of the `Report` object is matched with the actual pattern of the file specified by `path`. Return `True` if the `module` is matched, otherwise return `False`.
     update_module() -> None
         Update the `module` of the `Report` object with the actual pattern of the file specified by `path`.
-    parse(update_module: bool = False, *, name: Hashable | None = None) -> ReportSum
+    record_fingerprint(file_stat: os.stat_result | None = None) -> None
+        Record the `module` and the current state of the file as the fingerprint of the classification.
+    with_current_fingerprint() -> bool
+        Check if the file and the `module` are unchanged since the file was classified.
+    file_name -> str
+        The base name of the report file, or of the member.
+    compression -> str | None
+        The codec of the report file, from the suffix of its name.
+    open(mode: Literal["r", "rb"] = "r") -> Iterator[IO]
+        Open the report file for a parser, decompressing a compressed file.
+    parse(update_module: bool = False, *, name: Hashable | None = None, validate: Literal["always", "if-changed", "never"] = "if-changed", cache: ParseCache | None = None, arrays: bool = False) -> ReportSum
         Parse the report file. Return a `ReportSum` object.
+    aparse(update_module: bool = False, *, executor: Executor | None = None, **parse_kwargs: Any) -> ReportSum
+        Parse the report file in an executor, from an asyncio event loop.
+    extract(name: Hashable | None = None) -> list[ReportSum]
+        Parse every summary embedded in the report file, i.e. each bowtie2 summary written into a pipeline log.
     """
 
     def __init__(
-        self: Self, path: str | Path, module: tuple[str, ...] = tuple()
+        self: Self,
+        path: str | Path,
+        module: tuple[str, ...] = tuple(),
+        member: str | None = None,
     ) -> None:
         self.path: Path
         if isinstance(path, str):
@@ -45,10 +78,14 @@ class Report:
         else:
             raise TypeError(f"Invalid type of path: {type(path)}")
         self.module: tuple[str, ...] = module
+        self.member: str | None = member
+        self.fingerprint: tuple[tuple[str, ...], int, int, int] | None = None
 
     def __repr__(self: Self) -> str:
         report_string: str = (
             f'{self.__class__.__name__}(path: "{str(self.path)}", type: "{self.module}")'
+            if self.member is None
+            else f'{self.__class__.__name__}(path: "{str(self.path)}", member: "{self.member}", type: "{self.module}")'
         )
         return report_string
 
@@ -57,7 +94,11 @@ class Report:
         if not isinstance(other, Report):
             is_eq = False
             return is_eq
-        is_eq = self.path == other.path and self.module == other.module
+        is_eq = (
+            self.path == other.path
+            and self.member == other.member
+            and self.module == other.module
+        )
         return is_eq
 
     def with_empty_module(self: Self) -> bool:
@@ -95,14 +136,23 @@ class Report:
         return lines
 
     @classmethod
-    def match_file(cls, file: str | Path) -> Self:
+    def match_file(
+        cls,
+        file: str | Path,
+        classifier: ReportClassifier | None = None,
+        member: str | None = None,
+    ) -> Self:
         """
-        Match a single file. Determine which type of report it is and return a `Report` object.
+        Match a single file, or a member of an archive. Determine which type of report it is and return a `Report` object.
 
         Parameters
         ----------
         file : str | Path
-            The file to match.
+            The file to match, or the tar or zip archive holding `member`.
+        classifier : ReportClassifier | None, default None
+            The classifier used to determine the report type. Default is `None`, which means the classifier built from the package report patterns.
+        member : str | None, default None
+            The name of the file to match in the archive `file`. Default is `None`, which means `file` itself is matched.
 
         Returns
         -------
@@ -120,92 +170,63 @@ class Report:
         file_module_match: tuple[str, ...] = tuple()
 
         report: Report
-        if not file_path.is_file():
-            report = Report(path=file_path, module=file_module_match)
+        try:
+            file_stat: os.stat_result | None = file_path.stat()
+        except (OSError, ValueError):
+            file_stat = None
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+            report = Report(path=file_path, module=file_module_match, member=member)
             return report
 
-        def file_name_glob_check(
-            file_path: Path, module_patterns: dict[str, str]
-        ) -> bool:
-            pass_check: bool = True
-            if (key_file_name_glob := "pattern_glob") in module_patterns.keys():
-                file_path_glob_match_list: list = list(
-                    file_path.parent.glob(module_patterns[key_file_name_glob])
-                )
-                if file_path not in file_path_glob_match_list:
-                    pass_check = False
-            return pass_check
-
-        def file_name_regex_check(
-            file_path: Path, module_patterns: dict[str, str]
-        ) -> bool:
-            pass_check: bool = True
-            if (key_file_name_regex := "pattern_regex") in module_patterns.keys():
-                file_path_regex_match: re.Match[str] | None = re.match(
-                    pattern=module_patterns[key_file_name_regex],
-                    string=str(file_path.name),
-                )
-                if file_path_regex_match is None:
-                    pass_check = False
-            return pass_check
-
-        def file_content_regex_check(
-            file_path: Path, module_patterns: dict[str, str]
-        ) -> bool:
-            pass_check: bool = True
-            if (key_context_regex := "content_regex") in module_patterns.keys():
-                module_content_regex_line_list: list[str] = module_patterns[
-                    key_context_regex
-                ].splitlines()
-                module_content_regex_line_num: int = len(module_content_regex_line_list)
-                with open(file_path, "r") as f:
-                    file_content_line_list: list[str] = cls.read_stripped_lines(
-                        text_io=f, line_num=module_content_regex_line_num
-                    )
-                if len(file_content_line_list) < module_content_regex_line_num:
-                    pass_check = False
-                    return pass_check
-                for curr_line in range(module_content_regex_line_num):
-                    content_regex_match: re.Match[str] | None = re.match(
-                        pattern=module_content_regex_line_list[curr_line],
-                        string=file_content_line_list[curr_line],
-                    )
-                    if content_regex_match is None:
-                        pass_check = False
-            return pass_check
-
-        # match all report patterns
-        module_name_matched_set: set[str] = set()
-        module_name: str
-        module_patterns: dict[str, str]
-        for module_name, module_patterns in _config.REPORT_PATTERN.items():
-            module_patterns_check: bool = (
-                file_name_glob_check(
-                    file_path=file_path, module_patterns=module_patterns
-                )
-                and file_name_regex_check(
-                    file_path=file_path, module_patterns=module_patterns
-                )
-                and file_content_regex_check(
-                    file_path=file_path, module_patterns=module_patterns
-                )
-            )
-            if module_patterns_check:
-                module_name_matched_set.add(module_name)
+        if classifier is None:
+            classifier = ReportClassifier.default()
+        if member is None:
+            file_module_match = classifier.classify(file_path)
+        else:
+            file_module_match = _archive.classify_member(file_path, member, classifier)
+        report = Report(path=file_path, module=file_module_match, member=member)
+        report.record_fingerprint(file_stat)
+        return report
 
-        if len(module_name_matched_set) == 0:
-            report = Report(path=file_path, module=file_module_match)
-            return report
-        elif len(module_name_matched_set) > 1:
-            raise ValueError(
-                f"Too many types of report has been matched: {file_path} -> {module_name_matched_set}. This error could be due to incorrect configuration of report patterns."
-            )
+    def record_fingerprint(self: Self, file_stat: os.stat_result | None = None) -> None:
+        """
+        Record the `module` and the current state of the file as the fingerprint of the classification.
 
-        file_module_match = tuple(
-            list(module_name_matched_set)[0].split(_config.REPORT_PATTERN_NAME_SEP)
+        Parameters
+        ----------
+        file_stat : os.stat_result | None, default None
+            The stat of the file taken before it was classified. Default is `None`, which means the file is stat-ed now.
+        """
+        if file_stat is None:
+            file_stat = self.path.stat()
+        self.fingerprint = (
+            self.module,
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            file_stat.st_ino,
         )
-        report = Report(path=file_path, module=file_module_match)
-        return report
+
+    def with_current_fingerprint(self: Self) -> bool:
+        """
+        Check if the file and the `module` are unchanged since the file was classified.
+
+        Returns
+        -------
+        is_current : bool
+            `True` if the fingerprint has been recorded and neither the `module` nor the size, modification time and inode of the file have changed since.
+        """
+        if self.fingerprint is None or self.fingerprint[0] != self.module:
+            return False
+        try:
+            file_stat: os.stat_result = self.path.stat()
+        except OSError:
+            return False
+        is_current: bool = self.fingerprint[1:] == (
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            file_stat.st_ino,
+        )
+        return is_current
 
     def with_matched_module(self: Self) -> bool:
         """
@@ -217,21 +238,90 @@ class Report:
             Whether the `module` is matched. `True` if the `module` is matched, otherwise return `False`.
         """
         is_matched: bool
-        actual_match_result: Report = self.match_file(file=self.path)
+        actual_match_result: Report = self.match_file(file=self.path, member=self.member)
         if actual_match_result.module == self.module:
             is_matched = True
+            self.fingerprint = actual_match_result.fingerprint
         else:
             is_matched = False
         return is_matched
 
     def update_module(self: Self) -> None:
         """Update the `module` of the `Report` object with the actual pattern of the file specified by `path`."""
-        updated_report: Report = self.match_file(file=self.path)
+        updated_report: Report = self.match_file(file=self.path, member=self.member)
         self.module = updated_report.module
+        self.fingerprint = updated_report.fingerprint
+
+    @property
+    def file_name(self: Self) -> str:
+        """
+        The base name of the report file, or of the member of the archive.
+
+        Returns
+        -------
+        file_name : str
+            The base name, i.e. "sample.json".
+        """
+        if self.member is None:
+            return self.path.name
+        return PurePosixPath(self.member).name
+
+    @property
+    def compression(self: Self) -> str | None:
+        """
+        The codec of the report file, from the suffix of its name.
+
+        Returns
+        -------
+        compression : str | None
+            "gzip" for ".gz", "bz2" for ".bz2", "xz" for ".xz" and "zstd" for ".zst" when a zstd library is installed. `None` if the file is not compressed.
+        """
+        return _compression.split_compression_suffix(self.file_name)[1]
+
+    @contextmanager
+    def open(self: Self, mode: Literal["r", "rb"] = "r") -> Iterator[IO]:
+        """
+        Open the report file for a parser. A compressed file, see `compression`, is decompressed while it is read. A member of an archive is read from the archive, see `member`. The file and the bytes read from it are counted by the statistics collector, see `bioreport.collect_stats`.
+
+        Parameters
+        ----------
+        mode : Literal["r", "rb"], default "r"
+            Open the file as text or as bytes.
+
+        Yields
+        ------
+        file : IO
+            The opened file, closed on exit.
+        """
+        if mode not in ("r", "rb"):
+            raise ValueError(f"Invalid mode: {mode}")
+        with ExitStack() as stack:
+            raw_file: IO[bytes]
+            if self.member is None:
+                raw_file = stack.enter_context(open(self.path, "rb"))
+            else:
+                raw_file = stack.enter_context(
+                    _archive.open_member(self.path, self.member)
+                )
+            file: IO = raw_file
+            compression: str | None = self.compression
+            if compression is not None:
+                file = stack.enter_context(_compression.decompress(raw_file, compression))
+            if mode == "r":
+                file = stack.enter_context(io.TextIOWrapper(file))
+            # counted before the files are closed, the compressed bytes for a compressed file
+            stack.callback(record_file_read, raw_file)
+            yield file
 
     def parse(
-        self: Self, update_module: bool = False, *, name: Hashable | None = None
-    ) -> ReportSum:
+        self: Self,
+        update_module: bool = False,
+        *,
+        name: Hashable | None = None,
+        validate: Literal["always", "if-changed", "never"] = "if-changed",
+        cache: "ParseCache | None" = None,
+        arrays: bool = False,
+    ) -> "ReportSum":
         """
         Parse the report file. Return a `ReportSum` object.
 
@@ -241,17 +331,33 @@ class Report:
             Whether update the `module` of the `Report` object with the actual pattern of the file specified by `path`.
         name : Hashable | None, default None
             The name of the report. If `None`, the name of the report will be the same as the file name.
+        validate : Literal["always", "if-changed", "never"], default "if-changed"
+            When to check that the `module` matches the file before parsing. "always" classifies the file again. "if-changed" classifies the file again only if its fingerprint is missing or outdated, see `with_current_fingerprint`. "never" trusts the `module`. Ignored when `update_module` is `True`, the file has just been classified.
+        cache : ParseCache | None, default None
+            A cache of parsed reports. The file is validated as set by `validate`, then a cached summary of the unchanged file is returned without parsing it again, a newly parsed summary is added to the cache. Default is `None`, which means no cache.
+        arrays : bool, default False
+            Also parse the array-valued metrics of the report into `ReportSum.arrays`, i.e. the per-cycle curves of a fastp JSON report. They are not parsed by default, the summary of some reports is read without reading the whole file.
 
         Returns
         -------
         report_sum : ReportSum
             The parsed report.
         """
+        if validate not in ("always", "if-changed", "never"):
+            raise ValueError(f"Invalid validate option: {validate}")
+
+        needs_validation: bool
         if update_module:
-            updated_report: Report = self.match_file(file=self.path)
-            self.module = updated_report.module
+            self.update_module()
+            needs_validation = False
+        elif validate == "always":
+            needs_validation = True
+        elif validate == "if-changed":
+            needs_validation = not self.with_current_fingerprint()
+        else:
+            needs_validation = False
 
-        if not self.with_matched_module():
+        if needs_validation and not self.with_matched_module():
             raise ValueError(
                 f"The report file pattern does not match the module specified: {str(self)}"
             )
@@ -260,12 +366,91 @@ class Report:
                 f"The report file does not match any module pattern: {str(self)}"
             )
 
+        report_sum: "ReportSum | None"
+        cache_key: str | None = None
+        if cache is not None:
+            cache_key = cache.key(self, arrays=arrays)
+            report_sum = cache.get(self, name=name, key=cache_key)
+            if report_sum is not None:
+                return report_sum
+
         module_name: str = self.module[0]
-        module = import_module(
-            name=f".{_config.MODULES_DIR_BASENAME}.{module_name}",
-            package=_config.PACKAGE_NAME,
-        )
-        report_sum: ReportSum = module.BioReportModule().parse(report=self, name=name)
-        del module
+        parse_module: "BaseModule" = _registry.get_module(module_name)
+        stats: ScanStats | None = current_stats()
+        start_time: float = time.perf_counter()
+        report_sum = parse_module.parse(report=self, name=name)
+        if arrays:
+            report_sum.arrays = parse_module.parse_arrays(report=self)
+        if stats is not None:
+            stats.record_parse(
+                str(self.path), self.module, time.perf_counter() - start_time
+            )
+        if cache is not None and cache_key is not None:
+            cache.put(self, report_sum, key=cache_key)
 
         return report_sum
+
+    def extract(self: Self, *, name: Hashable | None = None) -> list["ReportSum"]:
+        """
+        Parse every summary embedded in the report file, i.e. each bowtie2 summary written into the log of a pipeline. The file is not classified, a log does not start like a report: the `module` names the module finding the summaries, i.e. `Report("align.log", module=("bowtie2",)).extract()`. A module without such a search parses the whole file as a single report.
+
+        Parameters
+        ----------
+        name : Hashable | None, default None
+            The prefix of the names of the summaries, i.e. "align.log#1" for the first bowtie2 summary. If `None`, the prefix is the file name.
+
+        Returns
+        -------
+        report_sums : list[ReportSum]
+            The parsed summaries, in the order of the file.
+        """
+        if self.with_empty_module():
+            raise ValueError(
+                f"The module extracting the summaries is not specified: {str(self)}"
+            )
+
+        parse_module: "BaseModule" = _registry.get_module(self.module[0])
+        stats: ScanStats | None = current_stats()
+        report_sums: list["ReportSum"]
+        if stats is None:
+            report_sums = parse_module.extract(report=self, name=name)
+        else:
+            start_time: float = time.perf_counter()
+            report_sums = parse_module.extract(report=self, name=name)
+            stats.record_parse(
+                str(self.path), self.module, time.perf_counter() - start_time
+            )
+        return report_sums
+
+    async def aparse(
+        self: Self,
+        update_module: bool = False,
+        *,
+        executor: "Executor | None" = None,
+        **parse_kwargs: Any,
+    ) -> "ReportSum":
+        """
+        Parse the report file in an executor, from an asyncio event loop. The parameters are the same as `parse`.
+
+        Parameters
+        ----------
+        update_module : bool, default False
+            Whether update the `module` of the `Report` object with the actual pattern of the file specified by `path`.
+        executor : Executor | None, default None
+            The thread pool running the parse. Default is `None`, which means the default executor of the event loop. To bound the number of parses at once, use a pool of that many threads or `bioreport.aparse_all`.
+        **parse_kwargs : Any
+            Other keyword arguments passed to `parse`, i.e. `name`, `validate`, `cache` or `arrays`.
+
+        Returns
+        -------
+        report_sum : ReportSum
+            The parsed report.
+        """
+        from bioreport import _aio  # noqa: PLC0415  imports asyncio, which takes about 40 ms, only the asyncio API needs it
+
+        report_sum: "ReportSum" = await _aio.run_blocking(
+            executor,
+            None,
+            partial(self.parse, update_module=update_module, **parse_kwargs),
+        )
+        return report_sum
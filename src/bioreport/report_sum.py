@@ -1,10 +1,14 @@
 """Summary of bioinformatics report."""
 
-from typing import Hashable, Iterable, Literal, Self
+from typing import Any, Hashable, Iterable, Literal, Self
 
+import numpy as np
 import pandas as pd
 from pandas import DataFrame, Series
 
+from bioreport import _registry
+from bioreport.schema import ReportSchema
+
 
 class ReportSum:
     """
@@ -18,18 +22,37 @@ class ReportSum:
         The module of the report.
     data : Series
         The data of the report.
+    arrays : dict[Hashable, DataFrame]
+        The array-valued metrics of the report, i.e. the quality of each cycle of the reads. Each array has a row per position and a column per metric. `{}` unless the report was parsed with `arrays=True`.
     name : Hashable | None
         The name of the report.
 
     Methods
     -------
-    concat(report_sums: Iterable[Self], join: Literal["inner", "outer"] = "outer") -> DataFrame
+    concat(report_sums: Iterable[Self], join: Literal["inner", "outer"] = "outer", *, raw: bool = False) -> DataFrame
         Concatenate multiple `ReportSum` objects into one.
+    stack_arrays(report_sums: Iterable[Self], key: Hashable) -> ArrayStack
+        Stack an array of multiple `ReportSum` objects into one.
+    to_record() -> dict[str, Any]
+        Convert the summary to plain data.
+    from_record(record: dict[str, Any]) -> Self
+        Build a summary from plain data.
     """
 
-    def __init__(self, module: tuple[str, ...], data: Series) -> None:
+    def __init__(
+        self,
+        module: tuple[str, ...],
+        data: Series,
+        arrays: dict[Hashable, DataFrame] | None = None,
+    ) -> None:
         self.module: tuple[str, ...] = module
         self.data: Series = data
+        self.arrays: dict[Hashable, DataFrame] = {} if arrays is None else arrays
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore a summary, with no arrays if it was pickled before `arrays` existed."""
+        self.__dict__.update(state)
+        self.__dict__.setdefault("arrays", {})
 
     @property
     def name(self) -> Hashable:
@@ -49,35 +72,89 @@ class ReportSum:
 
     @classmethod
     def concat(
-        cls, report_sums: Iterable[Self], join: Literal["inner", "outer"] = "outer"
+        cls,
+        report_sums: Iterable[Self],
+        join: Literal["inner", "outer"] = "outer",
+        *,
+        raw: bool = False,
     ) -> DataFrame:
         """
         Concatenate multiple `ReportSum` objects into one.
 
+        The values are converted with the schema of the module, i.e. "35.2%" -> 35.2 and "1.2 M" -> 1200000.0, so that the columns are numeric. See `ReportSchema`.
+
         Parameters
         ----------
         report_sums : Iterable[Self]
             Multiple `ReportSum` objects.
         join : Literal["inner", "outer"], default "outer"
             How to handle indexes on other axis (or axes).
+        raw : bool, default False
+            Keep the values as parsed, without converting them.
 
         Returns
         -------
         multi_report_sum : DataFrame
             A `DataFrame` containing the concatenated data from all `ReportSum` objects.
         """
-        report_sum_module_list: list = [report_sum.module for report_sum in report_sums]
+        report_sum_list: list[Self] = list(report_sums)
+        report_sum_module_list: list = [
+            report_sum.module for report_sum in report_sum_list
+        ]
         if len(set(report_sum_module_list)) > 1:
             error_modules_str: str = ",".join(list(map(str, report_sum_module_list)))
             raise ValueError(
                 f"All report_sums must have the same module. The modules of the reports are: {error_modules_str}"
             )
-        multi_report_sum: DataFrame = pd.concat(
-            [report_sum.data for report_sum in report_sums], axis=1, join=join
+        if len(report_sum_list) == 0:
+            raise ValueError("No report_sums to concatenate.")
+        report_table: ReportTable = ReportTable(report_sum_list)
+        multi_report_sum: DataFrame = report_table.to_frame(
+            report_sum_module_list[0], join=join, raw=raw
         )
-        multi_report_sum = multi_report_sum.T
         return multi_report_sum
 
+    @classmethod
+    def stack_arrays(
+        cls, report_sums: Iterable[Self], key: Hashable
+    ) -> "ArrayStack":
+        """
+        Stack an array of multiple `ReportSum` objects into one, on the positions and the metrics of all the reports.
+
+        Parameters
+        ----------
+        report_sums : Iterable[Self]
+            Multiple `ReportSum` objects of the same module, parsed with `arrays=True`.
+        key : Hashable
+            The key of the array in `arrays`, i.e. `("read1_before_filtering", "quality_curves")`.
+
+        Returns
+        -------
+        array_stack : ArrayStack
+            The stacked array, a report per row. The values of a report without the array, or beyond its last position, are `NaN`.
+        """
+        report_sum_list: list[Self] = list(report_sums)
+        report_sum_module_list: list = [
+            report_sum.module for report_sum in report_sum_list
+        ]
+        if len(set(report_sum_module_list)) > 1:
+            error_modules_str: str = ",".join(list(map(str, report_sum_module_list)))
+            raise ValueError(
+                f"All report_sums must have the same module. The modules of the reports are: {error_modules_str}"
+            )
+        if len(report_sum_list) == 0:
+            raise ValueError("No report_sums to stack.")
+        array_list: list[DataFrame | None] = [
+            report_sum.arrays.get(key) for report_sum in report_sum_list
+        ]
+        array_stack: ArrayStack = ArrayStack.from_arrays(
+            names=[report_sum.name for report_sum in report_sum_list],
+            arrays=array_list,
+        )
+        if len(array_stack.metrics) == 0:
+            raise ValueError(f"No report_sums with the array: {key}")
+        return array_stack
+
     def rename(self, name: Hashable | None) -> None:
         """
         Change the name of the `data`.
@@ -88,3 +165,473 @@ class ReportSum:
             The new name of the `data` attribute.
         """
         self.data.name = name
+
+    def to_record(self) -> dict[str, Any]:
+        """
+        Convert the summary to plain data, i.e. to be serialized to JSON. Unlike a pickle, the record holds no code to run when it is read back.
+
+        Returns
+        -------
+        record : dict[str, Any]
+            The module, the data and the arrays of the summary, each series or table as lists of keys, dtypes and values. A tuple key is a list.
+        """
+        return {
+            "module": list(self.module),
+            "data": _series_record(self.data),
+            "arrays": [
+                {"key": _key_record(key), **_frame_record(array)}
+                for key, array in self.arrays.items()
+            ],
+        }
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> Self:
+        """
+        Build a summary from plain data.
+
+        Parameters
+        ----------
+        record : dict[str, Any]
+            The output of `to_record`.
+
+        Returns
+        -------
+        report_sum : Self
+            The summary, equal to the one converted.
+        """
+        return cls(
+            module=tuple(record["module"]),
+            data=_record_series(record["data"]),
+            arrays={
+                _record_key(array_record["key"]): _record_frame(array_record)
+                for array_record in record["arrays"]
+            },
+        )
+
+
+class ReportTable:
+    """
+    A builder of the tables of many reports, one table per module.
+
+    The values of the reports are collected column by column as they are added, and each table is built at once from its columns. Reports of different modules can be mixed, i.e. the reports of `scan_and_parse`.
+
+    Attributes
+    ----------
+    modules : list[tuple[str, ...]]
+        The modules of the reports added, in order of first appearance.
+
+    Methods
+    -------
+    add(report_sum: ReportSum) -> None
+        Add a report.
+    extend(report_sums: Iterable[ReportSum]) -> None
+        Add many reports.
+    to_frame(module: tuple[str, ...], join: Literal["inner", "outer"] = "outer", *, raw: bool = False) -> DataFrame
+        Build the table of a module.
+    concat_by_module(join: Literal["inner", "outer"] = "outer", *, raw: bool = False) -> dict[tuple[str, ...], DataFrame]
+        Build the tables of all the modules.
+    clear(module: tuple[str, ...] | None = None) -> None
+        Remove the reports of a module, or all the reports.
+    """
+
+    def __init__(self: Self, report_sums: Iterable[ReportSum] = ()) -> None:
+        self._module_columns_dict: dict[tuple[str, ...], _ModuleColumns] = {}
+        self.extend(report_sums)
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the table by its numbers of modules and reports."""
+        return f"{self.__class__.__name__}(modules: {len(self.modules)}, reports: {len(self)})"
+
+    def __len__(self: Self) -> int:
+        """Return the number of reports added."""
+        return sum(c.row_num for c in self._module_columns_dict.values())
+
+    @property
+    def modules(self: Self) -> list[tuple[str, ...]]:
+        """
+        The modules of the reports added, in order of first appearance.
+
+        Returns
+        -------
+        modules : list[tuple[str, ...]]
+            The modules.
+        """
+        return list(self._module_columns_dict)
+
+    def add(self: Self, report_sum: ReportSum) -> None:
+        """
+        Add a report.
+
+        Parameters
+        ----------
+        report_sum : ReportSum
+            A parsed report.
+        """
+        module_columns: _ModuleColumns | None = self._module_columns_dict.get(
+            report_sum.module
+        )
+        if module_columns is None:
+            module_columns = _ModuleColumns()
+            self._module_columns_dict[report_sum.module] = module_columns
+        module_columns.add_row(report_sum.name, report_sum.data)
+
+    def extend(self: Self, report_sums: Iterable[ReportSum]) -> None:
+        """
+        Add many reports.
+
+        Parameters
+        ----------
+        report_sums : Iterable[ReportSum]
+            Parsed reports.
+        """
+        for report_sum in report_sums:
+            self.add(report_sum)
+
+    def to_frame(
+        self: Self,
+        module: tuple[str, ...],
+        join: Literal["inner", "outer"] = "outer",
+        *,
+        raw: bool = False,
+    ) -> DataFrame:
+        """
+        Build the table of a module.
+
+        Parameters
+        ----------
+        module : tuple[str, ...]
+            The module, i.e. `("fastp", "json")`.
+        join : Literal["inner", "outer"], default "outer"
+            Keep all the keys, missing values being `NaN`, or only the keys of every report.
+        raw : bool, default False
+            Keep the values as parsed, without converting them with the schema of the module. See `ReportSchema`.
+
+        Returns
+        -------
+        multi_report_sum : DataFrame
+            A row per report, named after the report, and a column per key in order of first appearance.
+        """
+        if module not in self._module_columns_dict:
+            raise ValueError(f"No report of module: {module}")
+        if join not in ("inner", "outer"):
+            raise ValueError(f"Invalid join: {join}")
+        multi_report_sum: DataFrame = self._module_columns_dict[module].to_frame(
+            inner=join == "inner", raw=raw
+        )
+        if not raw:
+            schema: ReportSchema | None = _registry.get_module(module[0]).schema(
+                module
+            )
+            if schema is not None:
+                multi_report_sum = schema.apply(multi_report_sum)
+        return multi_report_sum
+
+    def concat_by_module(
+        self: Self,
+        join: Literal["inner", "outer"] = "outer",
+        *,
+        raw: bool = False,
+    ) -> dict[tuple[str, ...], DataFrame]:
+        """
+        Build the tables of all the modules.
+
+        Parameters
+        ----------
+        join : Literal["inner", "outer"], default "outer"
+            Keep all the keys of a module, or only the keys of every report of the module.
+        raw : bool, default False
+            Keep the values as parsed, without converting them.
+
+        Returns
+        -------
+        multi_report_sum_dict : dict[tuple[str, ...], DataFrame]
+            The table of each module, in order of first appearance.
+        """
+        return {
+            module: self.to_frame(module, join=join, raw=raw)
+            for module in self._module_columns_dict
+        }
+
+    def clear(self: Self, module: tuple[str, ...] | None = None) -> None:
+        """
+        Remove the reports of a module, or all the reports.
+
+        Parameters
+        ----------
+        module : tuple[str, ...] | None, default None
+            The module. Default is `None`, which means all the modules.
+        """
+        if module is None:
+            self._module_columns_dict.clear()
+        else:
+            self._module_columns_dict.pop(module, None)
+
+
+class ArrayStack:
+    """
+    The arrays of many reports, stacked into a single array on shared positions and metrics.
+
+    Attributes
+    ----------
+    values : np.ndarray
+        The values, of shape `(len(names), len(positions), len(metrics))` and of dtype float64. `NaN` where a report has no value.
+    names : list[Hashable]
+        The names of the reports, in input order.
+    positions : pd.Index
+        The positions of all the reports, sorted, i.e. the cycles of the reads.
+    metrics : pd.Index
+        The metrics of all the reports, in order of first appearance.
+
+    Methods
+    -------
+    from_arrays(names: list[Hashable], arrays: list[DataFrame | None]) -> ArrayStack
+        Stack the arrays of many reports.
+    to_frame(metric: Hashable) -> DataFrame
+        The values of a metric, a row per report and a column per position.
+    """
+
+    def __init__(
+        self: Self,
+        values: np.ndarray,
+        names: list[Hashable],
+        positions: pd.Index,
+        metrics: pd.Index,
+    ) -> None:
+        expected_shape: tuple[int, int, int] = (len(names), len(positions), len(metrics))
+        if values.shape != expected_shape:
+            raise ValueError(
+                f"The shape of the values does not match the axes: {values.shape}. Expected shape: {expected_shape}"
+            )
+        self.values: np.ndarray = values
+        self.names: list[Hashable] = names
+        self.positions: pd.Index = positions
+        self.metrics: pd.Index = metrics
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the stack by its shape."""
+        return f"{self.__class__.__name__}(shape: {self.values.shape})"
+
+    @classmethod
+    def from_arrays(
+        cls, names: list[Hashable], arrays: list[DataFrame | None]
+    ) -> Self:
+        """
+        Stack the arrays of many reports.
+
+        Parameters
+        ----------
+        names : list[Hashable]
+            The names of the reports.
+        arrays : list[DataFrame | None]
+            The array of each report, a row per position and a column per metric. `None` if the report has no array.
+
+        Returns
+        -------
+        array_stack : ArrayStack
+            The stacked arrays.
+        """
+        if len(names) != len(arrays):
+            raise ValueError(
+                f"The number of names does not match the number of arrays: {len(names)} != {len(arrays)}"
+            )
+        present_array_list: list[DataFrame] = [a for a in arrays if a is not None]
+        positions: pd.Index = pd.Index([])
+        metrics: pd.Index = pd.Index([])
+        if len(present_array_list) > 0:
+            positions = present_array_list[0].index
+            for array in present_array_list[1:]:
+                if not array.index.equals(positions):
+                    positions = positions.union(array.index)
+            metrics = pd.Index(
+                list(
+                    dict.fromkeys(
+                        metric
+                        for array in present_array_list
+                        for metric in array.columns
+                    )
+                ),
+                tupleize_cols=False,
+            )
+        values: np.ndarray = np.full(
+            (len(names), len(positions), len(metrics)), np.nan, dtype=np.float64
+        )
+        for i, array in enumerate(arrays):
+            if array is None:
+                continue
+            array_values: np.ndarray = array.to_numpy(dtype=np.float64, na_value=np.nan)
+            if array.index.equals(positions) and array.columns.equals(metrics):
+                values[i] = array_values
+                continue
+            # a shorter read or fewer metrics, the other values stay NaN
+            values[i][
+                np.ix_(positions.get_indexer(array.index), metrics.get_indexer(array.columns))
+            ] = array_values
+        return cls(values=values, names=list(names), positions=positions, metrics=metrics)
+
+    def to_frame(self: Self, metric: Hashable) -> DataFrame:
+        """
+        Return the values of a metric, a row per report and a column per position.
+
+        Parameters
+        ----------
+        metric : Hashable
+            The metric, i.e. "mean".
+
+        Returns
+        -------
+        metric_df : DataFrame
+            The values of the metric.
+        """
+        metric_index: int = self.metrics.get_loc(metric)
+        metric_df: DataFrame = DataFrame(
+            self.values[:, :, metric_index],
+            index=pd.Index(self.names),
+            columns=self.positions,
+        )
+        return metric_df
+
+
+class _ModuleColumns:
+    """The columns of the reports of a module, padded with `None` for the missing keys."""
+
+    def __init__(self: Self) -> None:
+        self.row_num: int = 0
+        self.row_names: list[Hashable] = []
+        self.columns: dict[Hashable, list[Any]] = {}
+        self.column_counts: dict[Hashable, int] = {}
+
+    def add_row(self: Self, name: Hashable, data: Series) -> None:
+        for key, value in zip(_index_keys(data.index), data.tolist()):
+            column: list[Any] | None = self.columns.get(key)
+            if column is None:
+                column = []
+                self.columns[key] = column
+                self.column_counts[key] = 0
+            if len(column) > self.row_num:
+                # a duplicated key, the last value wins
+                column[-1] = value
+                continue
+            if len(column) < self.row_num:
+                column.extend([None] * (self.row_num - len(column)))
+            column.append(value)
+            self.column_counts[key] += 1
+        self.row_names.append(name)
+        self.row_num += 1
+
+    def to_frame(self: Self, inner: bool, raw: bool = False) -> DataFrame:
+        """Build the table, with object columns holding the values as parsed if `raw`, as the concatenation of the series of the reports did."""
+        column_dict: dict[Hashable, list[Any]] = {}
+        for key, column in self.columns.items():
+            if inner and self.column_counts[key] < self.row_num:
+                continue
+            if len(column) < self.row_num:
+                column.extend([None] * (self.row_num - len(column)))
+            column_dict[key] = column
+        column_index: pd.Index = pd.Index(list(column_dict), tupleize_cols=True)
+        return DataFrame(
+            dict(enumerate(column_dict.values())),
+            index=pd.Index(self.row_names),
+            dtype=object if raw else None,
+        ).set_axis(column_index, axis=1)
+
+
+def _index_keys(index: pd.Index) -> list[Hashable]:
+    """Return the keys of an index, faster than `index.tolist()` for a `MultiIndex` whose tuples are not cached."""
+    if not isinstance(index, pd.MultiIndex):
+        return index.tolist()
+    level_value_lists: list[list[Any]] = [level.tolist() + [None] for level in index.levels]
+    # the code -1 of a missing value selects the trailing None
+    return list(
+        zip(
+            *[
+                [level_values[code] for code in level_codes.tolist()]
+                for level_values, level_codes in zip(level_value_lists, index.codes)
+            ]
+        )
+    )
+
+
+def _key_record(key: Hashable) -> Any:
+    """Return a key as plain data, a tuple being a list."""
+    if isinstance(key, tuple):
+        return [_key_record(k) for k in key]
+    return _value_record(key)
+
+
+def _record_key(key_record: Any) -> Hashable:
+    """Return the key of a key record, a list being a tuple."""
+    if isinstance(key_record, list):
+        return tuple(_record_key(k) for k in key_record)
+    return key_record
+
+
+def _value_record(value: Any) -> Any:
+    """Return a value as plain data, a numpy scalar being the Python one."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _index_record(index: pd.Index) -> dict[str, list[Any]]:
+    """Return the keys and the level names of an index as plain data."""
+    return {
+        "keys": [_key_record(k) for k in _index_keys(index)],
+        "names": [_key_record(n) for n in index.names],
+    }
+
+
+def _record_index(index_record: dict[str, list[Any]]) -> pd.Index:
+    """Return the index of an index record, a `MultiIndex` if it has many levels."""
+    key_list: list[Hashable] = [_record_key(k) for k in index_record["keys"]]
+    name_list: list[Hashable] = [_record_key(n) for n in index_record["names"]]
+    if len(name_list) > 1:
+        return pd.MultiIndex.from_tuples(key_list, names=name_list)
+    return pd.Index(key_list, name=name_list[0], tupleize_cols=False)
+
+
+def _series_record(series: Series) -> dict[str, Any]:
+    """Return a series as plain data."""
+    return {
+        "name": _key_record(series.name),
+        "index": _index_record(series.index),
+        "dtype": str(series.dtype),
+        "values": [_value_record(v) for v in series.tolist()],
+    }
+
+
+def _record_series(series_record: dict[str, Any]) -> Series:
+    """Return the series of a series record."""
+    return Series(
+        series_record["values"],
+        index=_record_index(series_record["index"]),
+        dtype=series_record["dtype"],
+        name=_record_key(series_record["name"]),
+    )
+
+
+def _frame_record(frame: DataFrame) -> dict[str, Any]:
+    """Return a table as plain data, column by column."""
+    return {
+        "index": _index_record(frame.index),
+        "columns": _index_record(frame.columns),
+        "dtypes": [str(dtype) for dtype in frame.dtypes],
+        "values": [
+            [_value_record(v) for v in frame.iloc[:, i].tolist()]
+            for i in range(frame.shape[1])
+        ],
+    }
+
+
+def _record_frame(frame_record: dict[str, Any]) -> DataFrame:
+    """Return the table of a table record."""
+    index: pd.Index = _record_index(frame_record["index"])
+    frame: DataFrame = DataFrame(
+        {
+            i: Series(values, dtype=dtype)
+            for i, (values, dtype) in enumerate(
+                zip(frame_record["values"], frame_record["dtypes"])
+            )
+        },
+        index=pd.RangeIndex(len(index)),
+    )
+    return frame.set_axis(index, axis=0).set_axis(
+        _record_index(frame_record["columns"]), axis=1
+    )
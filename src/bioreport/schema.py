@@ -0,0 +1,175 @@
+"""Types of the values of reports."""
+
+from fnmatch import fnmatchcase
+from typing import Hashable, Iterable, Literal, Self
+
+import pandas as pd
+from pandas import DataFrame, Series
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+ValueKind = Literal["int", "float", "percent", "number", "str"]
+VALUE_KINDS: tuple[str, ...] = ("int", "float", "percent", "number", "str")
+
+# a number, an optional unit and an optional comment in brackets, i.e. "1.2 M (97.2%)"
+_NUMBER_REGEX: str = r"^\s*(?P<number>[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)\s*(?P<unit>[KMGT%]?)\s*(?:\(.*\))?\s*$"
+_INT_LITERAL_REGEX: str = r"^[-+]?\d+$"
+_UNIT_SCALE_DICT: dict[str, float] = {
+    "": 1.0,
+    "%": 1.0,
+    "K": 1e3,
+    "M": 1e6,
+    "G": 1e9,
+    "T": 1e12,
+}
+# the units accepted by each kind
+_KIND_UNITS_DICT: dict[str, tuple[str, ...]] = {
+    "int": ("",),
+    "float": ("",),
+    "percent": ("", "%"),
+    "number": tuple(_UNIT_SCALE_DICT),
+}
+
+
+class ReportSchema:
+    """
+    The types of the values of a report submodule, used to build numeric tables.
+
+    The kind of a value is given by the first rule whose pattern matches its key, or `default`. Patterns are shell-style and matched against the last level of the key, i.e. "total_reads" for `("before_filtering", "total_reads")`. The kinds are:
+
+    - "int": an integer, converted to int64.
+    - "float": a number, converted to float64.
+    - "percent": a number with an optional "%" suffix, converted to float64 in percent, i.e. "35.2%" -> 35.2.
+    - "number": a number with an optional unit suffix among "K", "M", "G", "T" and "%", and an optional comment in brackets, i.e. "1.2 M (97.2%)" -> 1200000.0. Converted to int64 if all the values are integers without unit, otherwise to float64. Numeric columns are kept as is.
+    - "str": kept as is.
+
+    A column is kept as is if any of its values cannot be converted. An integer column with missing values is converted to float64.
+
+    Attributes
+    ----------
+    rules : tuple[tuple[str, ValueKind], ...]
+        The patterns of the keys and their kinds, in order.
+    default : ValueKind
+        The kind of the keys matching no rule.
+
+    Methods
+    -------
+    kind(key: Hashable) -> ValueKind
+        Return the kind of the values of a key.
+    apply(data: DataFrame) -> DataFrame
+        Convert the columns of a table of reports.
+    """
+
+    def __init__(
+        self: Self,
+        rules: Iterable[tuple[str, ValueKind]] = (),
+        default: ValueKind = "number",
+    ) -> None:
+        self.rules: tuple[tuple[str, ValueKind], ...] = tuple(rules)
+        self.default: ValueKind = default
+        for _, kind in (*self.rules, ("", default)):
+            if kind not in VALUE_KINDS:
+                raise ValueError(f"Invalid value kind: {kind}")
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the schema by its number of rules and its default kind."""
+        return f'{self.__class__.__name__}(rules: {len(self.rules)}, default: "{self.default}")'
+
+    def kind(self: Self, key: Hashable) -> ValueKind:
+        """
+        Return the kind of the values of a key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the values, a column of the table of reports.
+
+        Returns
+        -------
+        kind : ValueKind
+            The kind of the first matching rule, or `default`.
+        """
+        key_name: str = str(key[-1] if isinstance(key, tuple) else key)
+        for pattern, kind in self.rules:
+            if fnmatchcase(key_name, pattern):
+                return kind
+        return self.default
+
+    def apply(self: Self, data: DataFrame) -> DataFrame:
+        """
+        Convert the columns of a table of reports.
+
+        Parameters
+        ----------
+        data : DataFrame
+            A table with a report per row and a key per column, i.e. the output of `ReportSum.concat(raw=True)`.
+
+        Returns
+        -------
+        typed_data : DataFrame
+            A copy of `data` with the converted columns.
+        """
+        typed_data: DataFrame = data.copy(deep=False)
+        for column_index, key in enumerate(data.columns):
+            typed_data.isetitem(
+                column_index, convert_column(data.iloc[:, column_index], self.kind(key))
+            )
+        return typed_data
+
+
+def convert_column(column: Series, kind: ValueKind) -> Series:
+    """
+    Convert the values of a column to a kind. See `ReportSchema` for the kinds.
+
+    Parameters
+    ----------
+    column : Series
+        The values.
+    kind : ValueKind
+        The kind of the values.
+
+    Returns
+    -------
+    typed_column : Series
+        The converted values, or `column` if any value cannot be converted.
+    """
+    if kind == "str" or is_bool_dtype(column):
+        return column
+    if is_numeric_dtype(column):
+        return _convert_numeric_column(column, kind)
+
+    not_null: Series = column.notna()
+    text: Series = column[not_null].astype(str)
+    number_parts: DataFrame = text.str.extract(_NUMBER_REGEX)
+    if (
+        number_parts["number"].isna().any()
+        or not number_parts["unit"].isin(_KIND_UNITS_DICT[kind]).all()
+    ):
+        return column
+    is_int: bool = (
+        kind in ("int", "number")
+        and bool(number_parts["unit"].eq("").all())
+        and bool(number_parts["number"].str.match(_INT_LITERAL_REGEX).all())
+    )
+    if kind == "int" and not is_int:
+        return column
+
+    numbers: Series = pd.to_numeric(number_parts["number"])
+    if is_int and not_null.all():
+        return numbers.astype("int64").rename(column.name)
+    typed_column: Series = Series(float("nan"), index=column.index, name=column.name)
+    typed_column[not_null] = numbers.astype("float64") * number_parts["unit"].map(
+        _UNIT_SCALE_DICT
+    )
+    return typed_column
+
+
+def _convert_numeric_column(column: Series, kind: ValueKind) -> Series:
+    """Convert the values of a numeric column to a kind other than "str"."""
+    if kind == "number":
+        return column
+    typed_column: Series = column.astype("float64")
+    if kind == "int" and column.notna().all():
+        if (typed_column % 1 == 0).all():
+            return column.astype("int64")
+        return column
+    return typed_column
@@ -1,20 +1,51 @@
 """Search for report files."""
 
 import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Literal
 
-from rich.logging import RichHandler
-from rich.progress import track
-
+from bioreport import _match, _walk
+from bioreport._walk import WalkOptions
+from bioreport.classifier import ReportClassifier
 from bioreport.report import Report
+from bioreport.snapshot import incremental_scan_dir
+from bioreport.stats import ScanStats, current_stats
+
+if TYPE_CHECKING:
+    from rich.logging import RichHandler
+    from rich.progress import TaskID
 
 _logger: logging.Logger = logging.getLogger(__name__)
 _logger.setLevel(logging.DEBUG)
-_rich_handler = RichHandler(level=logging.INFO, show_path=False, rich_tracebacks=True)
-_logger.addHandler(_rich_handler)
 
 
-def scan_dir(dir: str | Path) -> list[Report]:
+class _RichHandlerHolder:
+    """Hold the `RichHandler` attached to the logger of the module, attached once per process."""
+
+    def __init__(self) -> None:
+        """Create a holder with no handler attached yet."""
+        self.handler: RichHandler | None = None
+        self.lock: threading.Lock = threading.Lock()
+
+
+_rich_handler_holder: _RichHandlerHolder = _RichHandlerHolder()  # attached on the first scan, importing rich is slow
+
+_MAX_QUEUED_FILES_PER_WORKER: int = 4  # bound of the files listed by ascan_dir but not classified yet
+
+
+def scan_dir(  # noqa: PLR0913  the walk options are grouped in `options`, the others select the pool and the snapshot
+    dir: str | Path,
+    classifier: ReportClassifier | None = None,
+    *,
+    options: WalkOptions | None = None,
+    workers: int = 1,
+    executor: Literal["thread", "process"] = "thread",
+    snapshot: str | Path | None = None,
+) -> list[Report]:
     """
     Scan a directory to find all the report files.
 
@@ -22,29 +53,300 @@ def scan_dir(dir: str | Path) -> list[Report]:
     ----------
     dir : str | Path
         The directory to scan.
+    classifier : ReportClassifier | None, default None
+        The classifier used to determine the report types. Default is `None`, which means the classifier built from the package report patterns.
+    options : WalkOptions | None, default None
+        The files to match: the pruning rules of the walk, i.e. `include`, `exclude` or `max_depth`, the shard of the files and whether to match the members of archives. Default is `None`, which means all the files of the tree.
+    workers : int, default 1
+        The number of workers matching files. Default is `1`, which means files are matched serially. With more workers, files are matched in a pool while the directory is still being walked.
+    executor : Literal["thread", "process"], default "thread"
+        The type of pool used when `workers` is greater than 1. Threads suit storage with a high latency per file, processes suit CPU bound matching.
+    snapshot : str | Path | None, default None
+        The path to a snapshot file of the previous scan, updated after the scan. Only the directories and files changed since the snapshot are matched again. Default is `None`, which means everything is matched. Not supported with the `archives` or `num_shards` options. See `incremental_scan_dir`.
 
     Returns
     -------
     report_list : list[Report]
-        A list of `Report` objects. `Report.path` is the report file path. `Report.module` is a tuple of the type of the report.
+        A list of `Report` objects. `Report.path` is the report file path. `Report.module` is a tuple of the type of the report. The reports are in the order of a top-down walk with the entries of each directory sorted by name, whatever the number of workers.
     """
-    dir_path: Path
-    if isinstance(dir, str):
-        dir_path = Path(dir).absolute()
-    elif isinstance(dir, Path):
-        dir_path = dir.absolute()
+    if options is None:
+        options = WalkOptions()
+    dir_path: Path = _match.resolve_dir(dir)
+    _attach_rich_handler()
     _logger.info(f"Scanning directory: {str(dir_path)}")
+    stats: ScanStats | None = current_stats()
+    start_time: float = time.perf_counter()
+    if snapshot is not None:
+        snapshot_report_list: list[Report] = incremental_scan_dir(
+            dir_path,
+            snapshot,
+            classifier,
+            options=options,
+            workers=workers,
+            executor=executor,
+        ).reports
+        if stats is not None:
+            stats.record_stage("scan_dir", time.perf_counter() - start_time)
+        return snapshot_report_list
 
-    file_found_list: list[Path] = []
-    for curr_root, _, curr_files in dir_path.walk():
-        curr_file_path_list: list[Path] = [Path(curr_root) / f for f in curr_files]
-        file_found_list.extend(curr_file_path_list)
-    _logger.info(f"Total number of files to match: {len(file_found_list)}")
-    candidate_report_list: list[Report] = [
-        Report.match_file(f)
-        for f in track(sequence=file_found_list, description="Matching files...")
-    ]
-    report_list: list[Report] = list(
-        filter(lambda x: not x.with_empty_module(), candidate_report_list)
+    from rich.progress import (  # noqa: PLC0415  about 45 ms to import, only scans show progress
+        Progress,
     )
+
+    report_list: list[Report] = []
+    file_num: int = 0
+    with Progress(transient=True) as progress:
+        progress_task: TaskID = progress.add_task("Matching files...", total=None)
+        for report in _match.iter_matches(
+            file_paths=_iter_walk_paths(dir_path, options),
+            classifier=classifier,
+            workers=workers,
+            executor=executor,
+            archives=options.archives,
+        ):
+            file_num += 1
+            progress.advance(progress_task)
+            if not report.with_empty_module():
+                report_list.append(report)
+    _logger.info(f"Total number of files matched: {file_num}")
+    if stats is not None:
+        stats.record_stage("scan_dir", time.perf_counter() - start_time)
     return report_list
+
+
+def iter_scan_dir(
+    dir: str | Path,
+    classifier: ReportClassifier | None = None,
+    *,
+    options: WalkOptions | None = None,
+    workers: int = 1,
+    executor: Literal["thread", "process"] = "thread",
+) -> Iterator[Report]:
+    """
+    Scan a directory and yield the report files as they are found.
+
+    The directory is walked with `os.scandir` while reports are yielded, the list of all the files is never built. The parameters are the same as `scan_dir`.
+
+    Parameters
+    ----------
+    dir : str | Path
+        The directory to scan.
+    classifier : ReportClassifier | None, default None
+        The classifier used to determine the report types. Default is `None`, which means the classifier built from the package report patterns.
+    options : WalkOptions | None, default None
+        The files to match. Default is `None`, which means all the files of the tree.
+    workers : int, default 1
+        The number of workers matching files.
+    executor : Literal["thread", "process"], default "thread"
+        The type of pool used when `workers` is greater than 1.
+
+    Yields
+    ------
+    report : Report
+        A report found, in the same order as `scan_dir`.
+    """
+    if options is None:
+        options = WalkOptions()
+    dir_path: Path = _match.resolve_dir(dir)
+    for report in _match.iter_matches(
+        file_paths=_iter_walk_paths(dir_path, options),
+        classifier=classifier,
+        workers=workers,
+        executor=executor,
+        archives=options.archives,
+    ):
+        if not report.with_empty_module():
+            yield report
+
+
+def iter_match_files(
+    files: Iterable[str | Path],
+    classifier: ReportClassifier | None = None,
+    *,
+    workers: int = 1,
+    executor: Literal["thread", "process"] = "thread",
+    archives: bool = False,
+) -> Iterator[Report]:
+    """
+    Match files and yield the report files as they are matched.
+
+    Parameters
+    ----------
+    files : Iterable[str | Path]
+        The files to match. They must exist. An iterator is consumed while the reports are yielded.
+    classifier : ReportClassifier | None, default None
+        The classifier used to determine the report types. Default is `None`, which means the classifier built from the package report patterns.
+    workers : int, default 1
+        The number of workers matching files.
+    executor : Literal["thread", "process"], default "thread"
+        The type of pool used when `workers` is greater than 1.
+    archives : bool, default False
+        Whether to match the members of the tar and zip archives instead of the archives.
+
+    Yields
+    ------
+    report : Report
+        A report found, in the order of `files`. The files that are not reports are skipped.
+    """
+    for report in _match.iter_matches(
+        file_paths=(Path(f).absolute() for f in files),
+        classifier=classifier,
+        workers=workers,
+        executor=executor,
+        archives=archives,
+    ):
+        if not report.with_empty_module():
+            yield report
+
+
+async def ascan_dir(
+    dir: str | Path,
+    classifier: ReportClassifier | None = None,
+    *,
+    options: WalkOptions | None = None,
+    concurrency: int = 64,
+    executor: Executor | None = None,
+) -> list[Report]:
+    """
+    Scan a directory to find all the report files, from an asyncio event loop.
+
+    Directories are listed and files are classified in threads, so that the event loop keeps up to `concurrency` of them in flight. A fixed number of worker tasks list the directories and classify the files, fed through a bounded queue, so the number of tasks does not grow with the tree. Suits storage with a high latency per file, i.e. network file systems. The other parameters are the same as `scan_dir`.
+
+    Parameters
+    ----------
+    dir : str | Path
+        The directory to scan.
+    classifier : ReportClassifier | None, default None
+        The classifier used to determine the report types. Default is `None`, which means the classifier built from the package report patterns.
+    options : WalkOptions | None, default None
+        The files to match. Default is `None`, which means all the files of the tree.
+    concurrency : int, default 64
+        The maximum number of directories listed and files classified at once.
+    executor : Executor | None, default None
+        The thread pool running the blocking calls, left open. Default is `None`, which means a pool of `concurrency` threads created for the scan.
+
+    Returns
+    -------
+    report_list : list[Report]
+        A list of `Report` objects, in the same order as `scan_dir`.
+    """
+    import asyncio  # noqa: PLC0415  asyncio takes about 40 ms to import, only the asyncio API needs it
+
+    from bioreport import _aio  # noqa: PLC0415  imports asyncio
+
+    _aio.check_concurrency(concurrency)
+    if options is None:
+        options = WalkOptions()
+    dir_path: Path = _match.resolve_dir(dir)
+    _attach_rich_handler()
+    _logger.info(f"Scanning directory: {str(dir_path)}")
+    stats: ScanStats | None = current_stats()
+    start_time: float = time.perf_counter()
+    if classifier is None:
+        classifier = ReportClassifier.default()
+    # the workers listing directories and those classifying files share the limit of blocking calls at once
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+    dir_queue: asyncio.Queue[_walk.DirTask | None] = asyncio.Queue()
+    file_queue: asyncio.Queue[tuple[str, Path] | None] = asyncio.Queue(
+        maxsize=concurrency * _MAX_QUEUED_FILES_PER_WORKER
+    )
+    # the reports of each file by its posix path relative to dir, in completion order
+    match_list: list[tuple[str, list[Report]]] = []
+
+    async def list_dirs(pool: Executor, visited_dir_set: set[tuple[int, int]]) -> None:
+        """List the queued directories, and queue their files and subdirectories until a `None` is queued."""
+        while (dir_task := await dir_queue.get()) is not None:
+            try:
+                dir_listing: tuple[list[os.DirEntry], list[_walk.DirTask]] | None = (
+                    await _aio.run_blocking(
+                        pool,
+                        semaphore,
+                        _walk.list_dir,
+                        dir_task,
+                        options,
+                        visited_dir_set,
+                    )
+                )
+                if dir_listing is None:
+                    continue
+                file_entry_list, sub_dir_list = dir_listing
+                rel_dir: str = dir_task[1]
+                for entry in file_entry_list:
+                    # waits for the workers classifying files when the queue is full
+                    await file_queue.put(
+                        (
+                            entry.name if rel_dir == "" else f"{rel_dir}/{entry.name}",
+                            Path(entry.path),
+                        )
+                    )
+                for sub_dir_task in sub_dir_list:
+                    dir_queue.put_nowait(sub_dir_task)
+            finally:
+                dir_queue.task_done()
+
+    async def match_files(pool: Executor) -> None:
+        """Classify the queued files until a `None` is queued."""
+        while (file_item := await file_queue.get()) is not None:
+            rel_path, file_path = file_item
+            match_list.append(
+                (
+                    rel_path,
+                    await _aio.run_blocking(
+                        pool,
+                        semaphore,
+                        _match.match_path,
+                        file_path,
+                        classifier,
+                        options.archives,
+                    ),
+                )
+            )
+
+    async with _aio.thread_pool(executor, concurrency) as pool:
+        root_dir_task, visited_dir_set = await _aio.run_blocking(
+            pool, semaphore, _walk.start_walk, dir_path, options
+        )
+        dir_queue.put_nowait(root_dir_task)
+        async with asyncio.TaskGroup() as task_group:
+            for _ in range(concurrency):
+                task_group.create_task(list_dirs(pool, visited_dir_set))
+                task_group.create_task(match_files(pool))
+            # every directory is listed once the queue is joined, and all its files are queued
+            await dir_queue.join()
+            for _ in range(concurrency):
+                dir_queue.put_nowait(None)
+                await file_queue.put(None)
+    # the files are classified in any order, sort them back into walk order
+    match_list.sort(key=lambda match: _walk.walk_order_key(match[0]))
+    report_list: list[Report] = [
+        report
+        for _, match_report_list in match_list
+        for report in match_report_list
+        if not report.with_empty_module()
+    ]
+    _logger.info(f"Total number of reports matched: {len(report_list)}")
+    if stats is not None:
+        stats.record_stage("ascan_dir", time.perf_counter() - start_time)
+    return report_list
+
+
+def _attach_rich_handler() -> None:
+    """Attach a `RichHandler` to the logger of the module once."""
+    if _rich_handler_holder.handler is not None:
+        return
+    with _rich_handler_holder.lock:
+        if _rich_handler_holder.handler is None:
+            from rich.logging import (  # noqa: PLC0415  about 30 ms to import, only scans log
+                RichHandler,
+            )
+
+            _rich_handler_holder.handler = RichHandler(
+                level=logging.INFO, show_path=False, rich_tracebacks=True
+            )
+            _logger.addHandler(_rich_handler_holder.handler)
+
+
+def _iter_walk_paths(dir_path: Path, options: WalkOptions) -> Iterator[Path]:
+    """Walk a directory and yield the paths of the files."""
+    for entry in _walk.walk_files(dir_path, options):
+        yield Path(entry.path)
@@ -0,0 +1,200 @@
+"""
+Split the scan and the parsing of a directory between processes or cluster nodes.
+
+Each file is assigned to a shard by a hash of its path relative to the scanned directory, so every shard walks the whole tree but only matches and parses its own files. Each shard writes its results to a partial result file, a JSON file holding only data (see `ReportSum.to_record`), and `merge_shards` combines the partial results in the order of a single scan::
+
+    # on node i of n
+    bioreport.parse_shard("/data/project", f"parts/part-{i}.json", bioreport.WalkOptions(shard=i, num_shards=n))
+    # once all the shards are done
+    batch_result = bioreport.merge_shards(sorted(Path("parts").glob("part-*.json")))
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+from bioreport._match import resolve_dir
+from bioreport._walk import WalkOptions, walk_order_key
+from bioreport.batch import BatchParseResult, ParseFailure, iter_parse_all
+from bioreport.classifier import ReportClassifier
+from bioreport.report import Report
+from bioreport.report_sum import ReportSum
+from bioreport.search import scan_dir
+
+_PARTIAL_FORMAT: str = "bioreport-shard"
+_PARTIAL_VERSION: int = 2
+
+# a result of a partial result file: (posix path relative to the scanned directory, position in its archive, result)
+_ShardEntry = tuple[str, int, ReportSum | ParseFailure]
+
+
+def parse_shard(
+    dir: str | Path,
+    output: str | Path,
+    options: WalkOptions,
+    workers: int = 1,
+    *,
+    classifier: ReportClassifier | None = None,
+    **parse_kwargs: Any,
+) -> BatchParseResult:
+    """
+    Scan and parse a shard of a directory, and write the results to a partial result file.
+
+    Parameters
+    ----------
+    dir : str | Path
+        The directory to scan. The shards may scan it at different mount points, the files are identified by their path relative to it.
+    output : str | Path
+        The partial result file, replaced once it is complete.
+    options : WalkOptions
+        The files to match, with the `shard` to scan and the `num_shards`. The other options must be the same for all the shards.
+    workers : int, default 1
+        The number of workers, used both to match files and to parse reports.
+    classifier : ReportClassifier | None, default None
+        The classifier used to determine the report types. See `scan_dir`.
+    **parse_kwargs : Any
+        Other keyword arguments passed to `iter_parse_all`, i.e. `timeout`, `cache` or `arrays`.
+
+    Returns
+    -------
+    batch_parse_result : BatchParseResult
+        The parsed reports and the failures of the shard, both in scan order.
+    """
+    dir_path: Path = resolve_dir(dir)
+    report_list: list[Report] = scan_dir(
+        dir_path, classifier, options=options, workers=workers
+    )
+    entry_list: list[_ShardEntry] = []
+    member_index: int = 0
+    previous_path: Path | None = None
+    for report, result in zip(
+        report_list,
+        iter_parse_all(report_list, workers=workers, **parse_kwargs),
+    ):
+        # the members of an archive follow each other, in archive order
+        member_index = member_index + 1 if report.path == previous_path else 0
+        previous_path = report.path
+        entry_list.append(
+            (report.path.relative_to(dir_path).as_posix(), member_index, result)
+        )
+    _write_partial(
+        Path(output),
+        {
+            "format": _PARTIAL_FORMAT,
+            "version": _PARTIAL_VERSION,
+            "shard": options.shard,
+            "num_shards": options.num_shards,
+            "dir": str(dir_path),
+            "entries": [_entry_record(entry) for entry in entry_list],
+        },
+    )
+
+    batch_parse_result: BatchParseResult = BatchParseResult(
+        report_sums=[r for _, _, r in entry_list if isinstance(r, ReportSum)],
+        failures=[r for _, _, r in entry_list if isinstance(r, ParseFailure)],
+    )
+    return batch_parse_result
+
+
+def merge_shards(paths: Iterable[str | Path]) -> BatchParseResult:
+    """
+    Combine the partial result files of all the shards of a directory, see `parse_shard`.
+
+    Parameters
+    ----------
+    paths : Iterable[str | Path]
+        The partial result files, one per shard, in any order. They are read as data, so that merging the files of other nodes runs no code of theirs.
+
+    Returns
+    -------
+    batch_parse_result : BatchParseResult
+        The parsed reports and the failures, in the order of a single `scan_and_parse` of the directory. The `index` of each failure is its position among all the reports.
+    """
+    partial_dict: dict[int, dict[str, Any]] = {}
+    num_shards: int | None = None
+    for path in paths:
+        partial: dict[str, Any] = _read_partial(Path(path))
+        if num_shards is None:
+            num_shards = partial["num_shards"]
+        elif partial["num_shards"] != num_shards:
+            raise ValueError(
+                f"The partial result file is from a split into {partial['num_shards']} shards, not {num_shards}: {str(path)}"
+            )
+        if partial["shard"] in partial_dict:
+            raise ValueError(f"Duplicated shard {partial['shard']}: {str(path)}")
+        partial_dict[partial["shard"]] = partial
+    if num_shards is None:
+        raise ValueError("No partial result files to merge.")
+    missing_shard_list: list[int] = [
+        i for i in range(num_shards) if i not in partial_dict
+    ]
+    if len(missing_shard_list) > 0:
+        raise ValueError(f"Missing shards: {missing_shard_list}")
+
+    entry_list: list[_ShardEntry] = sorted(
+        (
+            _record_entry(entry_record)
+            for partial in partial_dict.values()
+            for entry_record in partial["entries"]
+        ),
+        key=lambda entry: (walk_order_key(entry[0]), entry[1]),
+    )
+    report_sum_list: list[ReportSum] = []
+    failure_list: list[ParseFailure] = []
+    for index, (_, _, result) in enumerate(entry_list):
+        if isinstance(result, ParseFailure):
+            result.index = index
+            failure_list.append(result)
+        else:
+            report_sum_list.append(result)
+
+    batch_parse_result: BatchParseResult = BatchParseResult(
+        report_sums=report_sum_list, failures=failure_list
+    )
+    return batch_parse_result
+
+
+def _entry_record(entry: _ShardEntry) -> dict[str, Any]:
+    """Return an entry of a partial result file as plain data."""
+    rel_path, member_index, result = entry
+    result_key: str = "failure" if isinstance(result, ParseFailure) else "report_sum"
+    return {
+        "path": rel_path,
+        "member_index": member_index,
+        result_key: result.to_record(),
+    }
+
+
+def _record_entry(entry_record: dict[str, Any]) -> _ShardEntry:
+    """Return the entry of an entry record."""
+    result: ReportSum | ParseFailure = (
+        ParseFailure.from_record(entry_record["failure"])
+        if "failure" in entry_record
+        else ReportSum.from_record(entry_record["report_sum"])
+    )
+    return entry_record["path"], entry_record["member_index"], result
+
+
+def _write_partial(path: Path, partial: dict[str, Any]) -> None:
+    """Write a partial result file, so that a reader never sees it half written."""
+    temp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "w", encoding="utf-8") as partial_file:
+            json.dump(partial, partial_file, ensure_ascii=False)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _read_partial(path: Path) -> dict[str, Any]:
+    """Read a partial result file, checking its format and version."""
+    with open(path, encoding="utf-8") as partial_file:
+        partial: Any = json.load(partial_file)
+    if (
+        not isinstance(partial, dict)
+        or partial.get("format") != _PARTIAL_FORMAT
+        or partial.get("version") != _PARTIAL_VERSION
+    ):
+        raise ValueError(f"Invalid partial result file: {str(path)}")
+    return partial
@@ -0,0 +1,415 @@
+"""Incremental scans of directories with a persisted snapshot index."""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterator, Literal, Self
+
+from bioreport import __version__, _match, _walk
+from bioreport._compression import split_compression_suffix
+from bioreport._walk import DirTask, PathRule, WalkOptions
+from bioreport.classifier import ReportClassifier
+from bioreport.report import Report
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION: int = 1
+# directories modified this close to the previous scan may have changed again within the same mtime tick
+_RACY_MTIME_NS: int = 2_000_000_000
+
+# the record of a file in a snapshot: [size, mtime_ns, inode, module]
+FileRecord = list
+
+
+class ScanDiff:
+    """
+    The result of an incremental scan.
+
+    Attributes
+    ----------
+    reports : list[Report]
+        All the reports currently in the directory, in the same order as `scan_dir`.
+    added : list[Report]
+        The reports not in the previous snapshot.
+    changed : list[Report]
+        The reports whose file or module changed since the previous snapshot.
+    removed : list[Report]
+        The reports of the previous snapshot no longer in the directory, with their previous module.
+    """
+
+    def __init__(
+        self: Self,
+        reports: list[Report],
+        added: list[Report],
+        changed: list[Report],
+        removed: list[Report],
+    ) -> None:
+        self.reports: list[Report] = reports
+        self.added: list[Report] = added
+        self.changed: list[Report] = changed
+        self.removed: list[Report] = removed
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the diff by the numbers of reports of each kind."""
+        return f"{self.__class__.__name__}(reports: {len(self.reports)}, added: {len(self.added)}, changed: {len(self.changed)}, removed: {len(self.removed)})"
+
+
+def incremental_scan_dir(  # noqa: PLR0913  the walk options are grouped in `options`, the others select the pool
+    dir: str | Path,
+    snapshot: str | Path,
+    classifier: ReportClassifier | None = None,
+    *,
+    options: WalkOptions | None = None,
+    workers: int = 1,
+    executor: Literal["thread", "process"] = "thread",
+) -> ScanDiff:
+    """
+    Scan a directory, reusing the snapshot of the previous scan, and write the new snapshot.
+
+    The snapshot holds the modification time of every directory walked and the size, modification time, inode and module of every file. A directory whose modification time is unchanged is not listed again, its files are taken from the snapshot and only its reports and the files whose name may be that of a report are stat-ed. Only the new or modified files are classified.
+
+    The snapshot is ignored, and everything is scanned, if it was written for another directory, other walk options, other report patterns or another version of the package.
+
+    Parameters
+    ----------
+    dir : str | Path
+        The directory to scan.
+    snapshot : str | Path
+        The path to the snapshot file, created if missing.
+    classifier : ReportClassifier | None, default None
+        The classifier used to determine the report types. Default is `None`, which means the classifier built from the package report patterns.
+    options : WalkOptions | None, default None
+        The pruning rules of the walk. The `archives` and `num_shards` options are not supported. Default is `None`, which means all the files of the tree.
+    workers : int, default 1
+        The number of workers classifying the new and modified files.
+    executor : Literal["thread", "process"], default "thread"
+        The type of pool used when `workers` is greater than 1.
+
+    Returns
+    -------
+    scan_diff : ScanDiff
+        All the current reports, and the reports added, changed and removed since the previous snapshot.
+    """
+    dir_path: Path = _match.resolve_dir(dir)
+    snapshot_path: Path = Path(snapshot).absolute()
+    if classifier is None:
+        classifier = ReportClassifier.default()
+    if options is None:
+        options = WalkOptions()
+    if options.archives:
+        raise ValueError("archives is not supported by incremental scans.")
+    if options.num_shards > 1:
+        raise ValueError("num_shards is not supported by incremental scans.")
+    snapshot_key: str = f"{__version__}|{str(dir_path)}|{options}|{classifier.digest}"
+    scan_time_ns: int = time.time_ns()
+
+    old_snapshot: dict = _load_snapshot(snapshot_path, snapshot_key)
+    old_dir_dict: dict[str, dict] = old_snapshot.get("dirs", {})
+    new_dir_dict, classify_path_list = _walk_with_snapshot(
+        dir_path, options, classifier, old_snapshot
+    )
+
+    # classify the new and modified files
+    _logger.info(f"Number of files to classify: {len(classify_path_list)}")
+    for report in _match.iter_matches(
+        file_paths=iter(classify_path_list),
+        classifier=classifier,
+        workers=workers,
+        executor=executor,
+    ):
+        rel_path: str = report.path.relative_to(dir_path).as_posix()
+        rel_dir, _, file_name = rel_path.rpartition("/")
+        new_dir_dict[rel_dir]["files"][file_name][3] = list(report.module)
+
+    scan_diff: ScanDiff = _diff_snapshot(dir_path, old_dir_dict, new_dir_dict)
+    _save_snapshot(
+        snapshot_path,
+        {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "key": snapshot_key,
+            "time_ns": scan_time_ns,
+            "dirs": new_dir_dict,
+        },
+    )
+    _logger.info(str(scan_diff))
+    return scan_diff
+
+
+def _walk_with_snapshot(
+    dir_path: Path,
+    options: WalkOptions,
+    classifier: ReportClassifier,
+    old_snapshot: dict,
+) -> tuple[dict[str, dict], list[Path]]:
+    """
+    Walk a directory, reusing the records of the unchanged directories of the previous snapshot.
+
+    Returns
+    -------
+    new_dir_dict : dict[str, dict]
+        The records of the directories by relative path, in walk order. The files to classify have no module yet.
+    classify_path_list : list[Path]
+        The new and modified files to classify.
+    """
+    old_dir_dict: dict[str, dict] = old_snapshot.get("dirs", {})
+    old_scan_time_ns: int = old_snapshot.get("time_ns", 0)
+
+    new_dir_dict: dict[str, dict] = {}
+    classify_path_list: list[Path] = []
+    visited_dir_set: set[tuple[int, int]] = set()
+    dir_stack: list[tuple[DirTask, bool]] = [
+        ((str(dir_path), "", 0, options.exclude_rules), False)
+    ]
+    while len(dir_stack) > 0:
+        dir_task, rules_changed = dir_stack.pop()
+        curr_dir, curr_rel_dir, curr_depth, curr_rules = dir_task
+        try:
+            dir_stat: os.stat_result = os.stat(curr_dir)
+        except OSError as e:
+            _logger.warning(f"Skipping unreadable directory: {curr_dir} ({e})")
+            continue
+        if options.symlinks == "follow":
+            dir_id: tuple[int, int] = (dir_stat.st_dev, dir_stat.st_ino)
+            if dir_id in visited_dir_set:
+                continue
+            visited_dir_set.add(dir_id)
+        ignore_mtime_ns: int | None = _ignore_file_mtime_ns(curr_dir, options.ignore_file)
+
+        old_dir_record: dict | None = old_dir_dict.get(curr_rel_dir)
+        rules_changed = rules_changed or (
+            old_dir_record is not None
+            and old_dir_record["ignore_mtime_ns"] != ignore_mtime_ns
+        )
+        dir_unchanged: bool = (
+            old_dir_record is not None
+            and not rules_changed
+            and old_dir_record["mtime_ns"] == dir_stat.st_mtime_ns
+            and dir_stat.st_mtime_ns < old_scan_time_ns - _RACY_MTIME_NS
+        )
+
+        file_record_dict: dict[str, FileRecord]
+        sub_dir_list: list[DirTask]
+        if dir_unchanged and old_dir_record is not None:
+            file_record_dict = _restat_dir_files(
+                curr_dir, old_dir_record, options, classifier, classify_path_list
+            )
+            sub_dir_rules: list[PathRule] = curr_rules + _walk.read_ignore_rules(
+                curr_dir,
+                curr_rel_dir,
+                options.ignore_file if ignore_mtime_ns is not None else None,
+            )
+            sub_dir_list = [
+                (
+                    os.path.join(curr_dir, sub_dir_name),
+                    _join_rel(curr_rel_dir, sub_dir_name),
+                    curr_depth + 1,
+                    sub_dir_rules,
+                )
+                for sub_dir_name in old_dir_record["subdirs"]
+            ]
+        else:
+            dir_listing = _walk.list_dir(dir_task, options)
+            if dir_listing is None:
+                continue
+            file_entry_list, sub_dir_list = dir_listing
+            file_record_dict = _stat_listed_files(
+                file_entry_list,
+                {} if old_dir_record is None else old_dir_record["files"],
+                classify_path_list,
+            )
+        new_dir_dict[curr_rel_dir] = {
+            "mtime_ns": dir_stat.st_mtime_ns,
+            "ignore_mtime_ns": ignore_mtime_ns,
+            "files": file_record_dict,
+            "subdirs": [t[1].rsplit("/", 1)[-1] for t in sub_dir_list],
+        }
+        # push in reverse so that the subdirectories are walked in name order
+        dir_stack.extend((t, rules_changed) for t in reversed(sub_dir_list))
+    return new_dir_dict, classify_path_list
+
+
+def _diff_snapshot(
+    dir_path: Path,
+    old_dir_dict: dict[str, dict],
+    new_dir_dict: dict[str, dict],
+) -> ScanDiff:
+    """Build the reports of the new snapshot in walk order, the order in which its directories and files were recorded, and compare them with the previous snapshot."""
+    report_list: list[Report] = []
+    added_list: list[Report] = []
+    changed_list: list[Report] = []
+    for rel_dir, file_name, file_record in _iter_file_records(new_dir_dict):
+        report: Report = _record_report(dir_path, rel_dir, file_name, file_record)
+        report_list.append(report)
+        old_dir_record: dict | None = old_dir_dict.get(rel_dir)
+        old_file_record: FileRecord | None = (
+            None if old_dir_record is None else old_dir_record["files"].get(file_name)
+        )
+        if old_file_record is None or len(old_file_record[3]) == 0:
+            added_list.append(report)
+        elif old_file_record != file_record:
+            changed_list.append(report)
+
+    removed_list: list[Report] = []
+    for rel_dir, file_name, old_file_record in _iter_file_records(old_dir_dict):
+        new_dir_record: dict | None = new_dir_dict.get(rel_dir)
+        new_file_record: FileRecord | None = (
+            None if new_dir_record is None else new_dir_record["files"].get(file_name)
+        )
+        if new_file_record is None or len(new_file_record[3]) == 0:
+            removed_list.append(
+                _record_report(dir_path, rel_dir, file_name, old_file_record)
+            )
+
+    scan_diff: ScanDiff = ScanDiff(
+        reports=report_list,
+        added=added_list,
+        changed=changed_list,
+        removed=removed_list,
+    )
+    return scan_diff
+
+
+def _iter_file_records(
+    dir_dict: dict[str, dict],
+) -> Iterator[tuple[str, str, FileRecord]]:
+    """Yield the relative directory, the name and the record of the reports of a snapshot, in walk order."""
+    for rel_dir, dir_record in dir_dict.items():
+        for file_name, file_record in dir_record["files"].items():
+            if len(file_record[3]) > 0:
+                yield rel_dir, file_name, file_record
+
+
+def _restat_dir_files(
+    dir_path: str,
+    dir_record: dict,
+    options: WalkOptions,
+    classifier: ReportClassifier,
+    classify_path_list: list[Path],
+) -> dict[str, FileRecord]:
+    """
+    Take the files of an unchanged directory from its record.
+
+    The reports and the files whose name passes the name checks of a pattern are stat-ed, and queued in `classify_path_list` if they were modified. The other files cannot become reports without being renamed, which changes the directory.
+
+    Returns
+    -------
+    file_record_dict : dict[str, FileRecord]
+        The records of the files by name.
+    """
+    file_record_dict: dict[str, FileRecord] = {}
+    for file_name, file_record in dir_record["files"].items():
+        new_file_record: FileRecord = file_record
+        if len(file_record[3]) > 0 or _is_candidate(file_name, classifier):
+            file_path: str = os.path.join(dir_path, file_name)
+            try:
+                file_stat: os.stat_result = os.stat(file_path)
+            except OSError:
+                continue
+            if (
+                options.max_file_size is not None
+                and file_stat.st_size > options.max_file_size
+            ):
+                continue
+            if not _same_file(file_record, file_stat):
+                new_file_record = _file_record(file_stat)
+                classify_path_list.append(Path(file_path))
+        file_record_dict[file_name] = new_file_record
+    return file_record_dict
+
+
+def _stat_listed_files(
+    file_entries: list[os.DirEntry],
+    old_file_record_dict: dict[str, FileRecord],
+    classify_path_list: list[Path],
+) -> dict[str, FileRecord]:
+    """Stat the files of a listed directory, and queue the new and modified ones in `classify_path_list`. Return the records of the files by name."""
+    file_record_dict: dict[str, FileRecord] = {}
+    for entry in file_entries:
+        try:
+            file_stat: os.stat_result = entry.stat()
+        except OSError:
+            continue
+        old_file_record: FileRecord | None = old_file_record_dict.get(entry.name)
+        if old_file_record is not None and _same_file(old_file_record, file_stat):
+            file_record_dict[entry.name] = old_file_record
+        else:
+            file_record_dict[entry.name] = _file_record(file_stat)
+            classify_path_list.append(Path(entry.path))
+    return file_record_dict
+
+
+def _is_candidate(file_name: str, classifier: ReportClassifier) -> bool:
+    """Check whether a file name passes the name checks of a pattern, the compression suffix being ignored as in `ReportClassifier.classify`."""
+    return len(classifier.candidates(split_compression_suffix(file_name)[0])) > 0
+
+
+def _load_snapshot(snapshot_path: Path, snapshot_key: str) -> dict:
+    """Load a snapshot, `{}` if it is missing, unreadable or written for another scan."""
+    try:
+        with open(snapshot_path, "r") as f:
+            snapshot: dict = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        _logger.warning(f"Ignoring unreadable snapshot: {snapshot_path} ({e})")
+        return {}
+    if (
+        snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION
+        or snapshot.get("key") != snapshot_key
+    ):
+        _logger.info(f"Ignoring snapshot of another scan: {snapshot_path}")
+        return {}
+    return snapshot
+
+
+def _save_snapshot(snapshot_path: Path, snapshot: dict) -> None:
+    """Write a snapshot atomically, readers never see a partial file."""
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path: Path = snapshot_path.with_name(f".{snapshot_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(tmp_path, snapshot_path)
+
+
+def _ignore_file_mtime_ns(dir_path: str, ignore_file: str | None) -> int | None:
+    """Return the modification time of the ignore file of a directory, `None` if there is none."""
+    if ignore_file is None:
+        return None
+    try:
+        return os.stat(os.path.join(dir_path, ignore_file)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _file_record(file_stat: os.stat_result) -> FileRecord:
+    """Build the record of a file not classified yet."""
+    return [file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino, []]
+
+
+def _same_file(file_record: FileRecord, file_stat: os.stat_result) -> bool:
+    """Check a file record against the current stat of the file."""
+    return file_record[:3] == [
+        file_stat.st_size,
+        file_stat.st_mtime_ns,
+        file_stat.st_ino,
+    ]
+
+
+def _join_rel(rel_dir: str, name: str) -> str:
+    return name if rel_dir == "" else f"{rel_dir}/{name}"
+
+
+def _record_report(
+    dir_path: Path, rel_dir: str, file_name: str, file_record: FileRecord
+) -> Report:
+    """Build a report from its record, with the fingerprint of the record."""
+    report: Report = Report(
+        path=dir_path.joinpath(*rel_dir.split("/"), file_name)
+        if rel_dir != ""
+        else dir_path / file_name,
+        module=tuple(file_record[3]),
+    )
+    report.fingerprint = (report.module, *file_record[:3])
+    return report
@@ -0,0 +1,566 @@
+"""
+Opt-in statistics of scans and parses.
+
+The statistics are collected only inside `collect_stats`, which sets the collector of the current context. The instrumented functions, i.e. `scan_dir`, `Report.match_file`, `Report.parse` and the parsers reading files with `Report.open`, record into it. Tasks run in thread pools record into the same collector, tasks run in process pools record into a collector of their own, merged when their results are read::
+
+    with bioreport.collect_stats(top_n=20) as scan_stats:
+        report_list = bioreport.scan_dir("/path/to/report/dir", workers=8)
+        batch_result = bioreport.parse_all(report_list, workers=8)
+    print(scan_stats.to_dict())
+"""
+
+import bisect
+import heapq
+import itertools
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import IO, Any, Callable, Iterable, Iterator, Literal, Self
+
+# upper bounds of the buckets of the duration histograms in seconds, the last bucket is unbounded
+HISTOGRAM_BOUNDS: tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+StatsHook = Callable[[str, dict[str, Any]], None]
+
+_current_stats: ContextVar["ScanStats | None"] = ContextVar(
+    "bioreport_stats", default=None
+)
+
+
+class DurationHistogram:
+    """
+    A histogram of durations, with the buckets of `HISTOGRAM_BOUNDS`.
+
+    Attributes
+    ----------
+    counts : list[int]
+        The number of durations of each bucket. The last bucket holds the durations greater than the last bound.
+    count : int
+        The number of durations.
+    total_seconds : float
+        The sum of the durations.
+    max_seconds : float
+        The longest duration.
+
+    Methods
+    -------
+    add(seconds: float) -> None
+        Add a duration.
+    merge(other: DurationHistogram) -> None
+        Add the durations of another histogram.
+    to_dict() -> dict[str, Any]
+        The histogram as plain data.
+    """
+
+    def __init__(self: Self) -> None:
+        self.counts: list[int] = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.count: int = 0
+        self.total_seconds: float = 0.0
+        self.max_seconds: float = 0.0
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the histogram by its count and total time."""
+        return f"{self.__class__.__name__}(count: {self.count}, total_seconds: {self.total_seconds:.3f})"
+
+    @property
+    def mean_seconds(self: Self) -> float:
+        """
+        The mean duration.
+
+        Returns
+        -------
+        mean_seconds : float
+            The mean duration, `0.0` if there is none.
+        """
+        return self.total_seconds / self.count if self.count > 0 else 0.0
+
+    def add(self: Self, seconds: float) -> None:
+        """
+        Add a duration.
+
+        Parameters
+        ----------
+        seconds : float
+            The duration.
+        """
+        self.counts[bisect.bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def merge(self: Self, other: "DurationHistogram") -> None:
+        """
+        Add the durations of another histogram.
+
+        Parameters
+        ----------
+        other : DurationHistogram
+            The other histogram.
+        """
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_seconds += other.total_seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+
+    def to_dict(self: Self) -> dict[str, Any]:
+        """
+        Return the histogram as plain data.
+
+        Returns
+        -------
+        histogram_dict : dict[str, Any]
+            The bucket bounds, `None` for the unbounded one, with their counts, and the count, total, mean and max of the durations.
+        """
+        return {
+            "buckets": [
+                {"le": bound, "count": count}
+                for bound, count in zip((*HISTOGRAM_BOUNDS, None), self.counts)
+            ],
+            "count": self.count,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.mean_seconds,
+            "max_seconds": self.max_seconds,
+        }
+
+
+class ScanStats:
+    """
+    Statistics of scans and parses. Safe to update from several threads.
+
+    Attributes
+    ----------
+    top_n : int
+        The number of slowest files kept.
+    hooks : list[Callable[[str, dict[str, Any]], None]]
+        Functions called with the name and the fields of each event: "match" when a file is classified, "parse" when a report is parsed and "stage" when `scan_dir` or `parse_all` ends. Hooks are called in the thread recording the event, or reading the results of a process pool.
+    dirs_walked : int
+        The number of directories listed.
+    files_walked : int
+        The number of files yielded by the walks.
+    files_matched : int
+        The number of files classified.
+    files_opened : int
+        The number of files opened, to read their header or to parse them.
+    bytes_read : int
+        The number of bytes read from the opened files.
+    name_checks : int
+        The number of report patterns checked against a file name.
+    content_checks : int
+        The number of report patterns checked against the header of a file.
+    reports_parsed : int
+        The number of reports parsed.
+    stage_seconds : dict[str, float]
+        The time spent listing directories ("walk"), classifying files ("match"), of which reading their header ("sniff"), and parsing reports ("parse"), summed over the files and the threads. "scan_dir" and "parse_all" are the wall times of those calls.
+    parse_histograms : dict[tuple[str, ...], DurationHistogram]
+        The parse times of each module.
+
+    Methods
+    -------
+    slowest(stage: Literal["match", "parse"]) -> list[tuple[float, str, tuple[str, ...]]]
+        The slowest files to classify or to parse.
+    merge(other: ScanStats) -> None
+        Add the statistics of another collector.
+    to_dict() -> dict[str, Any]
+        The statistics as plain data.
+    """
+
+    def __init__(
+        self: Self,
+        *,
+        top_n: int = 10,
+        hooks: Iterable[StatsHook] = (),
+        keep_events: bool = False,
+    ) -> None:
+        """
+        Create a collector.
+
+        Parameters
+        ----------
+        top_n : int, default 10
+            The number of slowest files kept.
+        hooks : Iterable[Callable[[str, dict[str, Any]], None]], default ()
+            Functions called with the name and the fields of each event.
+        keep_events : bool, default False
+            Keep the events, to be passed to the hooks of the collector this one is merged into. Used in process pool workers.
+        """
+        if top_n < 0:
+            raise ValueError(f"top_n must be a non-negative integer: {top_n}")
+        self.top_n: int = top_n
+        self.hooks: list[StatsHook] = list(hooks)
+        self.dirs_walked: int = 0
+        self.files_walked: int = 0
+        self.files_matched: int = 0
+        self.files_opened: int = 0
+        self.bytes_read: int = 0
+        self.name_checks: int = 0
+        self.content_checks: int = 0
+        self.reports_parsed: int = 0
+        self.stage_seconds: dict[str, float] = {}
+        self.parse_histograms: dict[tuple[str, ...], DurationHistogram] = {}
+        self._slowest_heap_dict: dict[str, list[tuple[float, int, str, tuple[str, ...]]]] = {
+            "match": [],
+            "parse": [],
+        }
+        self._event_list: list[tuple[str, dict[str, Any]]] | None = (
+            [] if keep_events else None
+        )
+        self._lock: threading.Lock = threading.Lock()
+        self._order_counter: Iterator[int] = itertools.count()
+
+    def __repr__(self: Self) -> str:
+        """Return the representation of the statistics by their main counters."""
+        return f"{self.__class__.__name__}(files walked: {self.files_walked}, files opened: {self.files_opened}, reports parsed: {self.reports_parsed})"
+
+    def __getstate__(self: Self) -> dict[str, Any]:
+        """Return the state sent to and from process pool workers, without the hooks, the lock and the counter."""
+        state: dict[str, Any] = self.__dict__.copy()
+        for key in ("hooks", "_lock", "_order_counter"):
+            del state[key]
+        return state
+
+    def __setstate__(self: Self, state: dict[str, Any]) -> None:
+        """Restore the state, with no hook and a new lock and counter."""
+        self.__dict__.update(state)
+        self.hooks = []
+        self._lock = threading.Lock()
+        self._order_counter = itertools.count()
+
+    def record_dir(self: Self, file_num: int, seconds: float) -> None:
+        """Record a directory listed and the number of its files to walk."""
+        with self._lock:
+            self.dirs_walked += 1
+            self.files_walked += file_num
+            self._add_seconds("walk", seconds)
+
+    def record_read(self: Self, byte_num: int) -> None:
+        """Record a file opened and the number of bytes read from it."""
+        with self._lock:
+            self.files_opened += 1
+            self.bytes_read += byte_num
+
+    def record_match(
+        self: Self,
+        path: str,
+        module: tuple[str, ...],
+        seconds: float,
+        sniff_seconds: float = 0.0,
+        *,
+        checks: tuple[int, int] = (0, 0),
+    ) -> None:
+        """Record a file classified, the part of the time spent reading its header, and the numbers of name checks and content checks run on it."""
+        name_checks, content_checks = checks
+        with self._lock:
+            self.files_matched += 1
+            self.name_checks += name_checks
+            self.content_checks += content_checks
+            self._add_seconds("match", seconds)
+            self._add_seconds("sniff", sniff_seconds)
+            self._push_slowest("match", seconds, path, module)
+        self._emit(
+            "match",
+            {
+                "path": path,
+                "module": module,
+                "seconds": seconds,
+                "name_checks": name_checks,
+                "content_checks": content_checks,
+                "sniff_seconds": sniff_seconds,
+            },
+        )
+
+    def record_parse(self: Self, path: str, module: tuple[str, ...], seconds: float) -> None:
+        """Record a report parsed."""
+        with self._lock:
+            self.reports_parsed += 1
+            self._add_seconds("parse", seconds)
+            histogram: DurationHistogram | None = self.parse_histograms.get(module)
+            if histogram is None:
+                histogram = DurationHistogram()
+                self.parse_histograms[module] = histogram
+            histogram.add(seconds)
+            self._push_slowest("parse", seconds, path, module)
+        self._emit("parse", {"path": path, "module": module, "seconds": seconds})
+
+    def record_stage(self: Self, stage: str, seconds: float) -> None:
+        """Record the wall time of a call, i.e. "scan_dir"."""
+        with self._lock:
+            self._add_seconds(stage, seconds)
+        self._emit("stage", {"stage": stage, "seconds": seconds})
+
+    def slowest(self: Self, stage: Literal["match", "parse"]) -> list[tuple[float, str, tuple[str, ...]]]:
+        """
+        Return the slowest files to classify or to parse.
+
+        Parameters
+        ----------
+        stage : Literal["match", "parse"]
+            The stage.
+
+        Returns
+        -------
+        slowest_list : list[tuple[float, str, tuple[str, ...]]]
+            Up to `top_n` files as `(seconds, path, module)`, the slowest first.
+        """
+        if stage not in self._slowest_heap_dict:
+            raise ValueError(f"Invalid stage: {stage}")
+        with self._lock:
+            heap: list[tuple[float, int, str, tuple[str, ...]]] = list(
+                self._slowest_heap_dict[stage]
+            )
+        return [
+            (seconds, path, module)
+            for seconds, _, path, module in sorted(heap, reverse=True)
+        ]
+
+    def merge(self: Self, other: "ScanStats") -> None:
+        """
+        Add the statistics of another collector. Its kept events are passed to the hooks.
+
+        Parameters
+        ----------
+        other : ScanStats
+            The other collector, i.e. of a process pool worker.
+        """
+        with self._lock:
+            for name in (
+                "dirs_walked",
+                "files_walked",
+                "files_matched",
+                "files_opened",
+                "bytes_read",
+                "name_checks",
+                "content_checks",
+                "reports_parsed",
+            ):
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+            for stage, seconds in other.stage_seconds.items():
+                self._add_seconds(stage, seconds)
+            for module, histogram in other.parse_histograms.items():
+                self.parse_histograms.setdefault(module, DurationHistogram()).merge(
+                    histogram
+                )
+            for stage, heap in other._slowest_heap_dict.items():
+                for seconds, _, path, module in heap:
+                    self._push_slowest(stage, seconds, path, module)
+        for event, fields in other._event_list or []:
+            self._emit(event, fields)
+
+    def to_dict(self: Self) -> dict[str, Any]:
+        """
+        Return the statistics as plain data, i.e. to be serialized to JSON.
+
+        Returns
+        -------
+        stats_dict : dict[str, Any]
+            The counters, the stage times, the parse time histogram of each module, keyed by the module joined with "-", and the slowest files of each stage.
+        """
+        with self._lock:
+            stats_dict: dict[str, Any] = {
+                "dirs_walked": self.dirs_walked,
+                "files_walked": self.files_walked,
+                "files_matched": self.files_matched,
+                "files_opened": self.files_opened,
+                "bytes_read": self.bytes_read,
+                "name_checks": self.name_checks,
+                "content_checks": self.content_checks,
+                "reports_parsed": self.reports_parsed,
+                "stage_seconds": dict(self.stage_seconds),
+                "parse_histograms": {
+                    "-".join(module): histogram.to_dict()
+                    for module, histogram in self.parse_histograms.items()
+                },
+            }
+        stats_dict["slowest"] = {
+            stage: [
+                {"seconds": seconds, "path": path, "module": "-".join(module)}
+                for seconds, path, module in self.slowest(stage)
+            ]
+            for stage in self._slowest_heap_dict
+        }
+        return stats_dict
+
+    def _add_seconds(self: Self, stage: str, seconds: float) -> None:
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def _push_slowest(
+        self: Self, stage: str, seconds: float, path: str, module: tuple[str, ...]
+    ) -> None:
+        if self.top_n == 0:
+            return
+        heap: list[tuple[float, int, str, tuple[str, ...]]] = self._slowest_heap_dict[stage]
+        # the counter breaks the ties, so that paths and modules are never compared
+        item: tuple[float, int, str, tuple[str, ...]] = (
+            seconds,
+            next(self._order_counter),
+            path,
+            module,
+        )
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, item)
+        elif seconds > heap[0][0]:
+            heapq.heapreplace(heap, item)
+
+    def _emit(self: Self, event: str, fields: dict[str, Any]) -> None:
+        if self._event_list is not None:
+            with self._lock:
+                self._event_list.append((event, fields))
+        for hook in self.hooks:
+            hook(event, fields)
+
+
+@contextmanager
+def collect_stats(
+    stats: ScanStats | None = None,
+    *,
+    top_n: int = 10,
+    hooks: Iterable[StatsHook] = (),
+) -> Iterator[ScanStats]:
+    """
+    Collect the statistics of the scans and parses run in the block.
+
+    Parameters
+    ----------
+    stats : ScanStats | None, default None
+        The collector, i.e. to add to the statistics of a previous block. Default is `None`, which means a new collector.
+    top_n : int, default 10
+        The number of slowest files kept by a new collector.
+    hooks : Iterable[Callable[[str, dict[str, Any]], None]], default ()
+        Functions called with the name and the fields of each event, added to a new collector. See `ScanStats`.
+
+    Yields
+    ------
+    stats : ScanStats
+        The collector.
+    """
+    if stats is None:
+        stats = ScanStats(top_n=top_n, hooks=hooks)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def current_stats() -> ScanStats | None:
+    """
+    Return the collector of the current context.
+
+    Returns
+    -------
+    stats : ScanStats | None
+        The collector, `None` outside `collect_stats`.
+    """
+    return _current_stats.get()
+
+
+def record_file_read(file: IO) -> None:
+    """Record a file opened into the current collector, with the number of bytes read from the operating system so far."""
+    stats: ScanStats | None = _current_stats.get()
+    if stats is None:
+        return
+    raw: Any = file
+    # i.e. TextIOWrapper -> BufferedReader -> FileIO, whose position is the number of bytes read
+    while hasattr(raw, "buffer") or hasattr(raw, "raw"):
+        raw = raw.buffer if hasattr(raw, "buffer") else raw.raw
+    try:
+        byte_num: int = raw.tell()
+    except (OSError, ValueError):
+        byte_num = 0
+    stats.record_read(byte_num)
+
+
+def submit_with_stats(pool: Executor, function: Callable[..., Any], *args: Any) -> Future:
+    """
+    Submit a task to a pool, collecting its statistics into the current collector.
+
+    In a thread pool, the task records into the current collector. In a process pool, it records into a new collector, merged into the current one when the result of the task is read. Its events are passed to the hooks of the current collector at the merge, and are not kept if the collector has no hook when the task is submitted.
+
+    Parameters
+    ----------
+    pool : Executor
+        The pool.
+    function : Callable[..., Any]
+        The task.
+    *args : Any
+        The arguments of the task.
+
+    Returns
+    -------
+    future : Future
+        The future of the result of the task.
+    """
+    stats: ScanStats | None = _current_stats.get()
+    if stats is None:
+        return pool.submit(function, *args)
+    if isinstance(pool, ProcessPoolExecutor):
+        # the events of the task are only sent back if there is a hook to pass them to
+        return _MergingFuture(
+            pool.submit(
+                _run_collecting, stats.top_n, len(stats.hooks) > 0, function, *args
+            ),
+            stats,
+        )
+    return pool.submit(_run_with, stats, function, *args)
+
+
+def _run_with(stats: ScanStats, function: Callable[..., Any], *args: Any) -> Any:
+    """Run a task of a thread pool with the collector of the submitting thread."""
+    token = _current_stats.set(stats)
+    try:
+        return function(*args)
+    finally:
+        _current_stats.reset(token)
+
+
+def _run_collecting(
+    top_n: int, keep_events: bool, function: Callable[..., Any], *args: Any
+) -> tuple[Any, ScanStats]:
+    """Run a task of a process pool with a collector of its own, returned with the result and the events if `keep_events`."""
+    worker_stats: ScanStats = ScanStats(top_n=top_n, keep_events=keep_events)
+    return _run_with(worker_stats, function, *args), worker_stats
+
+
+class _MergingFuture(Future):
+    """The future of a process pool task, merging the statistics of the task when its result is read."""
+
+    def __init__(self: Self, future: Future, stats: ScanStats) -> None:
+        super().__init__()
+        self._future: Future = future
+        self._stats: ScanStats = stats
+        self._merged: bool = False
+        self._merge_lock: threading.Lock = threading.Lock()
+
+    def cancel(self: Self) -> bool:
+        return self._future.cancel()
+
+    def cancelled(self: Self) -> bool:
+        return self._future.cancelled()
+
+    def done(self: Self) -> bool:
+        return self._future.done()
+
+    def result(self: Self, timeout: float | None = None) -> Any:
+        result, worker_stats = self._future.result(timeout)
+        with self._merge_lock:
+            if not self._merged:
+                self._merged = True
+                self._stats.merge(worker_stats)
+        return result
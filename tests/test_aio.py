@@ -0,0 +1,103 @@
+"""Tests of the asyncio API."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from bioreport import (
+    BatchParseResult,
+    Report,
+    ReportSum,
+    WalkOptions,
+    aparse_all,
+    ascan_dir,
+    parse_all,
+    scan_dir,
+)
+
+BOWTIE2_UNPAIRED_LOG: str = """{read_num} reads; of these:
+  {read_num} (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+MBIAS_MALFORMED_REPORT: str = """CpG context (R1)
+================
+position\tcount methylated\tcount unmethylated\t% methylation\tcoverage
+1\t80\t20\t80.00\t100
+2\t30\t10
+"""
+DIR_NAMES: tuple[str, ...] = ("b", "a", "a/d", "a/c", "a/c/e")
+FILES_PER_DIR: int = 7
+CONCURRENCY: int = 2  # fewer workers than files per directory, so that the queue fills up
+FAILED_INDEXES: tuple[int, ...] = (2, 5)
+
+
+def _make_tree(root: Path) -> None:
+    """Write bowtie2 logs and files that are not reports in nested directories, created out of name order."""
+    read_num: int = 10000
+    for dir_name in DIR_NAMES:
+        (root / dir_name).mkdir(parents=True)
+        for index in range(FILES_PER_DIR):
+            read_num += 1
+            (root / dir_name / f"s{index}.log").write_text(
+                BOWTIE2_UNPAIRED_LOG.format(read_num=read_num)
+            )
+        (root / dir_name / "run.sh").write_text("echo done\n")
+    (root / "z.log").write_text(BOWTIE2_UNPAIRED_LOG.format(read_num=1))
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        None,
+        WalkOptions(exclude=["d/"], max_depth=2),
+        WalkOptions(shard=1, num_shards=3),
+    ],
+)
+def test_ascan_dir_order(tmp_path: Path, options: WalkOptions | None) -> None:
+    """Test that `ascan_dir` finds the reports of `scan_dir`, in the same order."""
+    _make_tree(tmp_path)
+
+    report_list: list[Report] = asyncio.run(
+        ascan_dir(tmp_path, options=options, concurrency=CONCURRENCY)
+    )
+
+    assert report_list == scan_dir(tmp_path, options=options)
+    assert len(report_list) > 0
+
+
+def test_aparse(tmp_path: Path) -> None:
+    """Test that `Report.aparse` returns the summary of `Report.parse`, with the keyword arguments of `parse`."""
+    _make_tree(tmp_path)
+    report: Report = Report.match_file(tmp_path / "z.log")
+
+    report_sum: ReportSum = asyncio.run(report.aparse(name="sample"))
+
+    assert report_sum.name == "sample"
+    assert report_sum.data.equals(report.parse().data)
+
+
+def test_aparse_all_order_and_failures(tmp_path: Path) -> None:
+    """Test that `aparse_all` returns the results of `parse_all`, in input order, the failures with their index in the input."""
+    _make_tree(tmp_path)
+    report_list: list[Report] = scan_dir(tmp_path)
+    for index in FAILED_INDEXES:
+        failed_path: Path = tmp_path / f"s{index}.M-bias.txt"
+        failed_path.write_text(MBIAS_MALFORMED_REPORT)
+        report_list.insert(index, Report.match_file(failed_path))
+
+    batch_parse_result: BatchParseResult = asyncio.run(
+        aparse_all(report_list, concurrency=CONCURRENCY)
+    )
+    expected_result: BatchParseResult = parse_all(report_list)
+
+    assert [r.data["reads"] for r in batch_parse_result.report_sums] == [
+        r.data["reads"] for r in expected_result.report_sums
+    ]
+    assert [f.index for f in batch_parse_result.failures] == list(FAILED_INDEXES)
+    assert [f.report for f in batch_parse_result.failures] == [
+        report_list[index] for index in FAILED_INDEXES
+    ]
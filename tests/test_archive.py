@@ -0,0 +1,100 @@
+"""Tests of the reading of archive members."""
+
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bioreport import Report, WalkOptions, scan_dir
+from bioreport._archive import open_member
+
+ARCHIVE_SUFFIXES: tuple[str, ...] = (".tar", ".zip", ".tar.gz")
+ARCHIVE_NUM: int = 6  # more than the archives kept open
+MEMBER_NUM: int = 10
+
+
+def _member_text(index: int) -> str:
+    """Return a bowtie2 log told apart by its number of reads."""
+    return f"""{10000 + index} reads; of these:
+  {10000 + index} (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+
+
+def _make_archives(root: Path) -> dict[str, str]:
+    """Write archives of the same members in every format, and return the text of each member."""
+    member_dir: Path = root / "members"
+    member_dir.mkdir()
+    text_dict: dict[str, str] = {}
+    for index in range(MEMBER_NUM):
+        text_dict[f"s{index}.log"] = _member_text(index)
+        (member_dir / f"s{index}.log").write_text(text_dict[f"s{index}.log"])
+    archive_dir: Path = root / "archives"
+    archive_dir.mkdir()
+    for archive_index in range(ARCHIVE_NUM):
+        suffix: str = ARCHIVE_SUFFIXES[archive_index % len(ARCHIVE_SUFFIXES)]
+        archive_path: Path = archive_dir / f"a{archive_index}{suffix}"
+        if suffix == ".zip":
+            with zipfile.ZipFile(archive_path, "w") as zip_file:
+                for member in text_dict:
+                    zip_file.write(member_dir / member, member)
+        else:
+            with tarfile.open(archive_path, "w:gz" if suffix == ".tar.gz" else "w") as tar_file:
+                for member in text_dict:
+                    tar_file.add(member_dir / member, member)
+    return text_dict
+
+
+def _read_member(report: Report) -> str:
+    """Read a member in small chunks, so that the reads of other threads come in between."""
+    assert report.member is not None
+    chunk_list: list[bytes] = []
+    with open_member(report.path, report.member) as member_file:
+        while chunk := member_file.read(37):
+            chunk_list.append(chunk)
+    return b"".join(chunk_list).decode()
+
+
+def test_concurrent_member_reads(tmp_path: Path) -> None:
+    """Test that the members of the same archives read by many threads at once are not mixed."""
+    text_dict: dict[str, str] = _make_archives(tmp_path)
+    report_list: list[Report] = scan_dir(
+        tmp_path / "archives", options=WalkOptions(archives=True)
+    )
+    assert len(report_list) == ARCHIVE_NUM * MEMBER_NUM
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        text_list: list[str] = list(pool.map(_read_member, report_list * 3))
+
+    assert text_list == [text_dict[r.member] for r in report_list * 3]
+
+
+def test_tar_member_seek(tmp_path: Path) -> None:
+    """Test that a member of an uncompressed tar can seek."""
+    text_dict: dict[str, str] = _make_archives(tmp_path)
+
+    with open_member(tmp_path / "archives" / "a0.tar", "s3.log") as member_file:
+        member_file.seek(6)
+        tail: bytes = member_file.read()
+        member_file.seek(0)
+        head: bytes = member_file.read(6)
+
+    assert (head + tail).decode() == text_dict["s3.log"]
+
+
+def test_tar_members_open_together(tmp_path: Path) -> None:
+    """Test that a member of an uncompressed tar is read while another member of the archive is open."""
+    text_dict: dict[str, str] = _make_archives(tmp_path)
+    archive_path: Path = tmp_path / "archives" / "a0.tar"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with open_member(archive_path, "s1.log") as member_file:
+            second_text: str = pool.submit(
+                _read_member, Report(path=archive_path, member="s2.log")
+            ).result(timeout=10)
+            first_text: str = member_file.read().decode()
+
+    assert [first_text, second_text] == [text_dict["s1.log"], text_dict["s2.log"]]
@@ -0,0 +1,89 @@
+"""Tests of the batch parsing of reports."""
+
+from pathlib import Path
+
+import pytest
+
+from bioreport import (
+    BatchParseResult,
+    ParseCache,
+    ParseFailure,
+    Report,
+    iter_parse_all,
+    parse_all,
+)
+
+BOWTIE2_UNPAIRED_LOG: str = """{read_num} reads; of these:
+  {read_num} (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+MBIAS_MALFORMED_REPORT: str = """CpG context (R1)
+================
+position\tcount methylated\tcount unmethylated\t% methylation\tcoverage
+1\t80\t20\t80.00\t100
+2\t30\t10
+"""
+REPORT_NUM: int = 12
+FAILED_INDEXES: tuple[int, ...] = (3, 8)
+
+
+def _make_reports(dir_path: Path) -> list[Report]:
+    """Write bowtie2 logs told apart by their number of reads, with malformed M-bias reports in between."""
+    report_list: list[Report] = []
+    for index in range(REPORT_NUM):
+        if index in FAILED_INDEXES:
+            report_path: Path = dir_path / f"s{index}.M-bias.txt"
+            report_path.write_text(MBIAS_MALFORMED_REPORT)
+        else:
+            report_path = dir_path / f"s{index}.log"
+            report_path.write_text(BOWTIE2_UNPAIRED_LOG.format(read_num=10000 + index))
+        report_list.append(Report.match_file(report_path))
+    return report_list
+
+
+def _read_nums(report_list: list[Report]) -> list[str]:
+    """Return the number of reads of the reports expected to be parsed, in input order."""
+    return [
+        str(10000 + index)
+        for index in range(len(report_list))
+        if index not in FAILED_INDEXES
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_all_order_and_failures(tmp_path: Path, workers: int) -> None:
+    """Test that the parsed reports and the failures are in input order, the failures with their index in the input."""
+    report_list: list[Report] = _make_reports(tmp_path)
+
+    batch_parse_result: BatchParseResult = parse_all(report_list, workers=workers)
+
+    assert [r.data["reads"] for r in batch_parse_result.report_sums] == _read_nums(report_list)
+    assert [f.index for f in batch_parse_result.failures] == list(FAILED_INDEXES)
+    assert [f.report for f in batch_parse_result.failures] == [
+        report_list[index] for index in FAILED_INDEXES
+    ]
+    assert {f.exc_type for f in batch_parse_result.failures} == {"ValueError"}
+    assert not batch_parse_result.ok
+
+
+def test_iter_parse_all_with_cache(tmp_path: Path) -> None:
+    """Test that the results read from a cache are yielded in input order, and that the failures are not cached."""
+    report_list: list[Report] = _make_reports(tmp_path)
+    cache_path: Path = tmp_path / "cache.sqlite"
+    cache: ParseCache = ParseCache(cache_path)
+    first_result_list: list = list(iter_parse_all(report_list, workers=2, cache=cache))
+    cache.close()
+    cache = ParseCache(cache_path)
+    second_result_list: list = list(iter_parse_all(report_list, cache=cache))
+    cache.close()
+
+    for result_list in (first_result_list, second_result_list):
+        assert [isinstance(r, ParseFailure) for r in result_list] == [
+            index in FAILED_INDEXES for index in range(REPORT_NUM)
+        ]
+        assert [
+            r.data["reads"] for r in result_list if not isinstance(r, ParseFailure)
+        ] == _read_nums(report_list)
@@ -0,0 +1,60 @@
+"""Tests of the bismark M-bias reports."""
+
+import math
+from pathlib import Path
+
+import pytest
+
+from bioreport import Report
+
+MBIAS_REPORT: str = """CpG context (R1)
+================
+position\tcount methylated\tcount unmethylated\t% methylation\tcoverage
+1\t80\t20\t80.00\t100
+2\t0\t0\t\t0
+3\t30\t10\t75.00\t40
+
+CHG context (R1)
+================
+position\tcount methylated\tcount unmethylated\t% methylation\tcoverage
+1\t1\t99\t1.00\t100
+2\t0\t50\t0.00\t50
+3\t2\t48\t4.00\t50
+
+"""
+
+
+def _write_mbias(dir_path: Path, content: str) -> Report:
+    """Write an M-bias report and match it."""
+    report_path: Path = dir_path / "sample.M-bias.txt"
+    report_path.write_text(content)
+    report: Report = Report.match_file(report_path)
+    assert report.module == ("bismark", "mbias")
+    return report
+
+
+def test_mbias_empty_field(tmp_path: Path) -> None:
+    """Test that the empty methylation percentage of a position without calls is `NaN`."""
+    report: Report = _write_mbias(tmp_path, MBIAS_REPORT)
+
+    report_sum = report.parse(arrays=True)
+    cpg_df = report_sum.arrays[("CpG", "R1")]
+
+    assert cpg_df.index.tolist() == [1, 2, 3]
+    assert cpg_df["count methylated"].tolist() == [80.0, 0.0, 30.0]
+    assert math.isnan(cpg_df.loc[2, "% methylation"])
+    assert [
+        report_sum.data[("CpG", "R1", "count methylated")],
+        report_sum.data[("CpG", "R1", "count unmethylated")],
+        report_sum.data[("CHG", "R1", "% methylation")],
+    ] == [110, 30, 1.5]
+
+
+def test_mbias_malformed_row(tmp_path: Path) -> None:
+    """Test that a row without all the fields of the header is rejected."""
+    report: Report = _write_mbias(
+        tmp_path, MBIAS_REPORT.replace("3\t30\t10\t75.00\t40", "3\t30\t10")
+    )
+
+    with pytest.raises(ValueError, match="3 fields instead of 5"):
+        report.parse()
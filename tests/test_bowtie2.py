@@ -0,0 +1,96 @@
+"""Tests of the extraction of the bowtie2 summaries embedded in a log."""
+
+import gzip
+import time
+from pathlib import Path
+
+from bioreport import Report
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+BOWTIE2_PAIRED_LOG: str = """20000 reads; of these:
+  20000 (100.00%) were paired; of these:
+    1200 (6.00%) aligned concordantly 0 times
+    16000 (80.00%) aligned concordantly exactly 1 time
+    2800 (14.00%) aligned concordantly >1 times
+    ----
+    1200 pairs aligned concordantly 0 times; of these:
+      100 (8.33%) aligned discordantly 1 time
+    ----
+    1100 pairs aligned 0 times concordantly or discordantly; of these:
+      2200 mates make up the pairs; of these:
+        1000 (45.45%) aligned 0 times
+        900 (40.91%) aligned exactly 1 time
+        300 (13.64%) aligned >1 times
+97.50% overall alignment rate
+"""
+MAX_SECONDS: float = 1.0
+
+
+def _log_text(noise: str = "") -> str:
+    """Return a pipeline log with an unpaired and a paired summary, and a paired summary killed before its last line."""
+    cut_summary: str = BOWTIE2_PAIRED_LOG.rsplit("\n", 2)[0] + "\n"
+    return (
+        f"[main] aligning sample A\n{noise}{BOWTIE2_UNPAIRED_LOG}"
+        f"Warning: skipping read 'r1' because it was < 2 characters long\n"
+        f"  an indented line of the pipeline\n{BOWTIE2_PAIRED_LOG}{noise}"
+        f"[main] aligning sample C\n{cut_summary}"
+        f"[main] aligning sample D\n{BOWTIE2_UNPAIRED_LOG.replace('10000', '30000')}"
+    )
+
+
+def _write(path: Path, text: str) -> Path:
+    """Write a text file and return its path."""
+    path.write_text(text)
+    return path
+
+
+def test_extract_summaries(tmp_path: Path) -> None:
+    """Test that every whole summary of a mapped log is extracted in order, without the noise and the summary cut off."""
+    log_path: Path = tmp_path / "align.log"
+    log_path.write_text(_log_text(noise="   \n\t noise\n"))
+
+    report_sum_list = Report(path=log_path, module=("bowtie2",)).extract()
+
+    assert [r.module for r in report_sum_list] == [
+        ("bowtie2", "unpaired"),
+        ("bowtie2", "paired"),
+        ("bowtie2", "unpaired"),
+    ]
+    assert [r.name for r in report_sum_list] == ["align.log#1", "align.log#2", "align.log#3"]
+    assert [r.data["reads"] for r in report_sum_list] == ["10000", "20000", "30000"]
+    assert report_sum_list[1].data["percent overall alignment rate"] == "97.50"
+    assert report_sum_list[0].data.to_dict() == Report.match_file(
+        _write(tmp_path / "sample.log", BOWTIE2_UNPAIRED_LOG)
+    ).parse().data.to_dict()
+
+
+def test_extract_compressed_log(tmp_path: Path) -> None:
+    """Test that the summaries of a compressed log, read into memory, are those of the mapped log."""
+    log_path: Path = _write(tmp_path / "align.log", _log_text())
+    gzip_path: Path = tmp_path / "align.log.gz"
+    gzip_path.write_bytes(gzip.compress(log_path.read_bytes()))
+
+    mapped_list = Report(path=log_path, module=("bowtie2",)).extract(name="log")
+    read_list = Report(path=gzip_path, module=("bowtie2",)).extract(name="log")
+
+    assert [r.data.to_dict() for r in read_list] == [r.data.to_dict() for r in mapped_list]
+
+
+def test_extract_cut_off_summaries(tmp_path: Path) -> None:
+    """Test that a log of summaries all cut before their last line is searched in linear time."""
+    cut_summary: str = BOWTIE2_PAIRED_LOG.rsplit("\n", 2)[0].replace("    ", "\t    ") + "\n"
+    log_path: Path = _write(tmp_path / "align.log", cut_summary * 200)
+    empty_path: Path = _write(tmp_path / "empty.log", "")
+
+    start_time: float = time.perf_counter()
+    report_sum_list = Report(path=log_path, module=("bowtie2",)).extract()
+
+    assert time.perf_counter() - start_time < MAX_SECONDS
+    assert report_sum_list == []
+    assert Report(path=empty_path, module=("bowtie2",)).extract() == []
@@ -0,0 +1,146 @@
+"""Tests of the cache of parsed reports."""
+
+import gc
+import json
+import os
+import pickle
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pandas import Series
+
+from bioreport import ParseCache, Report, ReportSum
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+MAX_BYTES: int = 20_000
+
+
+def test_key_follows_file_state(tmp_path: Path) -> None:
+    """Test that the key of a report changes with the file, and with the arrays."""
+    report_path: Path = tmp_path / "sample.log"
+    report_path.write_text(BOWTIE2_UNPAIRED_LOG)
+    report: Report = Report.match_file(report_path)
+
+    key: str | None = ParseCache.key(report)
+    assert key is not None
+    assert ParseCache.key(report) == key
+    assert ParseCache.key(report, arrays=True) not in (None, key)
+
+    os.utime(report_path, ns=(0, 0))
+    assert ParseCache.key(report) != key
+    assert ParseCache.key(Report(path=tmp_path / "missing.log")) is None
+
+
+def test_get_put_round_trip(tmp_path: Path) -> None:
+    """Test that a cached summary is read back from the SQLite file by another cache."""
+    report_path: Path = tmp_path / "sample.log"
+    report_path.write_text(BOWTIE2_UNPAIRED_LOG)
+    report: Report = Report.match_file(report_path)
+    cache_path: Path = tmp_path / "cache.sqlite"
+
+    cache: ParseCache = ParseCache(cache_path)
+    assert cache.get(report) is None
+    cache.put(report, report.parse())
+    cache.close()
+
+    report_sum: ReportSum | None = ParseCache(cache_path).get(report, name="renamed")
+    assert report_sum is not None
+    assert report_sum.data.name == "renamed"
+    assert report_sum.data.equals(report.parse().data)
+
+
+def test_total_bytes_with_eviction(tmp_path: Path) -> None:
+    """Test that the running total size matches the entries, through replacements and evictions."""
+    cache_path: Path = tmp_path / "cache.sqlite"
+    cache: ParseCache = ParseCache(cache_path, max_bytes=MAX_BYTES, write_batch_size=7)
+    report: Report = Report(path=tmp_path / "sample.log", module=("bowtie2", "unpaired"))
+    for i in range(300):
+        cache.put(
+            report,
+            ReportSum(report.module, Series({"index": i, "padding": "x" * (i % 50)})),
+            key=f"key-{i % 120}",
+        )
+    cache.close()
+
+    with sqlite3.connect(cache_path) as connection:
+        total_bytes: int = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM report_sum"
+        ).fetchone()[0]
+        recorded_total_bytes: int = connection.execute(
+            "SELECT value FROM cache_meta WHERE name = 'total_bytes'"
+        ).fetchone()[0]
+    assert 0 < total_bytes <= MAX_BYTES
+    assert recorded_total_bytes == total_bytes
+
+
+class _TouchOnLoad:
+    """An object whose unpickling creates a file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path: Path = path
+
+    def __reduce__(self) -> tuple:
+        """Return the call creating the file."""
+        return (self.path.touch, ())
+
+
+def test_entries_are_data_only(tmp_path: Path) -> None:
+    """Test that the summaries are stored as JSON, and that a pickled entry is a miss without being loaded."""
+    report_path: Path = tmp_path / "sample.log"
+    report_path.write_text(BOWTIE2_UNPAIRED_LOG)
+    report: Report = Report.match_file(report_path)
+    cache_path: Path = tmp_path / "cache.sqlite"
+    cache: ParseCache = ParseCache(cache_path)
+    cache.put(report, report.parse())
+    cache.close()
+    marker_path: Path = tmp_path / "loaded"
+
+    with sqlite3.connect(cache_path) as connection:
+        value: bytes = connection.execute("SELECT value FROM report_sum").fetchone()[0]
+        assert ReportSum.from_record(json.loads(value)).data.equals(report.parse().data)
+        connection.execute(
+            "UPDATE report_sum SET value = ?", (pickle.dumps(_TouchOnLoad(marker_path)),)
+        )
+
+    assert ParseCache(cache_path).get(report) is None
+    assert not marker_path.exists()
+
+
+def test_validate_before_cache_hit(tmp_path: Path) -> None:
+    """Test that a report validated "always" is classified again before a cached summary is returned."""
+    report_path: Path = tmp_path / "sample.log"
+    report_path.write_text(BOWTIE2_UNPAIRED_LOG)
+    report: Report = Report.match_file(report_path)
+    cache: ParseCache = ParseCache()
+    report.parse(cache=cache)
+    # another content of the same size and modification time, under the same cache key
+    file_stat: os.stat_result = report_path.stat()
+    report_path.write_text("x" * file_stat.st_size)
+    os.utime(report_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+
+    assert report.parse(cache=cache, validate="never") is not None
+    with pytest.raises(ValueError, match="does not match the module"):
+        report.parse(cache=cache, validate="always")
+
+
+def test_failed_init_is_collected(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a cache whose `__init__` failed is garbage-collected without error."""
+    unraisable_list: list[Any] = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable_list.append)
+
+    with pytest.raises(TypeError):
+        ParseCache(tmp_path / "cache.sqlite", memory_items=1, unknown=True)  # type: ignore[call-arg]
+    with pytest.raises(TypeError):
+        ParseCache(object())  # type: ignore[arg-type]
+    gc.collect()
+
+    assert unraisable_list == []
@@ -0,0 +1,86 @@
+"""Tests of the report classifier."""
+
+import errno
+import gzip
+import io
+from pathlib import Path
+
+import pytest
+
+from bioreport import ReportClassifier, collect_stats
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+BOWTIE2_MODULE: tuple[str, ...] = ("bowtie2", "unpaired")
+HEADER_BYTE_LIMIT: int = 4096
+LARGE_FILE_SIZE: int = 1 << 20
+
+
+class _FailingFile(io.BytesIO):
+    """A file whose reads fail like those of an unreadable disk."""
+
+    def read(self, size: int | None = -1) -> bytes:
+        """Raise `EIO`."""
+        raise OSError(errno.EIO, "Input/output error")
+
+
+def test_classify_compressed(tmp_path: Path) -> None:
+    """Test that a compressed report is classified from its decompressed header, and a corrupted one is not a report."""
+    report_path: Path = tmp_path / "sample.log.gz"
+    report_path.write_bytes(gzip.compress(BOWTIE2_UNPAIRED_LOG.encode()))
+    corrupted_path: Path = tmp_path / "corrupted.log.gz"
+    corrupted_path.write_bytes(b"not gzip data\n" * 10)
+    classifier: ReportClassifier = ReportClassifier.default()
+
+    assert classifier.classify(report_path) == ("bowtie2", "unpaired")
+    assert classifier.classify(corrupted_path) == ()
+
+
+def test_classify_compressed_read_error() -> None:
+    """Test that a read error of a compressed file is raised instead of making it a non-report."""
+    classifier: ReportClassifier = ReportClassifier.default()
+
+    with pytest.raises(OSError, match="Input/output error"):
+        classifier.classify_stream("sample.log.gz", _FailingFile)
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        b"\x1f\x8b\x08\x04" + BOWTIE2_UNPAIRED_LOG.encode(),
+        b"BAM\x01" + BOWTIE2_UNPAIRED_LOG.encode(),
+        BOWTIE2_UNPAIRED_LOG.encode().replace(b"reads;", b"reads\x00;"),
+        BOWTIE2_UNPAIRED_LOG.encode().replace(b"reads;", b"reads\xff\xfe;"),
+    ],
+    ids=["gzip-magic", "bam-magic", "null-byte", "not-utf-8"],
+)
+def test_binary_header_is_not_report(tmp_path: Path, header: bytes) -> None:
+    """Test that a file starting with a magic number of bulk data, a null byte or bytes that are not UTF-8 is not a report, instead of an error."""
+    file_path: Path = tmp_path / "sample.log"
+    file_path.write_bytes(header)
+
+    assert ReportClassifier.default().classify(file_path) == ()
+
+
+def test_header_read_within_byte_limit(tmp_path: Path) -> None:
+    """Test that only the first bytes of a large file are read, and that bytes that are not UTF-8 past them do not prevent a report from being classified."""
+    single_line_path: Path = tmp_path / "minified.log"
+    single_line_path.write_bytes(b"x" * LARGE_FILE_SIZE)
+    report_path: Path = tmp_path / "sample.log"
+    report_path.write_bytes(
+        BOWTIE2_UNPAIRED_LOG.encode() + b"\xff" * LARGE_FILE_SIZE
+    )
+    classifier: ReportClassifier = ReportClassifier(header_byte_limit=HEADER_BYTE_LIMIT)
+
+    with collect_stats() as scan_stats:
+        assert classifier.classify(single_line_path) == ()
+    with collect_stats() as report_stats:
+        assert classifier.classify(report_path) == BOWTIE2_MODULE
+
+    assert scan_stats.bytes_read <= HEADER_BYTE_LIMIT + io.DEFAULT_BUFFER_SIZE
+    assert report_stats.bytes_read <= HEADER_BYTE_LIMIT + io.DEFAULT_BUFFER_SIZE
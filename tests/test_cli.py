@@ -0,0 +1,91 @@
+"""Tests of the command line interface."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from bioreport.cli import EXIT_FAILURE, EXIT_OK, main
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+
+
+def _read_records(path: Path) -> list[dict]:
+    """Read the JSON objects written a line each."""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_scan_inputs_to_file(tmp_path: Path) -> None:
+    """Test that the reports of a directory and a file input are written to the output file."""
+    data_dir: Path = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "a.log").write_text(BOWTIE2_UNPAIRED_LOG)
+    (tmp_path / "b.log").write_text(BOWTIE2_UNPAIRED_LOG)
+    (tmp_path / "notes.txt").write_text("not a report\n")
+    output_path: Path = tmp_path / "reports.ndjson"
+
+    exit_code: int = main(
+        [
+            "scan",
+            str(data_dir),
+            str(tmp_path / "b.log"),
+            str(tmp_path / "notes.txt"),
+            "--output",
+            str(output_path),
+        ]
+    )
+
+    assert exit_code == EXIT_OK
+    assert _read_records(output_path) == [
+        {"path": str(data_dir / "a.log"), "module": "bowtie2-unpaired"},
+        {"path": str(tmp_path / "b.log"), "module": "bowtie2-unpaired"},
+    ]
+
+
+@pytest.mark.parametrize("from_stdin", [False, True])
+def test_missing_input(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, from_stdin: bool
+) -> None:
+    """Test that a missing input fails with the same exit status from the arguments and from the standard input, the other inputs being still written."""
+    (tmp_path / "a.log").write_text(BOWTIE2_UNPAIRED_LOG)
+    input_list: list[str] = [str(tmp_path / "missing.log"), str(tmp_path / "a.log")]
+    output_path: Path = tmp_path / "reports.ndjson"
+    if from_stdin:
+        monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(input_list) + "\n"))
+        input_list = ["-"]
+
+    exit_code: int = main(["scan", *input_list, "--output", str(output_path)])
+
+    assert exit_code == EXIT_FAILURE
+    assert [r["path"] for r in _read_records(output_path)] == [str(tmp_path / "a.log")]
+
+
+def test_parse_with_jobs(tmp_path: Path) -> None:
+    """Test that parsing in a process pool while the directory is scanned in threads writes the summaries in scan order."""
+    report_num: int = 6
+    for index in range(report_num):
+        (tmp_path / f"s{index}").mkdir()
+        (tmp_path / f"s{index}" / "bowtie2.log").write_text(
+            BOWTIE2_UNPAIRED_LOG.replace("10000", str(20000 + index))
+        )
+    output_path: Path = tmp_path / "summaries.ndjson"
+
+    exit_code: int = main(
+        ["parse", str(tmp_path), "--jobs", "2", "--output", str(output_path)]
+    )
+
+    assert exit_code == EXIT_OK
+    record_list: list[dict] = _read_records(output_path)
+    assert [r["path"] for r in record_list] == [
+        str(tmp_path / f"s{index}" / "bowtie2.log") for index in range(report_num)
+    ]
+    assert [r["data"]["reads"] for r in record_list] == [
+        str(20000 + index) for index in range(report_num)
+    ]
@@ -0,0 +1,85 @@
+"""Tests of the export of parsed reports."""
+
+from pathlib import Path
+
+import pytest
+from pandas import Series
+
+from bioreport import ReportSum, ReportWriter, export_reports
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+MODULE: tuple[str, ...] = ("bowtie2", "unpaired")
+CHUNK_ROWS: int = 2
+REPORT_NUM: int = 5
+
+
+def _report_sum(name: str, data: dict) -> ReportSum:
+    """Build a named summary of a bowtie2 report."""
+    report_sum: ReportSum = ReportSum(MODULE, Series(data))
+    report_sum.rename(name)
+    return report_sum
+
+
+def _read_table(path: Path) -> "pa.Table":
+    """Read a Parquet or Arrow IPC file written by the writer."""
+    if path.suffix == ".parquet":
+        return pq.read_table(path)
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+@pytest.mark.parametrize("format", ["parquet", "feather"])
+def test_round_trip(tmp_path: Path, format: str) -> None:
+    """Test that the reports written in several chunks are read back in order, their values converted with the schema of the module."""
+    report_sum_list: list[ReportSum] = [
+        _report_sum(f"s{index}", {"reads": str(1000 * index), "rate": f"{index}.5%"})
+        for index in range(REPORT_NUM)
+    ]
+
+    path_list: list[Path] = export_reports(
+        iter(report_sum_list), tmp_path, format=format, chunk_rows=CHUNK_ROWS
+    )
+
+    assert path_list == [
+        tmp_path / "module=bowtie2" / "submodule=unpaired" / f"part-00000.{format}"
+    ]
+    arrow_table = _read_table(path_list[0])
+    assert arrow_table.column_names == ["report", "reads", "rate"]
+    assert arrow_table.column("report").to_pylist() == [
+        r.name for r in report_sum_list
+    ]
+    assert arrow_table.column("reads").to_pylist() == [
+        1000 * index for index in range(REPORT_NUM)
+    ]
+    assert arrow_table.column("rate").to_pylist() == [
+        index + 0.5 for index in range(REPORT_NUM)
+    ]
+
+
+def test_new_part_file_on_schema_change(tmp_path: Path) -> None:
+    """Test that a chunk with other columns is written to a new part file, the previous file being complete."""
+    with ReportWriter(tmp_path, chunk_rows=CHUNK_ROWS) as report_writer:
+        report_writer.write_all(
+            _report_sum(f"s{index}", {"reads": 1000 * index}) for index in range(CHUNK_ROWS)
+        )
+        report_writer.write_all(
+            _report_sum(f"t{index}", {"reads": 1000 * index, "rate": 94.0})
+            for index in range(CHUNK_ROWS)
+        )
+
+    module_dir: Path = tmp_path / "module=bowtie2" / "submodule=unpaired"
+    assert report_writer.paths == [
+        module_dir / "part-00000.parquet",
+        module_dir / "part-00001.parquet",
+    ]
+    assert sorted(p.name for p in module_dir.iterdir()) == [
+        "part-00000.parquet",
+        "part-00001.parquet",
+    ]
+    assert _read_table(report_writer.paths[0]).column_names == ["report", "reads"]
+    assert _read_table(report_writer.paths[1]).column("report").to_pylist() == [
+        "t0",
+        "t1",
+    ]
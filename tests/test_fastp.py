@@ -0,0 +1,190 @@
+"""Tests of the fastp reports."""
+
+import io
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from bioreport import Report
+from bioreport._json_stream import load_sections
+
+FASTP_JSON_DICT: dict = {
+    "summary": {
+        "before_filtering": {
+            "total_reads": 1000,
+            "total_bases": 150000,
+            "q20_bases": 140000,
+            "q30_bases": 130000,
+            "q20_rate": 0.933333,
+            "q30_rate": 0.866667,
+            "read1_mean_length": 150,
+            "read2_mean_length": 150,
+            "gc_content": 0.45,
+        },
+        "after_filtering": {
+            "total_reads": 900,
+            "total_bases": 130000,
+            "q20_bases": 125000,
+            "q30_bases": 120000,
+            "q20_rate": 0.961538,
+            "q30_rate": 0.923077,
+            "read1_mean_length": 148,
+            "read2_mean_length": 148,
+            "gc_content": 0.44,
+        },
+    },
+    "filtering_result": {
+        "passed_filter_reads": 900,
+        "low_quality_reads": 80,
+        "too_many_N_reads": 5,
+        "too_short_reads": 15,
+        "too_long_reads": 0,
+    },
+    "duplication": {"rate": 0.1, "histogram": [50, 30, 20], "mean_gc": [0.4, 0.5, 0.6]},
+    "insert_size": {"peak": 170, "unknown": 10, "histogram": [0, 1, 3, 2]},
+    "adapter_cutting": {
+        "adapter_trimmed_reads": 10,
+        "read1_adapter_sequence": 'AGATCG "}]" {',
+        "read1_adapter_counts": {"A\\T": 1, "é": 2},
+    },
+    "read1_before_filtering": {
+        "total_reads": 500,
+        "total_cycles": 4,
+        "quality_curves": {"A": [30.0, 31.5, 1e1, 32.0], "mean": [30.0, 31.0, 32.0, 33.0]},
+        "content_curves": {"GC": [0.25, 0.5, 0.75, 1.0]},
+    },
+    "read2_before_filtering": {
+        "total_reads": 500,
+        "total_cycles": 3,
+        "quality_curves": {"mean": [29.0, 28.0, 27.0]},
+        "content_curves": {"GC": [0.5, 0.5, 0.5]},
+    },
+    "command": "fastp -i a.fq -I b.fq",
+}
+
+FASTP_HTML_TABLES: dict[str, list[tuple[str, str]]] = {
+    "general": [
+        ("fastp version", "0.23.2 (<a href='https://github.com/OpenGene/fastp'>https://github.com/OpenGene/fastp</a>)"),
+        ("sequencing", "paired end (150 cycles + 150 cycles)"),
+        ("mean length before filtering", "150bp, 150bp"),
+        ("duplication rate", "12.3%"),
+    ],
+    "before_filtering_summary": [
+        ("total reads", "1.234567 M"),
+        ("Q20 bases", "170.123000 M (91.9%)"),
+        ("GC content", "48.1%"),
+    ],
+    "after_filtering_summary": [
+        ("total reads", "1.2 M"),
+        ("GC content", "48.0%"),
+    ],
+    "filtering_result": [
+        ("reads passed filters", "1.2 M (97.2%)"),
+        ("reads with too many N", "12 (0.000972%)"),
+    ],
+}
+
+
+def _fastp_json_text() -> str:
+    """Return the JSON report as fastp writes it, indented by tabs without a space after the colons of the numbers."""
+    return re.sub(r'": (?=[\d.-])', '":', json.dumps(FASTP_JSON_DICT, indent="\t"))
+
+
+def _fastp_html_text() -> str:
+    """Return an html report with the summary tables of fastp, followed by the data of the plots."""
+    div_list: list[str] = []
+    for div_id, row_list in FASTP_HTML_TABLES.items():
+        row_text: str = "".join(
+            f"<tr><td class='col1'>{key}:</td><td class='col2'>{value}</td></tr>\n"
+            for key, value in row_list
+        )
+        div_list.append(
+            f"<div class='subsection_title'>{div_id}</div>\n<div id='{div_id}'>\n"
+            f"<table class='summary_table'>\n{row_text}</table>\n</div>\n"
+        )
+    return (
+        '<html><head><meta http-equiv="content-type" content="text/html;charset=utf-8" />'
+        "<title>fastp report at 2024-01-01      12:00:00 </title>"
+        '<script src="http://opengene.org/plotly-1.2.0.min.js"></script>\n'
+        "<style type='text/css'>td {border:1px solid #dddddd;}</style></head>\n"
+        "<body><div id='container'><div class='section_div'><div id='summary'>\n"
+        + "".join(div_list)
+        + "</div></div>\n<script>var data=["
+        + ",".join(str(i / 7) for i in range(20000))
+        + "];</script>\n</div></body></html>\n"
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+def test_load_sections_matches_json_load(chunk_size: int) -> None:
+    """Test that the decoded sections are those of `json.load`, whatever the size of the chunks read."""
+    json_text: str = json.dumps(FASTP_JSON_DICT, indent=2, ensure_ascii=False)
+    key_list: list[str] = ["filtering_result", "adapter_cutting", "command", "missing"]
+
+    section_dict: dict = load_sections(
+        io.StringIO(json_text), keys=key_list, chunk_size=chunk_size
+    )
+
+    assert section_dict == {
+        k: v for k, v in json.loads(json_text).items() if k in key_list
+    }
+
+
+def test_load_sections_stops_after_keys() -> None:
+    """Test that the file is not read further than the last key, and that the rest is not decoded."""
+    json_text: str = '{"summary": {"a": 1}, "rest": [1, 2, ' + "3, " * 100_000 + "oops"
+    json_file: io.StringIO = io.StringIO(json_text)
+
+    assert load_sections(json_file, keys=["summary"], chunk_size=64) == {"summary": {"a": 1}}
+    assert json_file.tell() < len(json_text) // 100
+
+
+def test_json_report_matches_json_load(tmp_path: Path) -> None:
+    """Test that the summary and the arrays of a JSON report are those of the whole document decoded with `json.load`."""
+    report_path: Path = tmp_path / "sample.json"
+    report_path.write_text(_fastp_json_text())
+    report: Report = Report.match_file(report_path)
+    assert report.module == ("fastp", "json")
+    with open(report_path) as json_file:
+        json_dict: dict = json.load(json_file)
+
+    report_sum = report.parse(arrays=True)
+
+    assert report_sum.data.to_dict() == {
+        **{
+            (section, key): value
+            for section in ("before_filtering", "after_filtering")
+            for key, value in json_dict["summary"][section].items()
+        },
+        **{
+            ("filtering_result", key): value
+            for key, value in json_dict["filtering_result"].items()
+        },
+    }
+    assert report_sum.arrays[("read1_before_filtering", "quality_curves")].to_dict(
+        orient="list"
+    ) == json_dict["read1_before_filtering"]["quality_curves"]
+    assert report_sum.arrays[("duplication", "histogram")].to_dict(orient="list") == {
+        key: json_dict["duplication"][key] for key in ("histogram", "mean_gc")
+    }
+    assert report_sum.arrays[("insert_size", "histogram")].index.tolist() == [0, 1, 2, 3]
+
+
+def test_html_report_matches_beautifulsoup(tmp_path: Path) -> None:
+    """Test that the summary of an html report is the one extracted from the whole document with BeautifulSoup."""
+    bs4 = pytest.importorskip("bs4")
+    report_path: Path = tmp_path / "sample.html"
+    report_path.write_text(_fastp_html_text())
+    report: Report = Report.match_file(report_path)
+    assert report.module == ("fastp", "html")
+
+    soup = bs4.BeautifulSoup(report_path.read_text(), "html.parser")
+    expected_dict: dict[tuple[str, str], str] = {}
+    for div_id in FASTP_HTML_TABLES:
+        for row in soup.find("div", id=div_id).find("table", class_="summary_table").find_all("tr"):
+            key, value = [cell.text.strip() for cell in row.find_all("td")]
+            expected_dict[(div_id, key.removesuffix(":"))] = value
+
+    assert report.parse().data.to_dict() == expected_dict
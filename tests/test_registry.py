@@ -0,0 +1,118 @@
+"""Tests of the registry of the modules."""
+
+import threading
+from importlib.metadata import EntryPoint
+from pathlib import Path
+
+import pytest
+
+from bioreport import Report, ReportClassifier, ReportSum, _registry
+
+PLUGIN_MODULE: str = '''
+from pandas import Series
+
+from bioreport import ReportSum
+from bioreport._base_module import BaseModule
+
+
+class BioReportModule(BaseModule):
+    report_pattern = {
+        "mytool-log": {"pattern_glob": "*.mytool", "content_regex": "mytool report"}
+    }
+
+    def __init__(self):
+        super().__init__(name="mytool", submodules=("log",))
+
+    def parse(self, report, name=None):
+        report_sum = ReportSum(report.module, Series({"lines": len(report.path.read_text().splitlines())}))
+        report_sum.rename(report.file_name if name is None else name)
+        return report_sum
+'''
+THREAD_NUM: int = 8
+
+
+@pytest.fixture
+def empty_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Forget the modules resolved and the plugins discovered by the other tests."""
+    monkeypatch.setattr(_registry, "_discovered", _registry._Discovered())
+    monkeypatch.setattr(_registry, "_module_instance_dict", {})
+    monkeypatch.setattr(_registry, "_plugin_object_dict", {})
+
+
+def _use_entry_points(
+    monkeypatch: pytest.MonkeyPatch, entry_point_list: list[EntryPoint]
+) -> None:
+    """Make `entry_points` return the given entry points of the modules group."""
+    monkeypatch.setattr(
+        "importlib.metadata.entry_points",
+        lambda group: [e for e in entry_point_list if e.group == group],
+    )
+
+
+@pytest.mark.usefixtures("empty_registry")
+def test_module_singleton() -> None:
+    """Test that a module is instantiated once, whatever the number of threads asking for it."""
+    module_list: list = []
+    barrier: threading.Barrier = threading.Barrier(THREAD_NUM)
+
+    def get_module() -> None:
+        barrier.wait()
+        module_list.append(_registry.get_module("bowtie2"))
+
+    thread_list: list[threading.Thread] = [
+        threading.Thread(target=get_module) for _ in range(THREAD_NUM)
+    ]
+    for thread in thread_list:
+        thread.start()
+    for thread in thread_list:
+        thread.join()
+
+    assert len(module_list) == THREAD_NUM
+    assert all(module is module_list[0] for module in module_list)
+    assert _registry.get_module("bowtie2") is module_list[0]
+
+
+@pytest.mark.usefixtures("empty_registry")
+def test_entry_point_plugin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a module of the `bioreport.modules` entry point group classifies and parses its reports."""
+    (tmp_path / "mytool_bioreport.py").write_text(PLUGIN_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    _use_entry_points(
+        monkeypatch,
+        [
+            EntryPoint(
+                name="mytool",
+                value="mytool_bioreport:BioReportModule",
+                group=_registry.ENTRY_POINT_GROUP,
+            )
+        ],
+    )
+    report_path: Path = tmp_path / "sample.mytool"
+    report_path.write_text("mytool report\nline\n")
+
+    report: Report = Report.match_file(report_path, classifier=ReportClassifier())
+    report_sum: ReportSum = report.parse(validate="never")
+
+    assert "mytool-log" in _registry.report_pattern()
+    assert report.module == ("mytool", "log")
+    assert report_sum.name == "sample.mytool"
+    assert report_sum.data["lines"] == len(report_path.read_text().splitlines())
+    assert _registry.get_module("mytool") is _registry.get_module("mytool")
+
+
+@pytest.mark.usefixtures("empty_registry")
+def test_entry_point_conflict(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a third-party module cannot take the name of a built-in module."""
+    _use_entry_points(
+        monkeypatch,
+        [
+            EntryPoint(
+                name="fastp",
+                value="mytool_bioreport:BioReportModule",
+                group=_registry.ENTRY_POINT_GROUP,
+            )
+        ],
+    )
+
+    with pytest.raises(ValueError, match="Conflict of module names"):
+        _registry.plugin_entry_points()
@@ -0,0 +1,99 @@
+"""Tests of the validation of the reports before parsing."""
+
+import os
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from bioreport import Report
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+MTIME_STEP_NS: int = 1_000_000_000
+
+
+def _count_validations(monkeypatch: pytest.MonkeyPatch) -> list[Report]:
+    """Record the reports whose module is checked against their file."""
+    validated_list: list[Report] = []
+    with_matched_module = Report.with_matched_module
+
+    def counting_with_matched_module(self: Report) -> bool:
+        validated_list.append(self)
+        return with_matched_module(self)
+
+    monkeypatch.setattr(Report, "with_matched_module", counting_with_matched_module)
+    return validated_list
+
+
+def _change_size(path: Path) -> None:
+    """Rewrite a file with a longer number of reads."""
+    path.write_text(BOWTIE2_UNPAIRED_LOG.replace("10000", "100000"))
+
+
+def _change_mtime(path: Path) -> None:
+    """Move the modification time of a file forward."""
+    file_stat: os.stat_result = path.stat()
+    os.utime(
+        path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + MTIME_STEP_NS)
+    )
+
+
+def _change_inode(path: Path) -> None:
+    """Replace a file by a copy with the same size and modification time."""
+    file_stat: os.stat_result = path.stat()
+    copy_path: Path = path.with_name(f"{path.name}.copy")
+    copy_path.write_bytes(path.read_bytes())
+    os.utime(copy_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+    os.replace(copy_path, path)
+
+
+def test_unchanged_file_is_not_validated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a report classified by `match_file` is parsed without classifying it again, unless asked to."""
+    report_path: Path = tmp_path / "sample.log"
+    report_path.write_text(BOWTIE2_UNPAIRED_LOG)
+    report: Report = Report.match_file(report_path)
+    validated_list: list[Report] = _count_validations(monkeypatch)
+
+    report.parse()
+    assert validated_list == []
+    report.parse(validate="always")
+    assert validated_list == [report]
+
+
+@pytest.mark.parametrize("change", [_change_size, _change_mtime, _change_inode])
+def test_changed_file_is_validated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, change: Callable[[Path], None]
+) -> None:
+    """Test that a report whose file changed size, modification time or inode since it was classified is classified again, unless asked not to."""
+    report_path: Path = tmp_path / "sample.log"
+    report_path.write_text(BOWTIE2_UNPAIRED_LOG)
+    report: Report = Report.match_file(report_path)
+    validated_list: list[Report] = _count_validations(monkeypatch)
+
+    change(report_path)
+
+    assert not report.with_current_fingerprint()
+    report.parse(validate="never")
+    assert validated_list == []
+    report.parse()
+    assert validated_list == [report]
+
+
+def test_changed_file_no_longer_matching(tmp_path: Path) -> None:
+    """Test that a report whose file changed into another type of file is rejected instead of parsed."""
+    report_path: Path = tmp_path / "sample.log"
+    report_path.write_text(BOWTIE2_UNPAIRED_LOG)
+    report: Report = Report.match_file(report_path)
+
+    report_path.write_text("echo done\n")
+
+    with pytest.raises(ValueError, match="does not match the module"):
+        report.parse()
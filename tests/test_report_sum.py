@@ -0,0 +1,67 @@
+"""Tests of the tables of parsed reports."""
+
+import json
+import math
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
+
+from bioreport import ReportSum
+
+
+def _report_sum(name: str, data: dict) -> ReportSum:
+    """Build a named summary of a bowtie2 report."""
+    report_sum: ReportSum = ReportSum(("bowtie2", "unpaired"), Series(data))
+    report_sum.rename(name)
+    return report_sum
+
+
+def test_concat_raw_keeps_parsed_values() -> None:
+    """Test that a raw table has object columns with the values as parsed, and the missing keys as `None`."""
+    report_sum_list: list[ReportSum] = [
+        _report_sum("a", {"reads": 10, "rate": 94.04}),
+        _report_sum("b", {"reads": 20}),
+    ]
+
+    raw_df = ReportSum.concat(report_sum_list, raw=True)
+
+    assert raw_df.index.tolist() == ["a", "b"]
+    assert raw_df.columns.tolist() == ["reads", "rate"]
+    assert all(dtype == object for dtype in raw_df.dtypes)
+    assert raw_df.to_numpy().tolist() == [[10, 94.04], [20, None]]
+    assert ReportSum.concat(report_sum_list, join="inner", raw=True).columns.tolist() == [
+        "reads"
+    ]
+
+
+def test_record_round_trip() -> None:
+    """Test that a summary with tuple keys, mixed values and arrays is the same after a JSON round trip of its record."""
+    data: Series = Series(
+        [10, "1.2 M (97.2%)", np.int64(3), None],
+        index=pd.MultiIndex.from_tuples([("a", "x"), ("a", "y"), ("b", "x"), ("b", "y")]),
+        name="sample",
+        dtype=object,
+    )
+    curve_df: DataFrame = DataFrame(
+        {"mean": [30.0, float("nan")], "GC": [0.5, 0.25]},
+        index=pd.RangeIndex(1, 3, name="cycle"),
+    )
+    report_sum: ReportSum = ReportSum(
+        ("fastp", "json"), data, arrays={("read1", "curves"): curve_df}
+    )
+
+    restored: ReportSum = ReportSum.from_record(json.loads(json.dumps(report_sum.to_record())))
+
+    assert restored.module == report_sum.module
+    assert restored.name == "sample"
+    assert restored.data.dtype == object
+    assert restored.data.index.tolist() == data.index.tolist()
+    assert restored.data.iloc[:3].tolist() == [10, "1.2 M (97.2%)", 3]
+    assert list(restored.arrays) == [("read1", "curves")]
+    restored_df: DataFrame = restored.arrays[("read1", "curves")]
+    assert restored_df.index.name == "cycle"
+    assert restored_df.index.tolist() == [1, 2]
+    assert restored_df.columns.tolist() == ["mean", "GC"]
+    assert restored_df["GC"].tolist() == [0.5, 0.25]
+    assert math.isnan(restored_df.loc[2, "mean"])
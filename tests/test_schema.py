@@ -0,0 +1,87 @@
+"""Tests of the conversion of the values of reports with schemas."""
+
+import math
+
+import numpy as np
+import pytest
+from pandas import DataFrame, Series
+
+from bioreport.schema import ReportSchema, convert_column
+
+
+def test_number_with_unit_and_comment() -> None:
+    """Test that numbers with a unit suffix and a comment in brackets are scaled to float64."""
+    column: Series = Series(["1.2 M (97.2%)", "35.2%", "2 K", "3"], dtype=object)
+
+    typed_column: Series = convert_column(column, "number")
+
+    assert typed_column.dtype == np.float64
+    assert typed_column.tolist() == pytest.approx([1.2e6, 35.2, 2e3, 3.0])
+
+
+def test_percent_with_missing_value() -> None:
+    """Test that percents with or without "%" are float64, the missing values being `NaN`."""
+    column: Series = Series(["35.2%", "94.04", None], dtype=object)
+
+    typed_column: Series = convert_column(column, "percent")
+
+    assert typed_column.dtype == np.float64
+    assert typed_column.iloc[:2].tolist() == pytest.approx([35.2, 94.04])
+    assert math.isnan(typed_column.iloc[2])
+
+
+def test_mixed_int_and_str_column() -> None:
+    """Test that a column of integers and integer strings is int64, and float64 with a missing value."""
+    column: Series = Series([10, "20", np.int64(30)], dtype=object)
+    missing_column: Series = Series([10, "20", None], dtype=object)
+
+    typed_column: Series = convert_column(column, "number")
+    typed_missing_column: Series = convert_column(missing_column, "number")
+
+    assert typed_column.dtype == np.int64
+    assert typed_column.tolist() == [10, 20, 30]
+    assert typed_missing_column.dtype == np.float64
+    assert typed_missing_column.iloc[:2].tolist() == [10.0, 20.0]
+
+
+@pytest.mark.parametrize(
+    ("values", "kind"),
+    [
+        (["12", "n/a"], "number"),
+        (["1.5", "2"], "int"),
+        (["1.2 M", "3"], "percent"),
+    ],
+)
+def test_unconvertible_column_is_kept(values: list[str], kind: str) -> None:
+    """Test that a column with a value that is not of the kind is kept as is."""
+    column: Series = Series(values, dtype=object)
+
+    assert convert_column(column, kind) is column
+
+
+def test_apply_rules_by_last_key_level() -> None:
+    """Test that the kind of a column is given by the first rule matching the last level of its key."""
+    schema: ReportSchema = ReportSchema(
+        rules=[("*_rate", "percent"), ("sample_*", "str")], default="number"
+    )
+    data: DataFrame = DataFrame(
+        {
+            ("summary", "q30_rate"): ["35.2%", "40%"],
+            ("summary", "sample_id"): ["001", "002"],
+            ("summary", "total_reads"): ["1.2 M (97.2%)", "900 K"],
+        },
+        dtype=object,
+    )
+
+    typed_data: DataFrame = schema.apply(data)
+
+    assert typed_data.iloc[:, 0].tolist() == pytest.approx([35.2, 40.0])
+    assert typed_data.iloc[:, 1].tolist() == ["001", "002"]
+    assert typed_data.iloc[:, 2].tolist() == pytest.approx([1.2e6, 9e5])
+    assert data.iloc[:, 0].tolist() == ["35.2%", "40%"]
+
+
+def test_invalid_kind() -> None:
+    """Test that a rule of an unknown kind is rejected."""
+    with pytest.raises(ValueError, match="Invalid value kind"):
+        ReportSchema(rules=[("*", "bytes")])
@@ -0,0 +1,58 @@
+"""Tests of the scans of directories."""
+
+from pathlib import Path
+
+import pytest
+
+from bioreport import Report, iter_scan_dir, scan_dir
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+DIR_NAMES: tuple[str, ...] = ("b", "a", "a/d", "a/c")
+FILES_PER_DIR: int = 150  # the tree has more files than a pool task matches, so that the scan is split in several chunks
+WORKERS: int = 4
+
+
+def _make_tree(root: Path) -> None:
+    """Write bowtie2 logs and files that are not reports in nested directories, created out of name order."""
+    for dir_name in DIR_NAMES:
+        (root / dir_name).mkdir(parents=True)
+        for index in reversed(range(FILES_PER_DIR)):
+            if index % 3 == 0:
+                (root / dir_name / f"s{index}.log").write_text(BOWTIE2_UNPAIRED_LOG)
+            else:
+                (root / dir_name / f"s{index}.sh").write_text("echo done\n")
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_scan_order(tmp_path: Path, executor: str) -> None:
+    """Test that a scan with a pool finds the reports of the serial scan, in the same order."""
+    _make_tree(tmp_path)
+
+    serial_report_list: list[Report] = scan_dir(tmp_path)
+    parallel_report_list: list[Report] = scan_dir(
+        tmp_path, workers=WORKERS, executor=executor
+    )
+
+    assert len(serial_report_list) == len(DIR_NAMES) * len(
+        range(0, FILES_PER_DIR, 3)
+    )
+    assert parallel_report_list == serial_report_list
+    assert (
+        list(iter_scan_dir(tmp_path, workers=WORKERS, executor=executor))
+        == serial_report_list
+    )
+
+
+@pytest.mark.parametrize(
+    ("workers", "executor"), [(0, "thread"), (WORKERS, "interpreter")]
+)
+def test_invalid_pool(tmp_path: Path, workers: int, executor: str) -> None:
+    """Test that an invalid number of workers or type of pool is rejected."""
+    with pytest.raises(ValueError):
+        scan_dir(tmp_path, workers=workers, executor=executor)
@@ -0,0 +1,103 @@
+"""Tests of the shard-aware scans and parses."""
+
+import json
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from bioreport import WalkOptions, merge_shards, parse_all, parse_shard, scan_dir
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+MBIAS_MALFORMED_REPORT: str = """CpG context (R1)
+================
+position\tcount methylated\tcount unmethylated\t% methylation\tcoverage
+1\t80\t20\t80.00\t100
+2\t30\t10
+"""
+NUM_SHARDS: int = 3
+
+
+def _make_tree(root: Path) -> None:
+    """Write reports whose walk order differs from the order of their paths, and an archive of reports."""
+    for rel_path in ["z.log", "a/y.log", "a/b/x.log", "a/c.log", "m/n.log"]:
+        (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel_path).write_text(BOWTIE2_UNPAIRED_LOG)
+    member_dir: Path = root.parent / "members"
+    member_dir.mkdir()
+    with tarfile.open(root / "m" / "logs.tar", "w") as tar:
+        for member_name in ["t2.log", "t1.log", "t3.log"]:
+            (member_dir / member_name).write_text(BOWTIE2_UNPAIRED_LOG)
+            tar.add(member_dir / member_name, arcname=member_name)
+
+
+def test_merge_shards_in_scan_order(tmp_path: Path) -> None:
+    """Test that the merged shards are in the order of a single scan, whatever the order of the partial result files."""
+    data_dir: Path = tmp_path / "data"
+    _make_tree(data_dir)
+    partial_path_list: list[Path] = []
+    shard_name_list: list[str] = []
+    for shard in range(NUM_SHARDS):
+        partial_path: Path = tmp_path / f"part-{shard}.json"
+        batch_parse_result = parse_shard(
+            data_dir,
+            partial_path,
+            WalkOptions(archives=True, shard=shard, num_shards=NUM_SHARDS),
+        )
+        partial_path_list.append(partial_path)
+        shard_name_list.extend(r.name for r in batch_parse_result.report_sums)
+
+    merged_result = merge_shards(reversed(partial_path_list))
+    single_result = parse_all(scan_dir(data_dir, options=WalkOptions(archives=True)))
+
+    merged_name_list: list[str] = [r.name for r in merged_result.report_sums]
+    assert merged_name_list == [r.name for r in single_result.report_sums]
+    assert sorted(merged_name_list) == sorted(shard_name_list)
+    assert merged_name_list[:4] == ["z.log", "c.log", "y.log", "x.log"]
+    assert merged_result.failures == []
+
+
+def test_merge_shards_missing_shard(tmp_path: Path) -> None:
+    """Test that a merge without all the shards is rejected."""
+    data_dir: Path = tmp_path / "data"
+    _make_tree(data_dir)
+    partial_path: Path = tmp_path / "part-0.json"
+    parse_shard(data_dir, partial_path, WalkOptions(shard=0, num_shards=NUM_SHARDS))
+
+    with pytest.raises(ValueError, match="Missing shards"):
+        merge_shards([partial_path])
+
+
+def test_merge_shards_failures(tmp_path: Path) -> None:
+    """Test that the failures are written as JSON and merged with their report, error and position among all the reports."""
+    data_dir: Path = tmp_path / "data"
+    _make_tree(data_dir)
+    (data_dir / "a" / "s.M-bias.txt").write_text(MBIAS_MALFORMED_REPORT)
+    partial_path_list: list[Path] = [
+        tmp_path / f"part-{shard}.json" for shard in range(NUM_SHARDS)
+    ]
+    for shard, partial_path in enumerate(partial_path_list):
+        parse_shard(
+            data_dir, partial_path, WalkOptions(shard=shard, num_shards=NUM_SHARDS)
+        )
+
+    merged_result = merge_shards(partial_path_list)
+    single_result = parse_all(scan_dir(data_dir))
+
+    assert all(
+        json.loads(p.read_text())["format"] == "bioreport-shard"
+        for p in partial_path_list
+    )
+    assert [repr(f) for f in merged_result.failures] == [
+        repr(f) for f in single_result.failures
+    ]
+    assert [f.index for f in merged_result.failures] == [
+        f.index for f in single_result.failures
+    ]
+    assert merged_result.failures[0].report == single_result.failures[0].report
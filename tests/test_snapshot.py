@@ -0,0 +1,78 @@
+"""Tests of the incremental scans."""
+
+import os
+import time
+from pathlib import Path
+
+from bioreport import incremental_scan_dir, scan_dir
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+
+
+def _age_dir(dir_path: Path) -> None:
+    """Move the modification time of a directory out of the racy window of the snapshot."""
+    old_time_ns: int = time.time_ns() - 60_000_000_000
+    os.utime(dir_path, ns=(old_time_ns, old_time_ns))
+
+
+def test_unchanged_dir_reuses_snapshot(tmp_path: Path) -> None:
+    """Test that a second scan of an unchanged directory finds the same reports and no difference."""
+    data_dir: Path = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "sample.log").write_text(BOWTIE2_UNPAIRED_LOG)
+    (data_dir / "notes.txt").write_text("not a report\n")
+    _age_dir(data_dir)
+    snapshot_path: Path = tmp_path / "snapshot.json"
+
+    first_diff = incremental_scan_dir(data_dir, snapshot_path)
+    second_diff = incremental_scan_dir(data_dir, snapshot_path)
+
+    assert [r.path for r in first_diff.added] == [data_dir / "sample.log"]
+    assert [r.path for r in second_diff.reports] == [data_dir / "sample.log"]
+    assert second_diff.added == second_diff.changed == second_diff.removed == []
+
+
+def test_file_edited_into_report_in_unchanged_dir(tmp_path: Path) -> None:
+    """Test that a file becoming a report in place is found although its directory is unchanged."""
+    data_dir: Path = tmp_path / "data"
+    data_dir.mkdir()
+    log_path: Path = data_dir / "sample.log"
+    log_path.write_text("")
+    _age_dir(data_dir)
+    snapshot_path: Path = tmp_path / "snapshot.json"
+    assert incremental_scan_dir(data_dir, snapshot_path).reports == []
+
+    dir_mtime_ns: int = data_dir.stat().st_mtime_ns
+    log_path.write_text(BOWTIE2_UNPAIRED_LOG)
+    assert data_dir.stat().st_mtime_ns == dir_mtime_ns
+    scan_diff = incremental_scan_dir(data_dir, snapshot_path)
+
+    assert [r.path for r in scan_diff.reports] == [r.path for r in scan_dir(data_dir)]
+    assert [(r.path, r.module) for r in scan_diff.added] == [
+        (log_path, ("bowtie2", "unpaired"))
+    ]
+
+
+def test_removed_and_changed_reports(tmp_path: Path) -> None:
+    """Test that the removed and modified reports are reported."""
+    data_dir: Path = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "a.log").write_text(BOWTIE2_UNPAIRED_LOG)
+    (data_dir / "b.log").write_text(BOWTIE2_UNPAIRED_LOG)
+    _age_dir(data_dir)
+    snapshot_path: Path = tmp_path / "snapshot.json"
+    incremental_scan_dir(data_dir, snapshot_path)
+
+    (data_dir / "a.log").unlink()
+    (data_dir / "b.log").write_text(BOWTIE2_UNPAIRED_LOG + "\n")
+    scan_diff = incremental_scan_dir(data_dir, snapshot_path)
+
+    assert [r.path for r in scan_diff.removed] == [data_dir / "a.log"]
+    assert [r.path for r in scan_diff.changed] == [data_dir / "b.log"]
+    assert [r.path for r in scan_diff.reports] == [data_dir / "b.log"]
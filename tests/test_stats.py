@@ -0,0 +1,98 @@
+"""Tests of the statistics of scans and parses."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from bioreport import ScanStats, collect_stats, parse_all, scan_dir
+from bioreport.stats import _run_collecting, current_stats
+
+BOWTIE2_UNPAIRED_LOG: str = """10000 reads; of these:
+  10000 (100.00%) were unpaired; of these:
+    596 (5.96%) aligned 0 times
+    7980 (79.80%) aligned exactly 1 time
+    1424 (14.24%) aligned >1 times
+94.04% overall alignment rate
+"""
+REPORT_PATHS: tuple[str, ...] = ("a.log", "sub/b.log", "sub/c.log")
+NOISE_PATHS: tuple[str, ...] = ("notes.txt", "sub/run.sh")
+DIR_NUM: int = 2
+
+
+def _make_tree(root: Path) -> None:
+    """Write bowtie2 logs and files that are not reports in two directories."""
+    for rel_path in REPORT_PATHS:
+        (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel_path).write_text(BOWTIE2_UNPAIRED_LOG)
+    for rel_path in NOISE_PATHS:
+        (root / rel_path).write_text("echo done\n")
+
+
+def _record_parse() -> None:
+    """Record a report parsed into the current collector, as a process pool task does."""
+    stats: ScanStats | None = current_stats()
+    assert stats is not None
+    stats.record_parse("a.log", ("bowtie2", "unpaired"), 0.5)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_counters(tmp_path: Path, executor: str) -> None:
+    """Test that the counters and the stage times cover the scan and the parse, whatever the pool."""
+    _make_tree(tmp_path)
+    with collect_stats() as scan_stats:
+        report_list = scan_dir(tmp_path, workers=2, executor=executor)
+        parse_all(report_list)
+
+    assert scan_stats.dirs_walked == DIR_NUM
+    assert scan_stats.files_walked == len(REPORT_PATHS) + len(NOISE_PATHS)
+    assert scan_stats.files_matched == len(REPORT_PATHS) + len(NOISE_PATHS)
+    assert scan_stats.reports_parsed == len(REPORT_PATHS)
+    assert scan_stats.files_opened >= len(REPORT_PATHS)
+    assert scan_stats.bytes_read >= len(REPORT_PATHS) * len(BOWTIE2_UNPAIRED_LOG)
+    assert {"walk", "match", "parse", "scan_dir", "parse_all"} <= set(
+        scan_stats.stage_seconds
+    )
+    assert sorted(path for _, path, _ in scan_stats.slowest("parse")) == sorted(
+        str(tmp_path / p) for p in REPORT_PATHS
+    )
+    stats_dict: dict[str, Any] = scan_stats.to_dict()
+    assert stats_dict["parse_histograms"]["bowtie2-unpaired"]["count"] == len(
+        REPORT_PATHS
+    )
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_hooks(tmp_path: Path, executor: str) -> None:
+    """Test that the hooks get an event per file matched and report parsed, the events of process pool workers included."""
+    _make_tree(tmp_path)
+    event_list: list[tuple[str, dict[str, Any]]] = []
+    with collect_stats(hooks=[lambda event, fields: event_list.append((event, fields))]):
+        parse_all(scan_dir(tmp_path, workers=2, executor=executor))
+
+    match_path_list: list[str] = [f["path"] for e, f in event_list if e == "match"]
+    assert sorted(match_path_list) == sorted(
+        str(tmp_path / p) for p in REPORT_PATHS + NOISE_PATHS
+    )
+    assert sorted(f["path"] for e, f in event_list if e == "parse") == sorted(
+        str(tmp_path / p) for p in REPORT_PATHS
+    )
+    assert [f["stage"] for e, f in event_list if e == "stage"] == [
+        "scan_dir",
+        "parse_all",
+    ]
+
+
+@pytest.mark.parametrize("keep_events", [False, True])
+def test_worker_events_kept_for_hooks(keep_events: bool) -> None:
+    """Test that a process pool task keeps its events only when they are asked for, and that its counters are merged either way."""
+    event_list: list[str] = []
+    scan_stats: ScanStats = ScanStats(
+        hooks=[lambda event, fields: event_list.append(event)]
+    )
+
+    _, worker_stats = _run_collecting(scan_stats.top_n, keep_events, _record_parse)
+    scan_stats.merge(worker_stats)
+
+    assert scan_stats.reports_parsed == 1
+    assert event_list == (["parse"] if keep_events else [])